@@ -46,7 +46,19 @@ class Barcode(API_Com.utilities.Utilities_Container):
 		return valueList
 
 	class Child(API_Com.utilities.Utilities_Child):
-		"""A COM Port connection."""
+		"""A Barcode."""
+
+		__slots__ = ("device", "image", "type", "text", "size", "pixelSize", "borderSize", "logoSize", 
+			"correction", "color_foreground", "color_background")
+
+		#Shared by every barcode, so it is only made once
+		qrcode_correctionCatalogue = {
+			7: qrcode.constants.ERROR_CORRECT_L, 15: qrcode.constants.ERROR_CORRECT_M, 25: 
+			qrcode.constants.ERROR_CORRECT_Q, 30: qrcode.constants.ERROR_CORRECT_H, 
+			"L": qrcode.constants.ERROR_CORRECT_L, "M": qrcode.constants.ERROR_CORRECT_M, 
+			"Q": qrcode.constants.ERROR_CORRECT_Q, "H": qrcode.constants.ERROR_CORRECT_H, 
+			"l": qrcode.constants.ERROR_CORRECT_L, "m": qrcode.constants.ERROR_CORRECT_M, 
+			"q": qrcode.constants.ERROR_CORRECT_Q, "h": qrcode.constants.ERROR_CORRECT_H}
 
 		def __init__(self, parent, label, size = None, pixelSize = None, borderSize = None, 
 			correction = None, color_foreground = None, color_background = None):
@@ -65,16 +77,10 @@ class Barcode(API_Com.utilities.Utilities_Container):
 			self.size = size
 			self.pixelSize = pixelSize
 			self.borderSize = borderSize
+			self.logoSize = None
 			self.correction = correction
 			self.color_foreground = color_foreground
 			self.color_background = color_background
-			self.qrcode_correctionCatalogue = {
-			7: qrcode.constants.ERROR_CORRECT_L, 15: qrcode.constants.ERROR_CORRECT_M, 25: 
-			qrcode.constants.ERROR_CORRECT_Q, 30: qrcode.constants.ERROR_CORRECT_H, 
-			"L": qrcode.constants.ERROR_CORRECT_L, "M": qrcode.constants.ERROR_CORRECT_M, 
-			"Q": qrcode.constants.ERROR_CORRECT_Q, "H": qrcode.constants.ERROR_CORRECT_H, 
-			"l": qrcode.constants.ERROR_CORRECT_L, "m": qrcode.constants.ERROR_CORRECT_M, 
-			"q": qrcode.constants.ERROR_CORRECT_Q, "h": qrcode.constants.ERROR_CORRECT_H}
 
 		def getType(self, formatted = False):
 			"""Returns the barcode type."""
@@ -1,8 +1,18 @@
 __version__ = "2.0.0"
 
 #Import standard elements
+import os
 import sys
+import time
+import queue
+import select
+import asyncio
 import warnings
+import selectors
+import contextlib
+import collections
+import concurrent.futures
+import threading
 import traceback
 
 #Import communication elements for talking to other devices such as printers, the internet, a raspberry pi, etc.
@@ -11,723 +21,3077 @@ import socket
 import serial
 import serial.tools.list_ports
 
+import API_Com.capture
+import API_Com.framing
 import API_Com.utilities
 
 #Required Modules
 ##py -m pip install
 	# pyserial
 
-class ComPort(API_Com.utilities.Utilities_Container):
-	"""A controller for a ComPort connection.
-	Use: https://pyserial.readthedocs.io/en/latest/pyserial_api.html#module-serial.threaded
-	
-	______________________ EXAMPLE USE ______________________
-	
-	com = API_Com.build()
-	comPort = com.comPort[0]
+class PortInventory():
+	"""A cached list of the serial ports on this computer.
+	Listing the ports walks sysfs on Linux (or the registry on Windows), so it is only done again once the cache is older than 'ttl' seconds.
+	One inventory is shared by every ComPort, so they all use the same refresh.
 
-	comPort.setPort("COM12")
-	comPort.setBaudRate(115200)
-	comPort.setParity(None)
-	comPort.setDataBits(8)
-	comPort.setStopBits(1)
-	comPort.openComPort()
-
-	comPort.open()
-	data = comPort.read()
-	comPort.close()
-	_________________________________________________________
+	Example Use: portInventory.findId(1529, 16900)
+	Example Use: portInventory.invalidate()
+	"""
 
-	com = API_Com.build()
-	comPort = com.comPort[0]
+	def __init__(self, ttl = 5):
+		"""Defines the internal variables needed to run.
 
-	with comPort:
-		comPort.setPort("COM1")
-		comPort.open()
-		data = comPort.read()
+		ttl (float) - How many seconds the list of ports is good for
+		"""
 
-	with comPort.open("COM2"):
-		data = comPort.read()
-	_________________________________________________________
-	"""
+		self.ttl = ttl
 
-	def __init__(self, parent):
-		"""Defines the internal variables needed to run."""
+		self._lock = threading.Lock()
+		self._expires = 0 #When the cache needs to be refreshed, from time.monotonic()
+		self._generation = 0 #How many times the ports have been listed
 
-		#Initialize Inherited Modules
-		API_Com.utilities.Utilities_Container.__init__(self, parent)
+		self.portList = []
+		self.deviceCatalogue = {} #{device (str): port info}
+		self.idCatalogue = {} #{(vendor id (int), product id (int)): [port info]}
+		self.serialCatalogue = {} #{serial number (str): port info}
 
-	def getAll(self, include = [], exclude = [], portOnly = False):
-		"""Returns all connected com ports.
-		Modified code from Matt Williams on http://stackoverflow.com/questions/1205383/listing-serial-com-ports-on-windows.
+	def invalidate(self):
+		"""Makes the next lookup list the ports again.
 
-		Example Input: getAll()
-		Example Input: getAll(portOnly = True)
-		Example Input: getAll(include = ["vendorId", "productId"])
-		Example Input: getAll(exclude = ["serial", "description"])
+		Example Input: invalidate()
 		"""
 
-		if (include is None):
-			include = []
-		elif (not isinstance(include, (list, tuple, types.GeneratorType))):
-			include = [include]
+		self._expires = 0
 
-		if (exclude is None):
-			exclude = []
-		elif (not isinstance(exclude, (list, tuple, types.GeneratorType))):
-			exclude = [exclude]
+	def refresh(self, force = False):
+		"""Lists the ports again if the cache is too old.
 
-		valueList = []
-		catalogue = {"port": "device", "name": "name", "description": "description", "hwid": "hwid", 
-			"vendorId": "vid", "productId": "pid", "serial": "serial_number", "location": "location", 
-			"manufacturer": "manufacturer", "product": "product", "interface": "interface"}
+		force (bool) - If True: Lists the ports again even if the cache is still good
 
-		for item in serial.tools.list_ports.comports():
-			if (portOnly):
-				valueList.append(item.device)
-			else:
-				info = {}
-				for key, variable in catalogue.items():
-					if (((len(include) == 0) or (key in include)) and ((len(exclude) == 0) or (key not in exclude))):
-						info[key] = getattr(item, variable)
-				valueList.append(info)
+		Example Input: refresh()
+		Example Input: refresh(force = True)
+		"""
 
-		return valueList
+		generation = self._generation
+		if ((not force) and (time.monotonic() < self._expires)):
+			return
 
-	class Child(API_Com.utilities.Utilities_Child):
-		"""A COM Port connection."""
+		with self._lock:
+			#Another thread refreshed it while this one was waiting
+			if (self._generation != generation):
+				return
+			if ((not force) and (time.monotonic() < self._expires)):
+				return
 
-		def __init__(self, parent, label):
-			"""Defines the internal variables needed to run."""
+			portList = serial.tools.list_ports.comports()
+
+			deviceCatalogue = {}
+			idCatalogue = {}
+			serialCatalogue = {}
+			for item in portList:
+				deviceCatalogue[item.device] = item
+				if (item.vid is not None):
+					idCatalogue.setdefault((item.vid, item.pid), []).append(item)
+				if (item.serial_number):
+					serialCatalogue[item.serial_number] = item
+
+			#Swap them in all at once so readers never see a half built cache
+			self.portList, self.deviceCatalogue, self.idCatalogue, self.serialCatalogue = portList, deviceCatalogue, idCatalogue, serialCatalogue
+			self._generation += 1
+			self._expires = time.monotonic() + self.ttl
+
+	def _lookup(self, catalogueName, key, refreshOnMiss):
+		self.refresh()
+		value = getattr(self, catalogueName).get(key)
+		if ((value is None) and refreshOnMiss):
+			#The device may have been plugged in since the last refresh
+			self.refresh(force = True)
+			value = getattr(self, catalogueName).get(key)
+		return value
+
+	def getAll(self):
+		"""Returns the info for every port.
 
-			#Initialize Inherited Modules
-			API_Com.utilities.Utilities_Child.__init__(self, parent, label)
-		
-			#Internal Variables
-			self.device = serial.Serial()
+		Example Input: getAll()
+		"""
 
-			#These are the defaults for serial.Serial.__init__()
-			self.port         = None                #The device name or (vendor id (int), product id (int))
-			self.baudRate     = 9600                #Rate at which information is transferred
-			self.byteSize     = serial.EIGHTBITS    #Number of bits per bytes
-			self.parity       = serial.PARITY_NONE  #For error detection
-			self.stopBits     = serial.STOPBITS_ONE #Signals message end
-			self.timeoutRead  = None                #Read timeout. Makes the listener wait
-			self.timeoutWrite = None                #Write timeout. Makes the speaker wait
-			self.flowControl  = False               #Software flow control
-			self.rtsCts       = False               #Hardware (RTS/CTS) flow control
-			self.dsrDtr       = False               #Hardware (DSR/DTR) flow control
-			self.message      = None                #What is sent to the listener
-			self.vendorId     = None
-			self.productId    = None
+		self.refresh()
+		return self.portList
 
-		def __exit__(self, exc_type, exc_value, traceback):
-			"""Allows the user to use a with statement to make sure the socket connection gets closed after use."""
+	def findDevice(self, device, refreshOnMiss = True):
+		"""Returns the info for the port with the given device name, or None if there is not one.
 
-			self.close()
+		device (str) - The device name, such as "COM1" or "/dev/ttyUSB0"
+		refreshOnMiss (bool) - If True: Lists the ports again before giving up
 
-			return API_Com.utilities.Utilities_Container.__exit__(self, exc_type, exc_value, traceback)
+		Example Input: findDevice("COM1")
+		"""
 
-		def getPort(self):
-			"""Returns the port.
+		return self._lookup("deviceCatalogue", device, refreshOnMiss)
 
-			Example Input: getPort()
-			"""
+	def findId(self, vendorId, productId, refreshOnMiss = True):
+		"""Returns a list of info for the ports whose device has the given vendor id and product id.
 
-			return self.port
+		vendorId (int) - The vendor id
+		productId (int) - The product id
+		refreshOnMiss (bool) - If True: Lists the ports again before giving up
 
-		def getBaudRate(self):
-			"""Returns the baud rate.
+		Example Input: findId(1529, 16900)
+		"""
 
-			Example Input: getBaudRate()
-			"""
+		return self._lookup("idCatalogue", (vendorId, productId), refreshOnMiss) or []
 
-			return self.baudRate
+	def findSerial(self, serialNumber, refreshOnMiss = True):
+		"""Returns the info for the port whose device has the given serial number, or None if there is not one.
 
-		def getDataBits(self):
-			"""Overridden function for getByteSize().
+		serialNumber (str) - The serial number
+		refreshOnMiss (bool) - If True: Lists the ports again before giving up
 
-			Example Input: getDataBits()
-			"""
+		Example Input: findSerial("A6008isP")
+		"""
 
-			value = self.getByteSize()
-			return value
+		return self._lookup("serialCatalogue", serialNumber, refreshOnMiss)
 
-		def getByteSize(self):
-			"""Returns the byte size.
+portInventory = PortInventory()
 
-			Example Input: getByteSize()
-			"""
+class Listener():
+	"""Reads a COM Port on a separate thread, so nothing is lost while the caller is busy.
+	Each frame is handed to 'callback' if there is one; otherwise it is put in a bounded queue.
+	If the queue is full, the oldest frame is dropped to make room and counted in 'dropped'.
+	"""
 
-			#Format the byte size
-			if (self.byteSize == serial.FIVEBITS):
-				return 5
+	#How many seconds each read waits before checking if it should stop
+	pollInterval = 0.1
 
-			elif (self.byteSize == serial.SIXBITS):
-				return 6
+	def __init__(self, child, end = None, callback = None, queueSize = 1000, maxLength = None, decode = False):
+		"""Defines the internal variables needed to run.
 
-			elif (self.byteSize == serial.SEVENBITS):
-				return 7
+		child (ComPort.Child) - What to read from
+		end (bytes) - What marks the end of a frame
+			- If None: Each chunk of bytes is handed over as it arrives
+		callback (function) - What to call with each frame
+			- If None: Frames are put in the queue
+		queueSize (int) - How many frames the queue can hold
+		maxLength (int) - The longest a frame can be before it is handed over without 'end'
+		decode (bool) - If True: Frames are decoded before being handed over
+		"""
 
-			elif (self.byteSize == serial.EIGHTBITS):
-				return 8
+		self.child = child
+		self.end = end
+		self.callback = callback
+		self.maxLength = maxLength
+		self.decode = decode
 
-			else:
-				return self.byteSize
+		self.queue = queue.Queue(maxsize = queueSize)
+		self.stopEvent = threading.Event()
+		self.error = None #The error that stopped the thread
+		self.dropped = 0 #How many frames were dropped because the queue was full
 
-		def getParity(self):
-			"""Returns the parity.
+		self.oldTimeout = None
+		self.thread = threading.Thread(target = self.run, name = f"API_Com.ComPort.Listener.{child.label}", daemon = True)
 
-			Example Input: getParity()
-			"""
+	def start(self):
+		"""Starts the thread."""
 
-			if (self.parity == serial.PARITY_NONE):
-				return None
+		self.oldTimeout = self.child.device.timeout
+		self.child.device.timeout = self.pollInterval
+		self.thread.start()
 
-			elif (self.parity == serial.PARITY_ODD):
-				return "odd"
-			
-			elif (self.parity == serial.PARITY_EVEN):
-				return "even"
-			
-			elif (self.parity == serial.PARITY_MARK):
-				return "mark"
-			
-			elif (self.parity == serial.PARITY_SPACE):
-				return "space"
+	def stop(self, timeout = None):
+		"""Stops the thread and waits for it to finish.
 
-			else:
-				return self.parity
+		timeout (float) - How many seconds to wait for the thread to finish
+			- If None: Wait forever
+		"""
 
-		def getStopBits(self):
-			"""Returns the stop bits.
+		self.stopEvent.set()
+		if (self.thread.is_alive() and (self.thread is not threading.current_thread())):
+			self.thread.join(timeout)
 
-			Example Input: getStopBits()
-			"""
+		self.restoreTimeout()
 
-			if (self.stopBits == serial.STOPBITS_ONE):
-				return 1
+	def isAlive(self):
+		"""Returns if the thread is still reading."""
 
-			elif (self.stopBits == serial.STOPBITS_TWO):
-				return 2
+		return self.thread.is_alive()
 
-			elif (self.stopBits == serial.STOPBITS_ONE_POINT_FIVE):
-				return 1.5
+	def run(self):
+		"""Needed to listen on a separate thread so the caller is not tied up."""
 
-			else:
-				return self.stopBits
+		child = self.child
+		try:
+			while ((not self.stopEvent.is_set()) and child.isOpen()):
+				if (self.end is None):
+					if (not child._fill()):
+						continue
+					frame = bytes(child.readBuffer)
+					child.readBuffer.clear()
+				else:
+					frame = child._readFrame(self.end, maxLength = self.maxLength)
+					if (frame is None):
+						continue
 
-		def getTimeoutRead(self):
-			"""Returns the read timeout.
+				child.metrics.received(len(frame))
+				if (self.decode):
+					frame = frame.decode("utf-8")
 
-			Example Input: getTimeoutRead()
-			"""
+				if (self.callback is None):
+					self.put(frame)
+				else:
+					self.callback(frame)
 
-			return self.timeoutRead
+		except Exception as error:
+			if (not self.stopEvent.is_set()):
+				self.error = error
+				child.metrics.failed()
 
-		def getTimeoutWrite(self):
-			"""Returns the write timeout.
+		finally:
+			self.restoreTimeout()
 
-			Example Input: getTimeoutWrite()
-			"""
+	def restoreTimeout(self):
+		"""Puts back the read timeout the device had before listening started."""
 
-			return self.timeoutWrite
+		if (self.child.device.timeout == self.pollInterval):
+			try:
+				self.child.device.timeout = self.oldTimeout
+			except serial.SerialException:
+				#The device is gone, so there is nothing to put it back on
+				pass
 
-		def getFlow(self):
-			"""Returns the software flow control.
+	def put(self, frame):
+		"""Adds 'frame' to the queue, dropping the oldest frame if it is full."""
 
-			Example Input: getFlow()
-			"""
+		while True:
+			try:
+				self.queue.put_nowait(frame)
+				return
+			except queue.Full:
+				try:
+					self.queue.get_nowait()
+					self.dropped += 1
+				except queue.Empty:
+					pass
 
-			return self.flowControl
+	def checkError(self):
+		"""Raises the error that stopped the thread, if there was one."""
 
-		def getFlowS(self):
-			"""Returns the hardware flow control.
+		if (self.error is not None):
+			error, self.error = self.error, None
+			raise error
 
-			Example Input: getFlowS(True)
-			"""
+	def get(self, timeout = None):
+		"""Returns the next frame from the queue.
+		Returns None if 'timeout' runs out or the thread stopped with nothing left in the queue.
 
-			return self.rtsCts
+		timeout (float) - How many seconds to wait
+			- If None: Wait until there is a frame or the thread stops
+		"""
 
-		def getFlowR(self):
-			"""Returns the hardware flow control.
+		deadline = None if (timeout is None) else (time.monotonic() + timeout)
+		while True:
+			try:
+				return self.queue.get_nowait()
+			except queue.Empty:
+				pass
 
-			Example Input: getFlowR()
-			"""
+			self.checkError()
+			if (not self.isAlive()):
+				return None
 
-			return self.dsrDtr
+			wait = self.pollInterval
+			if (deadline is not None):
+				wait = min(wait, deadline - time.monotonic())
+				if (wait <= 0):
+					return None
 
-		def getMessage(self):
-			"""Returns the message that will be sent.
+			try:
+				return self.queue.get(timeout = wait)
+			except queue.Empty:
+				pass
+
+class Writer():
+	"""Writes to a COM Port on a separate thread, so send() does not wait for the device.
+	Messages that pile up in the queue are joined together and written with one write() call.
+	If the device already has more than 'highWater' bytes waiting to go out, writing pauses until it drains.
+	If the queue is full, send() waits for room.
+	"""
 
-			Example Input: getMessage()
-			"""
+	#How many seconds to wait before checking the device's output buffer again
+	pollInterval = 0.001
 
-			return self.message
+	def __init__(self, child, queueSize = 1000, coalesceSize = 4096, highWater = None):
+		"""Defines the internal variables needed to run.
 
-		def getId(self):
-			"""Returns the product id and vendor id of the device connected to the COM Port.
+		child (ComPort.Child) - What to write to
+		queueSize (int) - How many messages can wait to be written
+		coalesceSize (int) - How many bytes to join together into one write
+		highWater (int) - How many bytes the device can have waiting to go out before writing pauses
+			- If None: Does not check the device's output buffer
+		"""
 
-			Example Input: getId()
-			"""
+		self.child = child
+		self.coalesceSize = coalesceSize
+		self.highWater = highWater
 
-			return (self.vendorId, self.productId)
+		self.queue = queue.Queue(maxsize = queueSize)
+		self.stopEvent = threading.Event()
+		self.error = None #The error that stopped the thread
+		self.pending = 0 #How many bytes have been queued but not written
+		self.idle = threading.Condition()
 
-		#Setters
-		def setPort(self, value):
-			"""Changes the port.
+		self.thread = threading.Thread(target = self.run, name = f"API_Com.ComPort.Writer.{child.label}", daemon = True)
 
-			value (str) - The new port
+	def start(self):
+		"""Starts the thread."""
 
-			Example Input: setPort("COM1")
-			"""
+		self.thread.start()
 
-			self.port = value
+	def stop(self, flush = True, timeout = None):
+		"""Stops the thread and waits for it to finish.
 
-		def setBaudRate(self, value):
-			"""Changes the baud rate.
+		flush (bool) - If True: Writes what is still queued first
+			- If False: What is still queued is thrown away
+		timeout (float) - How many seconds to wait for the thread to finish
+			- If None: Wait forever
+		"""
 
-			value (int) - The new baud rate
+		if (not flush):
+			self.stopEvent.set()
 
-			Example Input: setBaudRate(9600)
-			"""
+		#Wakes the thread up if it is waiting for something to write
+		if (self.isAlive()):
+			try:
+				self.queue.put(None, timeout = timeout)
+			except queue.Full:
+				self.stopEvent.set()
 
-			self.baudRate = value
+		if (self.thread.is_alive() and (self.thread is not threading.current_thread())):
+			self.thread.join(timeout)
 
-		def setDataBits(self, value):
-			"""Overridden function for setByteSize().
+	def isAlive(self):
+		"""Returns if the thread is still writing."""
 
-			value (int) - The new byte size. Can be 5, 6, 7, or 8
+		return self.thread.is_alive()
 
-			Example Input: setDataBits(8)
-			"""
+	def put(self, message):
+		"""Queues 'message' to be written.
+		Returns False if the thread has stopped.
 
-			self.setByteSize(value)
+		message (bytes) - What to write
+		"""
 
-		def setByteSize(self, value):
-			"""Changes the byte size.
+		if ((self.error is not None) or (not self.isAlive())):
+			return False
 
-			value (int) - The new byte size. Can be 5, 6, 7, or 8
+		with self.idle:
+			self.pending += len(message)
+		self.queue.put(message)
+		return True
 
-			Example Input: setByteSize(8)
-			"""
+	def flush(self, timeout = None):
+		"""Waits until everything queued so far has been written.
+		Returns False if 'timeout' runs out first.
 
-			#Ensure that value is an integer
-			if (type(value) != int):
-				value = int(value)
+		timeout (float) - How many seconds to wait
+			- If None: Wait forever
+		"""
 
-			#Format the byte size
-			if (value == 5):
-				self.byteSize = serial.FIVEBITS
+		with self.idle:
+			return self.idle.wait_for(lambda: (self.pending <= 0) or self.stopEvent.is_set(), timeout)
+
+	def done(self, size):
+		"""Marks 'size' queued bytes as written or thrown away."""
+
+		with self.idle:
+			self.pending -= size
+			if (self.pending <= 0):
+				self.idle.notify_all()
+
+	def run(self):
+		"""Needed to write on a separate thread so the caller is not tied up."""
+
+		child = self.child
+		stopping = False
+		try:
+			while ((not stopping) and (not self.stopEvent.is_set())):
+				message = self.queue.get()
+				if (message is None):
+					break
+
+				#Join together whatever else is already waiting
+				batch = [message]
+				size = len(message)
+				while (size < self.coalesceSize):
+					try:
+						message = self.queue.get_nowait()
+					except queue.Empty:
+						break
+					if (message is None):
+						stopping = True
+						break
+					batch.append(message)
+					size += len(message)
 
-			elif (value == 6):
-				self.byteSize = serial.SIXBITS
+				try:
+					if (self.highWater is not None):
+						while ((child.device.out_waiting > self.highWater) and (not self.stopEvent.is_set())):
+							time.sleep(self.pollInterval)
+
+					data = batch[0] if (len(batch) == 1) else b"".join(batch)
+					start = time.perf_counter()
+					child.device.write(data)
+					seconds = time.perf_counter() - start
+					if (child.recorder is not None):
+						child.recorder.record(API_Com.capture.OUT, data)
+				finally:
+					self.done(size)
+
+				for message in batch:
+					child.metrics.sent(len(message))
+				child.metrics.record("send", seconds)
+
+		except Exception as error:
+			if (not self.stopEvent.is_set()):
+				self.error = error
+				child.metrics.failed()
+
+		finally:
+			self.stopEvent.set()
+
+			#Anything left will never be written
+			while True:
+				try:
+					message = self.queue.get_nowait()
+				except queue.Empty:
+					break
+				if (message is not None):
+					self.done(len(message))
+
+			with self.idle:
+				self.idle.notify_all()
+
+	def checkError(self):
+		"""Raises the error that stopped the thread, if there was one."""
+
+		if (self.error is not None):
+			error, self.error = self.error, None
+			raise error
+
+class Poller():
+	"""Watches every open COM Port in a container with one selector, so one thread can read them all.
+	What is read goes into each child's read buffer; if there is a callback, it is handed each frame instead.
+	Children without a file descriptor (such as on Windows) and children using startListen() or startTransact() are not watched.
+	If a port fails, it is not watched again until it has been closed; the error is kept in 'errorCatalogue'.
+	"""
 
-			elif (value == 7):
-				self.byteSize = serial.SEVENBITS
+	#How many seconds each wait lasts before checking if it should stop or if ports were opened
+	pollInterval = 0.1
 
-			elif (value == 8):
-				self.byteSize = serial.EIGHTBITS
+	#The most bytes to read from one port at a time
+	chunkSize = 65536
 
-		def setParity(self, value):
-			"""Changes the parity.
+	def __init__(self, container, end = None, callback = None, maxLength = None, decode = False):
+		"""Defines the internal variables needed to run.
+
+		container (ComPort) - Whose children to watch
+		end (bytes) - What marks the end of a frame
+			- If None: Each chunk of bytes is handed over as it arrives
+		callback (function) - What to call with each child and frame
+			- If None: What is read stays in the child's read buffer
+		maxLength (int) - The longest a frame can be before it is handed over without 'end'
+		decode (bool) - If True: Frames are decoded before being handed over
+		"""
+
+		self.container = container
+		self.end = end
+		self.callback = callback
+		self.maxLength = maxLength
+		self.decode = decode
+
+		self.selector = selectors.DefaultSelector()
+		self.registered = {} #{child: file descriptor}
+		self.errorCatalogue = {} #{child: the error that stopped it from being watched}
+
+		self.stopEvent = threading.Event()
+		self.error = None #The error that stopped the thread
+		self.thread = None
+
+	def start(self):
+		"""Starts the thread."""
+
+		self.thread = threading.Thread(target = self.run, name = "API_Com.ComPort.Poller", daemon = True)
+		self.thread.start()
+
+	def stop(self, timeout = None):
+		"""Stops the thread and waits for it to finish.
+
+		timeout (float) - How many seconds to wait for the thread to finish
+			- If None: Wait forever
+		"""
+
+		self.stopEvent.set()
+		if ((self.thread is not None) and self.thread.is_alive() and (self.thread is not threading.current_thread())):
+			self.thread.join(timeout)
+
+	def isAlive(self):
+		"""Returns if the thread is still watching."""
+
+		return (self.thread is not None) and self.thread.is_alive()
+
+	def close(self):
+		"""Stops watching every port."""
+
+		self.selector.close()
+		self.registered.clear()
+
+	def update(self):
+		"""Starts watching ports that were opened and stops watching ones that were closed or removed."""
+
+		wanted = {}
+		for child in list(self.container):
+			if ((not child.isOpen()) or child.isListening() or child.isTransacting()):
+				self.errorCatalogue.pop(child, None)
+				continue
+			if (child in self.errorCatalogue):
+				continue
+
+			fileno = child._getFileno()
+			if (fileno is not None):
+				wanted[child] = fileno
+
+		#Forget old ones first, in case a closed port's file descriptor was given to a new one
+		for child, fileno in tuple(self.registered.items()):
+			if (wanted.get(child) != fileno):
+				self.forget(child)
+
+		for child, fileno in wanted.items():
+			if (child not in self.registered):
+				self.selector.register(fileno, selectors.EVENT_READ, child)
+				self.registered[child] = fileno
+
+	def forget(self, child):
+		"""Stops watching 'child'."""
+
+		fileno = self.registered.pop(child, None)
+		if (fileno is not None):
+			try:
+				self.selector.unregister(fileno)
+			except (KeyError, ValueError):
+				pass
+
+	def poll(self, timeout = None):
+		"""Waits for any port to have something to read and moves it into that child's read buffer.
+		Returns a list of the children that were read.
+
+		timeout (float) - How many seconds to wait
+			- If None: Wait until something can be read
+		"""
+
+		self.update()
+		if (not self.registered):
+			return []
+
+		childList = []
+		for key, events in self.selector.select(timeout):
+			child = key.data
+			try:
+				data = os.read(key.fd, self.chunkSize)
+				if (not data):
+					errorMessage = f"Device reports readiness to read but returned no data (device disconnected?) for {child.__repr__()}"
+					raise serial.SerialException(errorMessage)
+			except BlockingIOError:
+				continue
+			except Exception as error:
+				self.forget(child)
+				self.errorCatalogue[child] = error
+				child.metrics.failed()
+				continue
+
+			child.readBuffer += data
+			if (child.recorder is not None):
+				child.recorder.record(API_Com.capture.IN, data)
+			childList.append(child)
+
+		return childList
+
+	def dispatch(self, child):
+		"""Hands each complete frame in the child's read buffer to the callback."""
+
+		while True:
+			if (self.end is None):
+				if (not child.readBuffer):
+					return
+				frame = bytes(child.readBuffer)
+				child.readBuffer.clear()
+			else:
+				frame = child._takeFrame(self.end, maxLength = self.maxLength)
+				if (frame is None):
+					return
+
+			child.metrics.received(len(frame))
+			if (self.decode):
+				frame = frame.decode("utf-8")
+			self.callback(child, frame)
+
+	def run(self):
+		"""Needed to watch on a separate thread so the caller is not tied up."""
+
+		try:
+			while (not self.stopEvent.is_set()):
+				childList = self.poll(timeout = self.pollInterval)
+				if (not self.registered):
+					self.stopEvent.wait(self.pollInterval)
+					continue
+
+				if (self.callback is not None):
+					for child in childList:
+						self.dispatch(child)
+
+		except Exception as error:
+			if (not self.stopEvent.is_set()):
+				self.error = error
+
+		finally:
+			self.close()
+
+	def checkError(self):
+		"""Raises the error that stopped the thread, if there was one."""
+
+		if (self.error is not None):
+			error, self.error = self.error, None
+			raise error
+
+class Transaction():
+	"""A command waiting for its reply; see Transactor."""
+
+	__slots__ = ("command", "timeout", "retries", "backoff", "match", "decode", "attempts", "sentAt", "deadline", "notBefore", "future")
+
+	def __init__(self, command, timeout = 1, retries = 0, backoff = 0.1, match = None, decode = None):
+		"""Defines the internal variables needed to run.
+
+		command (str) - What to send
+		timeout (float) - How many seconds to wait for the reply to each attempt
+		retries (int) - How many more times to send the command if there is no reply
+		backoff (float) - How many seconds to wait before the first retry; this doubles for each retry after
+		match (function) - Returns if a reply belongs to this command
+			- If None: Uses the Transactor's
+		decode (bool) - If True: The reply is decoded
+			- If None: Uses the Transactor's
+		"""
+
+		self.command = command
+		self.timeout = timeout
+		self.retries = retries
+		self.backoff = backoff
+		self.match = match
+		self.decode = decode
+
+		self.attempts = 0
+		self.sentAt = None #When the last attempt was sent, from time.perf_counter()
+		self.deadline = None #When the last attempt times out, from time.monotonic()
+		self.notBefore = 0 #When the next attempt can be sent, from time.monotonic()
+		self.future = concurrent.futures.Future()
+
+class Transactor():
+	"""Sends commands to a COM Port and matches each reply to the command that asked for it.
+	Up to 'maxInFlight' commands can be waiting for a reply at once; the rest wait their turn in order.
+	Each reply is given to the oldest command that 'match' accepts it for; if there is no 'match', replies are taken in order.
+	A command that times out is sent again after a backoff until it runs out of retries.
+	"""
+
+	#How many seconds each read waits before checking for timeouts
+	pollInterval = 0.05
+
+	def __init__(self, child, end = b"\n", maxInFlight = 1, match = None, decode = True, maxLength = None):
+		"""Defines the internal variables needed to run.
+
+		child (ComPort.Child) - What to talk to
+		end (bytes) - What marks the end of a reply
+		maxInFlight (int) - How many commands can be waiting for a reply at once
+		match (function) - Returns if a reply belongs to a command, such as myFunction(command, reply)
+			- If None: Replies are matched to commands in the order they were sent
+		decode (bool) - If True: Replies are decoded
+		maxLength (int) - The longest a reply can be before it is returned without 'end'
+		"""
+
+		self.child = child
+		self.end = end
+		self.maxInFlight = max(1, maxInFlight)
+		self.match = match
+		self.decode = decode
+		self.maxLength = maxLength
+
+		self.lock = threading.RLock()
+		self.waiting = collections.deque() #Commands that have not been sent yet
+		self.inFlight = [] #Commands that were sent and are waiting for a reply, oldest first
+		self.unmatched = 0 #How many replies did not belong to any command
+
+		self.stopEvent = threading.Event()
+		self.error = None #The error that stopped the thread
+		self.thread = threading.Thread(target = self.run, name = f"API_Com.ComPort.Transactor.{child.label}", daemon = True)
+
+	def start(self):
+		"""Starts the thread."""
+
+		self.thread.start()
+
+	def stop(self, timeout = None):
+		"""Stops the thread and waits for it to finish.
+		Commands that are still waiting are cancelled.
+
+		timeout (float) - How many seconds to wait for the thread to finish
+			- If None: Wait forever
+		"""
+
+		self.stopEvent.set()
+		if (self.thread.is_alive() and (self.thread is not threading.current_thread())):
+			self.thread.join(timeout)
+
+	def isAlive(self):
+		"""Returns if the thread is still running."""
+
+		return self.thread.is_alive()
+
+	def submit(self, command, timeout = 1, retries = 0, backoff = 0.1, match = None, decode = None):
+		"""Queues 'command' to be sent and returns a concurrent.futures.Future for its reply.
+		The future raises TimeoutError if no reply comes after every retry.
+		'match' and 'decode' are only for this command; if None, the Transactor's are used.
+		"""
+
+		transaction = Transaction(command, timeout = timeout, retries = retries, backoff = backoff, match = match, decode = decode)
+		if (not self.isAlive()):
+			transaction.future.set_exception(self.error or serial.SerialException(f"Not sending commands to {self.child.__repr__()}"))
+			return transaction.future
+
+		with self.lock:
+			self.waiting.append(transaction)
+			self.sendWaiting()
+		return transaction.future
+
+	def sendWaiting(self):
+		"""Sends waiting commands until 'maxInFlight' of them are waiting for a reply."""
+
+		with self.lock:
+			while (self.waiting and (len(self.inFlight) < self.maxInFlight)):
+				transaction = self.waiting[0]
+				now = time.monotonic()
+				if (transaction.notBefore > now):
+					return
+
+				self.waiting.popleft()
+				if ((transaction.attempts == 0) and (not transaction.future.set_running_or_notify_cancel())):
+					continue
+
+				transaction.attempts += 1
+				transaction.sentAt = time.perf_counter()
+				transaction.deadline = now + transaction.timeout
+				if (not self.child.send(transaction.command)):
+					transaction.future.set_exception(serial.SerialException(f"Could not send {transaction.command!r} to {self.child.__repr__()}"))
+					continue
+				self.inFlight.append(transaction)
+
+	def expire(self):
+		"""Retries or gives up on commands whose reply did not come in time."""
+
+		now = time.monotonic()
+		with self.lock:
+			for transaction in tuple(self.inFlight):
+				if (transaction.deadline > now):
+					continue
+
+				self.inFlight.remove(transaction)
+				if (transaction.attempts <= transaction.retries):
+					transaction.notBefore = now + transaction.backoff * 2 ** (transaction.attempts - 1)
+					self.waiting.appendleft(transaction)
+				else:
+					self.child.metrics.failed()
+					transaction.future.set_exception(TimeoutError(f"No reply to {transaction.command!r} from {self.child.__repr__()} after {transaction.attempts} attempts"))
+
+			self.sendWaiting()
+
+	def resolve(self, frame):
+		"""Gives 'frame' to the command it is the reply to."""
+
+		self.child.metrics.received(len(frame))
+		replyCatalogue = {False: frame} #{decoded (bool): reply}; it is only decoded once, if a command wants it decoded
+
+		with self.lock:
+			for transaction in self.inFlight:
+				decode = self.decode if (transaction.decode is None) else transaction.decode
+				if (decode not in replyCatalogue):
+					replyCatalogue[decode] = frame.decode("utf-8")
+				reply = replyCatalogue[decode]
+
+				match = self.match if (transaction.match is None) else transaction.match
+				if ((match is None) or match(transaction.command, reply)):
+					break
+			else:
+				self.unmatched += 1
+				return
+
+			self.inFlight.remove(transaction)
+			self.child.metrics.record("request", time.perf_counter() - transaction.sentAt)
+			transaction.future.set_result(reply)
+
+			self.sendWaiting()
+
+	def nextWake(self):
+		"""Returns when the thread next needs to check for timeouts or retries, from time.monotonic()."""
+
+		wake = time.monotonic() + self.pollInterval
+		with self.lock:
+			for transaction in self.inFlight:
+				wake = min(wake, transaction.deadline)
+			if (self.waiting):
+				wake = min(wake, max(self.waiting[0].notBefore, time.monotonic()))
+		return wake
+
+	def run(self):
+		"""Needed to read replies on a separate thread so the caller is not tied up."""
+
+		child = self.child
+		try:
+			while ((not self.stopEvent.is_set()) and child.isOpen()):
+				frame = child._readFrameBefore(self.end, self.nextWake(), maxLength = self.maxLength)
+				if (frame is not None):
+					self.resolve(frame)
+				self.expire()
+
+		except Exception as error:
+			if (not self.stopEvent.is_set()):
+				self.error = error
+				child.metrics.failed()
+
+		finally:
+			self.stopEvent.set()
+			with self.lock:
+				transactionList = list(self.inFlight) + list(self.waiting)
+				self.inFlight.clear()
+				self.waiting.clear()
+
+			for transaction in transactionList:
+				if (self.error is not None):
+					transaction.future.set_exception(self.error)
+				elif (not transaction.future.cancel()):
+					transaction.future.set_exception(serial.SerialException(f"Stopped sending commands to {child.__repr__()}"))
+
+	def checkError(self):
+		"""Raises the error that stopped the thread, if there was one."""
+
+		if (self.error is not None):
+			error, self.error = self.error, None
+			raise error
+
+class Watcher():
+	"""Notices serial devices being plugged in and unplugged, and opens lost ports again once their device comes back.
+	Only children that were opened by (vendor id, product id) or serial number are opened again, with the same settings,
+	since a device often comes back on a different port.
+	On Linux the kernel's device events wake it up right away; elsewhere it lists the ports every 'interval' seconds.
+
+	'callback' is called on the watching thread as callback(event, item, child), where 'event' is:
+		"arrival" - A port appeared; 'child' is None
+		"removal" - A port disappeared; 'child' is None
+		"lost" - A child's port disappeared, so it was closed
+		"reopen" - A lost child was opened again
+	"""
+
+	#Linux kernel device events; see netlink(7)
+	NETLINK_KOBJECT_UEVENT = 15
+
+	def __init__(self, container, callback = None, interval = 1, reopen = True):
+		"""Defines the internal variables needed to run.
+
+		container (ComPort) - Whose children to look after
+		callback (function) - What to call with each event
+		interval (float) - How many seconds between checks
+		reopen (bool) - If True: Lost children are opened again when their device comes back
+		"""
+
+		self.container = container
+		self.callback = callback
+		self.interval = interval
+		self.reopen = reopen
+
+		self.deviceCatalogue = {item.device: item for item in portInventory.getAll()} #{device (str): port info}
+		self.lost = set() #Children whose port disappeared while they were open
+		self.uevents = None
+
+		self.stopEvent = threading.Event()
+		self.error = None #The error that stopped the thread
+		self.thread = threading.Thread(target = self.run, name = "API_Com.ComPort.Watcher", daemon = True)
+
+	def start(self):
+		"""Starts the thread."""
+
+		self.uevents = self.openUevents()
+		self.thread.start()
+
+	def stop(self, timeout = None):
+		"""Stops the thread and waits for it to finish.
+
+		timeout (float) - How many seconds to wait for the thread to finish
+			- If None: Wait forever
+		"""
+
+		self.stopEvent.set()
+		if (self.thread.is_alive() and (self.thread is not threading.current_thread())):
+			self.thread.join(timeout)
+
+	def isAlive(self):
+		"""Returns if the thread is still watching."""
+
+		return self.thread.is_alive()
+
+	@classmethod
+	def openUevents(cls):
+		"""Returns a socket that gets the kernel's device events, or None if there is not one."""
+
+		if (not sys.platform.startswith("linux")):
+			return None
+
+		try:
+			uevents = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, cls.NETLINK_KOBJECT_UEVENT)
+		except (AttributeError, OSError):
+			return None
+
+		try:
+			uevents.bind((0, 1))
+			uevents.setblocking(False)
+		except OSError:
+			uevents.close()
+			return None
+		return uevents
+
+	def wait(self):
+		"""Waits until it is time to check again.
+		Returns early if the kernel says a tty was added or removed.
+		"""
+
+		if (self.uevents is None):
+			self.stopEvent.wait(self.interval)
+			return
+
+		if (not select.select([self.uevents], [], [], self.interval)[0]):
+			return
+
+		#Only wake up for serial devices
+		while True:
+			try:
+				message = self.uevents.recv(8192)
+			except BlockingIOError:
+				return
+			if (b"SUBSYSTEM=tty" in message):
+				break
+
+		#Take in the rest of the burst so one plug in is one check
+		while True:
+			try:
+				self.uevents.recv(8192)
+			except BlockingIOError:
+				return
+
+	def emit(self, event, item, child = None):
+		if (self.callback is not None):
+			self.callback(event, item, child)
+
+	def check(self):
+		"""Lists the ports, sends out events for what changed, and handles lost children."""
+
+		portInventory.refresh(force = True)
+		deviceCatalogue = {item.device: item for item in portInventory.portList}
+
+		removedList = [item for device, item in self.deviceCatalogue.items() if (device not in deviceCatalogue)]
+		arrivedList = [item for device, item in deviceCatalogue.items() if (device not in self.deviceCatalogue)]
+		self.deviceCatalogue = deviceCatalogue
+
+		for item in removedList:
+			self.emit("removal", item)
+			for child in list(self.container):
+				if ((child.port == item.device) and child.isOpen()):
+					try:
+						child.close()
+					except Exception:
+						pass
+					child.metrics.failed()
+					if (child.binding is not None):
+						self.lost.add(child)
+					self.emit("lost", item, child)
+
+		for item in arrivedList:
+			self.emit("arrival", item)
+
+		if (self.reopen and self.lost):
+			for child in tuple(self.lost):
+				if (child.isOpen()):
+					#Someone else already opened it
+					self.lost.discard(child)
+					continue
+
+				if (not isinstance(child.binding, str)):
+					#Do not take a port that a sibling with the same kind of device already has open
+					busy = {sibling.port for sibling in list(self.container) if ((sibling is not child) and sibling.isOpen())}
+					if (all((item.device in busy) for item in portInventory.findId(*child.binding, refreshOnMiss = False))):
+						continue
+
+				try:
+					if (isinstance(child.binding, str)):
+						error = child.open(serialNumber = child.binding, autoEmpty = False)
+					else:
+						error = child.open(child.binding, autoEmpty = False)
+				except ValueError:
+					#Its device has not come back yet
+					continue
+				except Exception:
+					error = True
+
+				if ((error is None) and child.isOpen()):
+					self.lost.discard(child)
+					self.emit("reopen", portInventory.findDevice(child.port, refreshOnMiss = False), child)
+
+	def run(self):
+		"""Needed to watch on a separate thread so the caller is not tied up."""
+
+		try:
+			while (not self.stopEvent.is_set()):
+				self.wait()
+				if (self.stopEvent.is_set()):
+					break
+				self.check()
+
+		except Exception as error:
+			if (not self.stopEvent.is_set()):
+				self.error = error
+
+		finally:
+			if (self.uevents is not None):
+				self.uevents.close()
+
+	def checkError(self):
+		"""Raises the error that stopped the thread, if there was one."""
+
+		if (self.error is not None):
+			error, self.error = self.error, None
+			raise error
+
+class PortPool():
+	"""Keeps COM Ports open between uses, so each job does not pay to open the port again.
+	One child is kept per port; checking it out with different settings changes them on the open port.
+	Only one thread can have a port checked out at a time; others wait for it to be checked in.
+
+	Example Use:
+		with comPort.pool.use("/dev/ttyUSB0", baudRate = 115200) as child:
+			child.request("*IDN?\n")
+	"""
+
+	#Settings that can be given to checkout(), and the function of the child that changes each one
+	##{setting (str): function name (str)}
+	settingCatalogue = {
+		"baudRate": "setBaudRate",
+		"byteSize": "setByteSize",
+		"parity": "setParity",
+		"stopBits": "setStopBits",
+		"timeoutRead": "setTimeoutRead",
+		"timeoutWrite": "setTimeoutWrite",
+		"flowControl": "setFlow",
+		"rtsCts": "setFlowS",
+		"dsrDtr": "setFlowR",
+	}
+
+	#What each setting goes back to when checkout() is not given it, so one job's settings do not carry over to the next
+	##These are the same as a new child has
+	##{setting (str): value}
+	defaultCatalogue = {
+		"baudRate": 9600,
+		"byteSize": serial.EIGHTBITS,
+		"parity": serial.PARITY_NONE,
+		"stopBits": serial.STOPBITS_ONE,
+		"timeoutRead": None,
+		"timeoutWrite": None,
+		"flowControl": False,
+		"rtsCts": False,
+		"dsrDtr": False,
+	}
+
+	def __init__(self, container):
+		"""Defines the internal variables needed to run.
+
+		container (ComPort) - Where to add the children that are kept open
+		"""
+
+		self.container = container
+
+		self.condition = threading.Condition()
+		self.childCatalogue = {} #{port (str or tuple): child}
+		self.busy = {} #{port (str or tuple): thread that has it checked out}
+		self.checkouts = 0 #How many times a port was checked out
+		self.opens = 0 #How many of those had to open the port
+
+	def checkout(self, port, timeout = None, **settings):
+		"""Returns an open child for 'port' with the given settings.
+		If the port is checked out by another thread, waits for it to be checked in.
+		Raises TimeoutError if 'timeout' runs out first.
+
+		port (str) - Which port to use; can be anything open() takes, such as (vendorId, productId)
+		timeout (float) - How many seconds to wait for the port
+			- If None: Wait forever
+		settings (any) - What to set before it is used, such as baudRate = 115200; see settingCatalogue
+			- Settings that are not given go back to defaultCatalogue
+
+		Example Input: checkout("COM1")
+		Example Input: checkout("/dev/ttyUSB0", baudRate = 115200, parity = "even", timeoutRead = 500)
+		"""
+
+		for setting in settings:
+			if (setting not in self.settingCatalogue):
+				errorMessage = f"There is no setting {setting!r}; use one of {list(self.settingCatalogue)}"
+				raise KeyError(errorMessage)
+
+		key = tuple(port) if isinstance(port, list) else port
+		with self.condition:
+			if (not self.condition.wait_for(lambda: key not in self.busy, timeout)):
+				errorMessage = f"{port} is still checked out after {timeout} seconds"
+				raise TimeoutError(errorMessage)
+
+			self.busy[key] = threading.current_thread()
+			child = self.childCatalogue.get(key)
+			if (child is None):
+				child = self.childCatalogue[key] = self.container.add()
+
+		#The port is reserved, so it can be set up without holding the lock
+		try:
+			for setting, value in self.defaultCatalogue.items():
+				if (setting not in settings):
+					setattr(child, setting, value)
+			for setting, value in settings.items():
+				getattr(child, self.settingCatalogue[setting])(value)
+
+			if (child.isOpen()):
+				#Only changes what is different from the last job
+				child.applySettings()
+			else:
+				error = child.open(port, autoEmpty = False)
+				if (error is not None):
+					raise error
+				with self.condition:
+					self.opens += 1
+
+		except Exception:
+			with self.condition:
+				self.childCatalogue.pop(key, None)
+				del self.busy[key]
+				self.condition.notify_all()
+			if (child.isOpen()):
+				child.close()
+			child.remove()
+			raise
+
+		with self.condition:
+			self.checkouts += 1
+		return child
+
+	def checkin(self, child):
+		"""Gives back a child from checkout(), so another job can use it.
+		It stays open; if it was closed, it is dropped from the pool.
+
+		child (ComPort.Child) - What checkout() returned
+
+		Example Input: checkin(child)
+		"""
+
+		with self.condition:
+			for key, item in self.childCatalogue.items():
+				if (item is child):
+					break
+			else:
+				errorMessage = f"{child.__repr__()} was not checked out of {self.__repr__()}"
+				raise KeyError(errorMessage)
+
+			self.busy.pop(key, None)
+			if (not child.isOpen()):
+				del self.childCatalogue[key]
+			self.condition.notify_all()
+
+		if (not child.isOpen()):
+			child.remove()
+
+	@contextlib.contextmanager
+	def use(self, port, timeout = None, **settings):
+		"""Checks out 'port' for a with statement, and checks it back in afterwards.
+
+		Example Input: use("COM1", baudRate = 115200)
+		"""
+
+		child = self.checkout(port, timeout = timeout, **settings)
+		try:
+			yield child
+		finally:
+			self.checkin(child)
+
+	def close(self):
+		"""Closes and removes every port that is not checked out.
+
+		Example Input: close()
+		"""
+
+		with self.condition:
+			childList = [(key, child) for key, child in self.childCatalogue.items() if (key not in self.busy)]
+			for key, child in childList:
+				del self.childCatalogue[key]
+
+		for key, child in childList:
+			if (child.isOpen()):
+				child.close()
+			child.remove()
+
+	def stats(self):
+		"""Returns how the pool is being used.
+
+		Example Input: stats()
+		"""
+
+		with self.condition:
+			return {"ports": len(self.childCatalogue), "checkedOut": len(self.busy), "checkouts": self.checkouts, "opens": self.opens}
+
+class ComPort(API_Com.utilities.Utilities_Container):
+	"""A controller for a ComPort connection.
+	Use: https://pyserial.readthedocs.io/en/latest/pyserial_api.html#module-serial.threaded
+	
+	______________________ EXAMPLE USE ______________________
+	
+	com = API_Com.build()
+	comPort = com.comPort[0]
+
+	comPort.setPort("COM12")
+	comPort.setBaudRate(115200)
+	comPort.setParity(None)
+	comPort.setDataBits(8)
+	comPort.setStopBits(1)
+	comPort.openComPort()
+
+	comPort.open()
+	data = comPort.read()
+	comPort.close()
+	_________________________________________________________
+
+	com = API_Com.build()
+	comPort = com.comPort[0]
+
+	with comPort:
+		comPort.setPort("COM1")
+		comPort.open()
+		data = comPort.read()
+
+	with comPort.open("COM2"):
+		data = comPort.read()
+	_________________________________________________________
+	"""
+
+	indexCatalogue = ("port", ("vendorId", "productId"))
+
+	def __init__(self, parent):
+		"""Defines the internal variables needed to run."""
+
+		#Initialize Inherited Modules
+		API_Com.utilities.Utilities_Container.__init__(self, parent)
+
+		#Internal Variables
+		self.poller = None #Watches every open port with one selector; see poll() and startPoll()
+		self.watcher = None #Opens lost ports again when their device is plugged back in; see startWatch()
+		self.pool = PortPool(self) #Keeps ports open between uses; see checkout()
+
+	def getAll(self, include = [], exclude = [], portOnly = False, refresh = False):
+		"""Returns all connected com ports.
+		Modified code from Matt Williams on http://stackoverflow.com/questions/1205383/listing-serial-com-ports-on-windows.
+
+		refresh (bool) - If True: Lists the ports again instead of using the cached list
+
+		Example Input: getAll()
+		Example Input: getAll(refresh = True)
+		Example Input: getAll(portOnly = True)
+		Example Input: getAll(include = ["vendorId", "productId"])
+		Example Input: getAll(exclude = ["serial", "description"])
+		"""
+
+		if (include is None):
+			include = []
+		elif (not isinstance(include, (list, tuple, types.GeneratorType))):
+			include = [include]
+
+		if (exclude is None):
+			exclude = []
+		elif (not isinstance(exclude, (list, tuple, types.GeneratorType))):
+			exclude = [exclude]
+
+		valueList = []
+		catalogue = {"port": "device", "name": "name", "description": "description", "hwid": "hwid", 
+			"vendorId": "vid", "productId": "pid", "serial": "serial_number", "location": "location", 
+			"manufacturer": "manufacturer", "product": "product", "interface": "interface"}
+
+		if (refresh):
+			portInventory.refresh(force = True)
+
+		for item in portInventory.getAll():
+			if (portOnly):
+				valueList.append(item.device)
+			else:
+				info = {}
+				for key, variable in catalogue.items():
+					if (((len(include) == 0) or (key in include)) and ((len(exclude) == 0) or (key not in exclude))):
+						info[key] = getattr(item, variable)
+				valueList.append(info)
+
+		return valueList
+
+	def invalidatePorts(self):
+		"""Makes the next lookup list the ports again, such as after a device is plugged in.
+
+		Example Input: invalidatePorts()
+		"""
+
+		portInventory.invalidate()
+
+	#Polling
+	def poll(self, timeout = None):
+		"""Waits for any open COM Port to have something to read, using one selector for all of them.
+		What is read is put in each child's read buffer, so the next read() on that child returns it without waiting.
+		Returns a list of the children that were read.
+
+		timeout (float) - How many seconds to wait
+			- If None: Wait until something can be read
+
+		Example Input: poll()
+		Example Input: poll(timeout = 0)
+		"""
+
+		if ((self.poller is not None) and self.poller.isAlive()):
+			errorMessage = f"{self.__repr__()} is already being polled on a separate thread; use stopPoll() first"
+			raise RuntimeError(errorMessage)
+
+		if ((self.poller is not None) and (self.poller.thread is not None)):
+			#The polling thread stopped on its own
+			self.stopPoll()
+
+		if (self.poller is None):
+			self.poller = Poller(self)
+		return self.poller.poll(timeout = timeout)
+
+	def startPoll(self, callback, end = None, maxLength = None, decode = False):
+		"""Watches every open COM Port from one separate thread, no matter how many there are.
+		Ports opened later are picked up on their own.
+		If the thread runs into an error, it stops and the error is raised by stopPoll().
+
+		callback (function) - What to call with each child and frame, such as myFunction(child, frame). It is called on the polling thread
+		end (str) - What marks the end of a frame
+			- If None: Each chunk of bytes is handed over as it arrives
+		maxLength (int) - The longest a frame can be before it is handed over without 'end'
+		decode (bool) - If True: Frames are decoded before being handed over
+
+		Example Input: startPoll(myFunction)
+		Example Input: startPoll(myFunction, end = "\r\n", decode = True)
+		"""
+
+		if ((self.poller is not None) and self.poller.isAlive()):
+			warnings.warn(f"Already polling {self.__repr__()}", Warning, stacklevel = 2)
+			return
+
+		if ((end is not None) and (not isinstance(end, bytes))):
+			end = end.encode("utf-8")
+
+		if (self.poller is not None):
+			self.poller.close()
+		self.poller = Poller(self, end = end, callback = callback, maxLength = maxLength, decode = decode)
+		self.poller.start()
+
+	def stopPoll(self, timeout = None):
+		"""Stops watching the COM Ports on a separate thread.
+		Raises the error that stopped the thread, if there was one.
+
+		timeout (float) - How many seconds to wait for the thread to finish
+			- If None: Wait forever
+
+		Example Input: stopPoll()
+		"""
+
+		if (self.poller is None):
+			return
+
+		poller, self.poller = self.poller, None
+		poller.stop(timeout = timeout)
+		poller.close()
+		poller.checkError()
+
+	def isPolling(self):
+		"""Returns if the COM Ports are being watched on a separate thread.
+
+		Example Input: isPolling()
+		"""
+
+		return (self.poller is not None) and self.poller.isAlive()
+
+	#Pool
+	def checkout(self, port, timeout = None, **settings):
+		"""Returns an open child for 'port' from the pool, so the port does not have to be opened again for each job.
+		Give it back with checkin() when done.
+
+		port (str) - Which port to use; can be anything open() takes
+		timeout (float) - How many seconds to wait if another thread has the port checked out
+			- If None: Wait forever
+		settings (any) - What to set before it is used, such as baudRate = 115200
+
+		Example Input: checkout("COM1")
+		Example Input: checkout("/dev/ttyUSB0", baudRate = 115200, timeoutRead = 500)
+		"""
+
+		return self.pool.checkout(port, timeout = timeout, **settings)
+
+	def checkin(self, child):
+		"""Gives back a child from checkout(); it stays open for the next job.
+
+		Example Input: checkin(child)
+		"""
+
+		self.pool.checkin(child)
+
+	#Hotplug
+	def startWatch(self, callback = None, interval = 1, reopen = True):
+		"""Watches for serial devices being plugged in and unplugged on a separate thread.
+		Children opened by (vendor id, product id) or serial number are opened again with the same settings when their device comes back.
+		Anything running on a lost child, such as startListen(), is stopped and is not started again.
+
+		callback (function) - What to call with each event, such as myFunction(event, item, child); see Watcher
+		interval (float) - How many seconds between checks
+		reopen (bool) - If True: Lost children are opened again when their device comes back
+
+		Example Input: startWatch()
+		Example Input: startWatch(myFunction, interval = 0.5)
+		"""
+
+		if ((self.watcher is not None) and self.watcher.isAlive()):
+			warnings.warn(f"Already watching for devices on {self.__repr__()}", Warning, stacklevel = 2)
+			return
+
+		self.watcher = Watcher(self, callback = callback, interval = interval, reopen = reopen)
+		self.watcher.start()
+
+	def stopWatch(self, timeout = None):
+		"""Stops watching for serial devices being plugged in and unplugged.
+		Raises the error that stopped the thread, if there was one.
+
+		timeout (float) - How many seconds to wait for the thread to finish
+			- If None: Wait forever
+
+		Example Input: stopWatch()
+		"""
+
+		if (self.watcher is None):
+			return
+
+		watcher, self.watcher = self.watcher, None
+		watcher.stop(timeout = timeout)
+		watcher.checkError()
+
+	def isWatching(self):
+		"""Returns if serial devices are being watched for on a separate thread.
+
+		Example Input: isWatching()
+		"""
+
+		return (self.watcher is not None) and self.watcher.isAlive()
+
+	class Child(API_Com.utilities.Utilities_Child):
+		"""A COM Port connection."""
+
+		__slots__ = ("device", "port", "baudRate", "byteSize", "parity", "stopBits", "timeoutRead", "timeoutWrite", 
+			"flowControl", "rtsCts", "dsrDtr", "message", "messageCache", "vendorId", "productId", "serialNumber", "binding", "readBuffer", "listener", "writer", "transactor", "recorder")
+
+		def __init__(self, parent, label):
+			"""Defines the internal variables needed to run."""
+
+			#Initialize Inherited Modules
+			API_Com.utilities.Utilities_Child.__init__(self, parent, label)
+		
+			#Internal Variables
+			self.device = serial.Serial()
+
+			#These are the defaults for serial.Serial.__init__()
+			self.port         = None                #The device name or (vendor id (int), product id (int))
+			self.baudRate     = 9600                #Rate at which information is transferred
+			self.byteSize     = serial.EIGHTBITS    #Number of bits per bytes
+			self.parity       = serial.PARITY_NONE  #For error detection
+			self.stopBits     = serial.STOPBITS_ONE #Signals message end
+			self.timeoutRead  = None                #Read timeout. Makes the listener wait
+			self.timeoutWrite = None                #Write timeout. Makes the speaker wait
+			self.flowControl  = False               #Software flow control
+			self.rtsCts       = False               #Hardware (RTS/CTS) flow control
+			self.dsrDtr       = False               #Hardware (DSR/DTR) flow control
+			self.message      = None                #What is sent to the listener
+			self.messageCache = None                #(message, message encoded as bytes); see _encode()
+			self.vendorId     = None
+			self.productId    = None
+			self.serialNumber = None
+			self.binding      = None                #How open() found the device, so it can be found again after it is plugged back in; see Watcher
+			self.readBuffer   = bytearray()         #What has been read from the device but not returned yet
+			self.listener     = None                #Reads the device on a separate thread; see startListen()
+			self.writer       = None                #Writes to the device on a separate thread; see startWrite()
+			self.transactor   = None                #Matches replies to commands on a separate thread; see startTransact()
+			self.recorder     = None                #Saves everything read and sent; see startCapture()
+
+		def __exit__(self, exc_type, exc_value, traceback):
+			"""Allows the user to use a with statement to make sure the socket connection gets closed after use."""
+
+			self.close()
+
+			return API_Com.utilities.Utilities_Container.__exit__(self, exc_type, exc_value, traceback)
+
+		def getPort(self):
+			"""Returns the port.
+
+			Example Input: getPort()
+			"""
+
+			return self.port
+
+		def getBaudRate(self):
+			"""Returns the baud rate.
+
+			Example Input: getBaudRate()
+			"""
+
+			return self.baudRate
+
+		def getDataBits(self):
+			"""Overridden function for getByteSize().
+
+			Example Input: getDataBits()
+			"""
+
+			value = self.getByteSize()
+			return value
+
+		def getByteSize(self):
+			"""Returns the byte size.
+
+			Example Input: getByteSize()
+			"""
+
+			#Format the byte size
+			if (self.byteSize == serial.FIVEBITS):
+				return 5
+
+			elif (self.byteSize == serial.SIXBITS):
+				return 6
+
+			elif (self.byteSize == serial.SEVENBITS):
+				return 7
+
+			elif (self.byteSize == serial.EIGHTBITS):
+				return 8
+
+			else:
+				return self.byteSize
+
+		def getParity(self):
+			"""Returns the parity.
+
+			Example Input: getParity()
+			"""
+
+			if (self.parity == serial.PARITY_NONE):
+				return None
+
+			elif (self.parity == serial.PARITY_ODD):
+				return "odd"
+			
+			elif (self.parity == serial.PARITY_EVEN):
+				return "even"
+			
+			elif (self.parity == serial.PARITY_MARK):
+				return "mark"
+			
+			elif (self.parity == serial.PARITY_SPACE):
+				return "space"
+
+			else:
+				return self.parity
+
+		def getStopBits(self):
+			"""Returns the stop bits.
+
+			Example Input: getStopBits()
+			"""
+
+			if (self.stopBits == serial.STOPBITS_ONE):
+				return 1
+
+			elif (self.stopBits == serial.STOPBITS_TWO):
+				return 2
+
+			elif (self.stopBits == serial.STOPBITS_ONE_POINT_FIVE):
+				return 1.5
+
+			else:
+				return self.stopBits
+
+		def getTimeoutRead(self):
+			"""Returns the read timeout.
+
+			Example Input: getTimeoutRead()
+			"""
+
+			return self.timeoutRead
+
+		def getTimeoutWrite(self):
+			"""Returns the write timeout.
+
+			Example Input: getTimeoutWrite()
+			"""
+
+			return self.timeoutWrite
+
+		def getFlow(self):
+			"""Returns the software flow control.
+
+			Example Input: getFlow()
+			"""
+
+			return self.flowControl
+
+		def getFlowS(self):
+			"""Returns the hardware flow control.
+
+			Example Input: getFlowS(True)
+			"""
+
+			return self.rtsCts
+
+		def getFlowR(self):
+			"""Returns the hardware flow control.
+
+			Example Input: getFlowR()
+			"""
+
+			return self.dsrDtr
+
+		def getMessage(self):
+			"""Returns the message that will be sent.
+
+			Example Input: getMessage()
+			"""
+
+			return self.message
+
+		def getId(self):
+			"""Returns the product id and vendor id of the device connected to the COM Port.
+
+			Example Input: getId()
+			"""
+
+			return (self.vendorId, self.productId)
+
+		#Setters
+		def setPort(self, value):
+			"""Changes the port.
+
+			value (str) - The new port
+
+			Example Input: setPort("COM1")
+			"""
+
+			self.port = value
+
+		def setBaudRate(self, value):
+			"""Changes the baud rate.
+
+			value (int) - The new baud rate
+
+			Example Input: setBaudRate(9600)
+			"""
+
+			self.baudRate = value
+			if (self.isOpen()):
+				self.applySettings()
+
+		def setDataBits(self, value):
+			"""Overridden function for setByteSize().
+
+			value (int) - The new byte size. Can be 5, 6, 7, or 8
+
+			Example Input: setDataBits(8)
+			"""
+
+			self.setByteSize(value)
+
+		def setByteSize(self, value):
+			"""Changes the byte size.
+
+			value (int) - The new byte size. Can be 5, 6, 7, or 8
+
+			Example Input: setByteSize(8)
+			"""
+
+			#Ensure that value is an integer
+			if (type(value) != int):
+				value = int(value)
+
+			#Format the byte size
+			if (value == 5):
+				self.byteSize = serial.FIVEBITS
+
+			elif (value == 6):
+				self.byteSize = serial.SIXBITS
+
+			elif (value == 7):
+				self.byteSize = serial.SEVENBITS
+
+			elif (value == 8):
+				self.byteSize = serial.EIGHTBITS
+
+			if (self.isOpen()):
+				self.applySettings()
+
+		def setParity(self, value):
+			"""Changes the parity.
 
 			value (str) - The new parity. Can be None, "odd", "even", "mark", or "space". Only the first letter is needed
 
-			Example Input: setParity("odd")
+			Example Input: setParity("odd")
+			"""
+
+			if (value is not None):
+				#Ensure correct format
+				if (type(value) == str):
+					value = value.lower()
+
+					if (value[0] == "n"):
+						self.parity = serial.PARITY_NONE
+					
+					elif (value[0] == "o"):
+						self.parity = serial.PARITY_ODD
+					
+					elif (value[0] == "e"):
+						self.parity = serial.PARITY_EVEN
+					
+					elif (value[0] == "m"):
+						self.parity = serial.PARITY_MARK
+					
+					elif (value[0] == "s"):
+						self.parity = serial.PARITY_SPACE
+
+					else:
+						errorMessage = f"There is no parity {value}"
+						raise KeyError(errorMessage)
+						# return False
+
+				else:
+					errorMessage = f"There is no parity {value}"
+					raise KeyError(errorMessage)
+					# return False
+
+			else:
+				self.parity = serial.PARITY_NONE
+
+			if (self.isOpen()):
+				self.applySettings()
+
+			return True
+
+		def setStopBits(self, value):
+			"""Changes the stop bits.
+
+			value (int) - The new stop bits
+
+			Example Input: setStopBits(1)
+			Example Input: setStopBits(1.5)
+			Example Input: setStopBits(2)
+			"""
+
+			#Ensure that value is an integer or float
+			if ((type(value) != int) and (type(value) != float)):
+				value = int(value)
+
+			#Format the stop bits
+			if (value == 1):
+				self.stopBits = serial.STOPBITS_ONE
+
+			elif (value == 2):
+				self.stopBits = serial.STOPBITS_TWO
+
+			elif (value == 1.5):
+				self.stopBits = serial.STOPBITS_ONE_POINT_FIVE
+
+			else:
+				errorMessage = f"There is no stop bit {value}"
+				raise KeyError(errorMessage)
+
+			if (self.isOpen()):
+				self.applySettings()
+
+		def setTimeout(self, value = None):
+			"""Runs setTimeoutRead and setTimeoutWrite().
+
+			Example Input: setTimeout()
+			Example Input: setTimeout(1000)
+			"""
+
+			self.setTimeoutRead(value)
+			self.setTimeoutWrite(value)
+
+		def setTimeoutRead(self, value = None):
+			"""Changes the read timeout.
+
+			value (int) - How many milli-seconds to wait for read()
+				- If None: Wait forever
+				- If 0: Do not wait
+
+			Example Input: setTimeoutRead()
+			Example Input: setTimeoutRead(1000)
+			"""
+
+			self.timeoutRead = value
+			if (self.isOpen()):
+				self.applySettings()
+
+		def setTimeoutWrite(self, value = None):
+			"""Changes the write timeout.
+
+			value (int) - How many milli-seconds to wait for write()
+				- If None: Wait forever
+				- If 0: Do not wait
+
+			Example Input: setTimeoutWrite()
+			Example Input: setTimeoutWrite(1000)
+			"""
+
+			self.timeoutWrite = value
+			if (self.isOpen()):
+				self.applySettings()
+
+		def setFlow(self, value):
+			"""Changes the software flow control.
+
+			value (bool) - If True: Enables software flow control
+
+			Example Input: setFlow(True)
+			"""
+
+			self.flowControl = value
+			if (self.isOpen()):
+				self.applySettings()
+
+		def setFlowS(self, value):
+			"""Changes the hardware flow control.
+
+			value (bool) - If True: Enables RTS/CTS flow control
+
+			Example Input: setFlowS(True)
+			"""
+
+			self.rtsCts = value
+			if (self.isOpen()):
+				self.applySettings()
+
+		def setFlowR(self, value):
+			"""Changes the hardware flow control.
+
+			value (bool) - If True: Enables DSR/DTR flow control
+
+			Example Input: setFlowR(True)
+			"""
+
+			self.dsrDtr = value
+			if (self.isOpen()):
+				self.applySettings()
+
+		def setMessage(self, value):
+			"""Changes the message that will be sent.
+
+			value (str) - The new message
+
+			Example Input: setMessage("Lorem ipsum")
+			"""
+
+			self.message = value
+
+		def open(self, port = None, autoEmpty = True, serialNumber = None, reopen = False):
+			"""Gets the COM port that the zebra printer is plugged into and opens it.
+			Returns True if the port sucessfully opened.
+			Returns False if the port failed to open.
+			Special thanks to Mike Molt for how tos earch by vendor id and product id on https://stackoverflow.com/questions/38661797/is-it-possible-to-refer-to-a-serial-device-by-vendor-and-device-id-in-pyserial
+
+			port (str) - If Provided, opens this port instead of the port in memory
+				- If tuple: (vendorId (int or hex), productId (int or hex))
+				- If None: Finds the device the same way it was last opened, such as by id or serial number, so it works after being plugged back in
+			autoEmpty (bool) - Determines if the comPort is automatically flushed after opening
+			serialNumber (str) - If Provided, opens the port whose device has this serial number instead
+			reopen (bool) - Determines what happens if the port is already open
+				- If True: Closes it and opens it again
+				- If False: Keeps it open and only changes the settings that are different
+
+			Example Input: open()
+			Example Input: open("COM2")
+			Example Input: open(autoEmpty = False)
+			Example Input: open((1529, 16900))
+			Example Input: open((0x05F9, 0x4204))
+			Example Input: open("/dev/pts/3")
+			Example Input: open(serialNumber = "A6008isP")
+			"""
+
+			if ((port is None) and (serialNumber is None) and (self.binding is not None)):
+				#Find the device the same way as last time, since it may be on a different port after being plugged back in
+				if (isinstance(self.binding, str)):
+					serialNumber = self.binding
+				else:
+					port = self.binding
+
+			if (serialNumber is not None):
+				item = portInventory.findSerial(serialNumber)
+				if (item is None):
+					errorMessage = f"Cannot find COM Port with a device whose serial number is {serialNumber} for open() in {self.__repr__()}"
+					raise ValueError(errorMessage)
+				port = item.device
+
+			if (port is None):
+				port = self.port
+				if (port is None):
+					errorMessage = f"'port' cannot be None for open() in {self.__repr__()}"
+					raise ValueError(errorMessage)
+
+			if (isinstance(port, (tuple, list, range, types.GeneratorType))):
+				if (len(port) != 2):
+					errorMessage = f"'port' should have a length of 2, not {len(port)} for open() in {self.__repr__()}"
+					raise ValueError(errorMessage)
+
+				self.vendorId = port[0]
+				self.productId = port[1]
+				port = None
+			else:
+				self.vendorId = None
+				self.productId = None
+				
+			if (isinstance(self.vendorId, str)):
+				try:
+					self.vendorId = int(self.vendorId, 16)
+				except ValueError:
+					self.vendorId = int(self.vendorId)
+			if (isinstance(self.productId, str)):
+				try:
+					self.productId = int(self.productId, 16)
+				except ValueError:
+					self.productId = int(self.productId)
+
+			if (port is None):
+				matchList = portInventory.findId(self.vendorId, self.productId)
+				if (not matchList):
+					errorMessage = f"Cannot find COM Port with a device whose vendor id is {self.vendorId} and product id is {self.productId} for open() in {self.__repr__()}"
+					raise ValueError(errorMessage)
+
+				#If there are several of the same device, use one that a sibling does not already have open, keeping the one this had if it can
+				busy = set()
+				if (self.parent is not None):
+					busy = {child.port for child in list(self.parent) if ((child is not self) and child.isOpen())}
+				freeList = [match for match in matchList if (match.device not in busy)] or matchList
+				item = next((match for match in freeList if (match.device == self.port)), freeList[0])
+				port = item.device
+				self.binding = (self.vendorId, self.productId)
+			else:
+				item = portInventory.findDevice(port)
+				if (item is not None):
+					self.vendorId = item.vid
+					self.productId = item.pid
+				elif (not os.path.exists(port)):
+					#Pseudo-terminals and other virtual ports are not listed, but can still be opened by path
+					errorMessage = f"Cannot find COM Port on port {port} for open() in {self.__repr__()}"
+					raise ValueError(errorMessage)
+				self.binding = None if (serialNumber is None) else serialNumber
+			self.serialNumber = None if (item is None) else item.serial_number
+			self.port = port
+
+			#Go back to a real port after replay()
+			if (not isinstance(self.device, serial.SerialBase)):
+				self.device.close()
+				self.device = serial.Serial()
+
+			if ((not reopen) and self.isOpen() and (self.device.port == self.port)):
+				#Reopening costs time and can reset the device through DTR, so only change what is different
+				self.applySettings()
+				if (autoEmpty):
+					self.empty()
+				return
+
+			if (self.isOpen()):
+				self.close()
+			self.readBuffer.clear()
+
+			#Configure port options
+			self.device.port = self.port
+			self.applySettings()
+
+			#Open the port
+			start = time.perf_counter()
+			try:
+				self.device.open()
+			except socket.error as error:
+				self.metrics.failed()
+				return error
+
+			#Check port status
+			if (not self.isOpen()):
+				self.metrics.failed()
+				error = ValueError(f"Cannot open serial port {self.device.port} for {self.__repr__()}")
+				return error
+			self.metrics.opened(time.perf_counter() - start)
+
+			if (autoEmpty):
+				self.empty()
+
+		def applySettings(self):
+			"""Gives the device the settings of this child.
+			If the port is open, only the settings that are different are changed, without closing it.
+
+			Example Input: applySettings()
+			"""
+
+			settings = {
+				"baudrate": self.baudRate,
+				"bytesize": self.byteSize,
+				"parity": self.parity,
+				"stopbits": self.stopBits,
+				"xonxoff": self.flowControl,
+				"rtscts": self.rtsCts,
+				"dsrdtr": self.dsrDtr,
+				"timeout": None if (self.timeoutRead is None) else self.timeoutRead / 1000,
+				"write_timeout": None if (self.timeoutWrite is None) else self.timeoutWrite / 1000,
+			}
+
+			if (self.isListening()):
+				#The listener is using its own read timeout; it puts this one back when it stops
+				self.listener.oldTimeout = settings.pop("timeout")
+
+			self.device.apply_settings(settings)
+
+		def isOpen(self):
+			"""Checks whether the COM port is open or not."""
+
+			return self.device.isOpen()
+
+		def empty(self):
+			"""Empties the buffer data in the given COM port."""
+
+			if (not self.isOpen()):
+				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
+				
+			self.device.flushInput() #flush input buffer, discarding all its contents
+			self.device.flushOutput()#flush output buffer, aborting current output and discard all that is in buffer
+			self.readBuffer.clear()
+
+		def close(self, port = None):
+			"""Closes the current COM Port.
+
+			### Not Yet Implemented ###
+			port (str) - If Provided, closes this port instead of the port in memory
+
+			Example Input: close()
+			"""
+
+			if (not self.isOpen()):
+				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
+				return
+
+			if (self.transactor is not None):
+				self.stopTransact()
+			if (self.writer is not None):
+				self.stopWrite()
+			if (self.listener is not None):
+				self.stopListen()
+
+			self.device.close()
+
+		def send(self, message = None, autoEmpty = False, codec = None):
+			"""Sends a message to the COM device.
+			Returns if the send was sucessful or not.
+			While startWrite() is running, the message is queued and this returns without waiting for the device; use flush() to wait.
+
+			message (str) - The message that will be sent to the listener
+							If None: The internally stored message will be used.
+			autoEmpty (bool) - If True: Throws away everything in the input and output buffers first
+			codec (API_Com.framing.Codec) - What to wrap the message in, such as API_Com.framing.getCodec("slip")
+				- If None: The message is sent as is
+
+			Example Input: send()
+			Example Input: send("Lorem ipsum")
+			Example Input: send("Lorem ipsum", autoEmpty = True)
+			Example Input: send(b"\x01\x02", codec = slipCodec)
 			"""
 
-			if (value is not None):
-				#Ensure correct format
-				if (type(value) == str):
-					value = value.lower()
+			if (message is None):
+				message = self.message
 
-					if (value[0] == "n"):
-						self.parity = serial.PARITY_NONE
-					
-					elif (value[0] == "o"):
-						self.parity = serial.PARITY_ODD
-					
-					elif (value[0] == "e"):
-						self.parity = serial.PARITY_EVEN
-					
-					elif (value[0] == "m"):
-						self.parity = serial.PARITY_MARK
-					
-					elif (value[0] == "s"):
-						self.parity = serial.PARITY_SPACE
+			if (message is None):
+				warnings.warn(f"No message to send for send() in {self.__repr__()}", Warning, stacklevel = 2)
+				return
+			
+			if (not self.isOpen()):
+				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
+				return
 
-					else:
-						errorMessage = f"There is no parity {value}"
-						raise KeyError(errorMessage)
-						# return False
+			if (autoEmpty):
+				self.empty()
 
-				else:
-					errorMessage = f"There is no parity {value}"
-					raise KeyError(errorMessage)
-					# return False
+			message = self._encode(message)
+			if (codec is not None):
+				message = codec.encode(message)
+
+			if (self.writer is not None):
+				if (codec is not None):
+					#The codec reuses its buffer, so the queue needs its own copy
+					message = bytes(message)
+				if (self.writer.put(message)):
+					return True
+				self.metrics.failed()
+				return False
+
+			#write data
+			start = time.perf_counter()
+			try:
+				self.device.write(message)
+			except:
+				self.metrics.failed()
+				return False
+			if (self.recorder is not None):
+				self.recorder.record(API_Com.capture.OUT, message)
+			self.metrics.sent(len(message), time.perf_counter() - start)
+			return True
+
+		def _encode(self, message):
+			"""Returns 'message' as bytes.
+			The stored message is only encoded again after it changes.
+
+			message (str) - What to encode
+
+			Example Input: _encode("Lorem ipsum")
+			"""
+
+			if (isinstance(message, bytes)):
+				return message
 
+			messageCache = self.messageCache
+			if ((messageCache is not None) and (messageCache[0] is message)):
+				return messageCache[1]
+
+			encoded = message.encode("utf-8")
+			if (message is self.message):
+				self.messageCache = (message, encoded)
+			return encoded
+
+		def read(self, length = None, end = None, decode = True, lines = 1, reply = None, 
+			reply_retryAttempts = 0, reply_retryDelay = 0, reply_retryPrintError = False):
+			"""Listens to the comport for a message.
+
+			length (int) - How long the string is expected to be
+
+			end (str) - What to listen for as an end of message
+				- If None: Will return the first character in the buffer
+
+			decode (bool) - Determines if the sring should be automatically decoded
+				- If True: Will decode the string
+				- If False: Will not decode the string
+
+			lines (int) - How many lines to read that end with 'end'
+				- Does not apply if 'end' is None
+
+			reply (str) - What to send back after recieving the full message
+			reply_retryAttempts (int) - How many more times to try sending 'reply' if it fails
+			reply_retryDelay (int) - How many milli-seconds to wait before each retry
+			reply_retryPrintError (bool) - If True: Prints why sending 'reply' failed
+
+			If 'end' is given, 'length' is the longest a line can be before it is returned without 'end'.
+			Anything read past 'end' is kept for the next read.
+			Returns None if the read timeout runs out before 'end' is found.
+			While startListen() is running, this returns the next frame it read instead.
+			This cannot be used while startTransact() or startPoll() is reading the device; use request() or submit() to get replies.
+
+			Example Input: read()
+			Example Input: read(10000)
+			Example Input: read(end = "\n")
+			Example Input: read(end = "\r\n", lines = 3)
+			"""
+
+			if (not self.isOpen()):
+				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
+				return
+
+			if (reply is not None):
+				if (not isinstance(reply, bytes)):
+					reply = reply.encode("utf-8")
+
+			if (self.listener is not None):
+				message = self.getFrame(timeout = None if (self.timeoutRead is None) else self.timeoutRead / 1000)
+				if ((message is not None) and decode and isinstance(message, bytes)):
+					message = message.decode("utf-8")
+				return message
+
+			if (self._isReadElsewhere("read")):
+				return
+
+			start = time.perf_counter()
+			if (end is None):
+				if (length is None):
+					length = 1
+
+				#Anything left over from the last frame comes first
+				message = bytes(self.readBuffer[:length])
+				del self.readBuffer[:length]
+				if (len(message) < length):
+					data = self.device.read(length - len(message))
+					if (self.recorder is not None):
+						self.recorder.record(API_Com.capture.IN, data)
+					message += data
 			else:
-				self.parity = serial.PARITY_NONE
+				if (not isinstance(end, bytes)):
+					end = end.encode("utf-8")
+				if ((length is not None) and (length <= 0)):
+					length = None
 
-			return True
+				frameList = []
+				for i in range(max(1, lines)):
+					frame = self._readFrame(end, maxLength = length)
+					if (frame is None):
+						#Timed out or closed; keep what was read for next time
+						self.readBuffer[:0] = b"".join(frameList)
+						return
+					frameList.append(frame)
+				message = b"".join(frameList)
 
-		def setStopBits(self, value):
-			"""Changes the stop bits.
+			self.metrics.received(len(message), time.perf_counter() - start)
 
-			value (int) - The new stop bits
+			if (reply is not None):
+				try:
+					self.device.write(reply)
+					if (self.recorder is not None):
+						self.recorder.record(API_Com.capture.OUT, reply)
+				except Exception as error_1:
+					if (reply_retryPrintError):
+						traceback.print_exception(type(error_1), error_1, error_1.__traceback__)
+					attempts = 0
+					while (attempts < reply_retryAttempts):
+						attempts += 1
+						time.sleep(reply_retryDelay / 1000)
+						try: 
+							self.device.write(reply)
+							if (self.recorder is not None):
+								self.recorder.record(API_Com.capture.OUT, reply)
+							break
+						except Exception as error_2:
+							if (reply_retryPrintError):
+								traceback.print_exception(type(error_2), error_2, error_2.__traceback__)
+					else:
+						self.metrics.failed()
+						return False
 
-			Example Input: setStopBits(1)
-			Example Input: setStopBits(1.5)
-			Example Input: setStopBits(2)
+			if (decode):
+				message = message.decode("utf-8")
+
+			return message
+
+		def _fill(self):
+			"""Moves everything waiting on the port into the read buffer.
+			Blocks for at least one byte, up to the read timeout.
+			Returns how many bytes were added.
 			"""
 
-			#Ensure that value is an integer or float
-			if ((type(value) != int) and (type(value) != float)):
-				value = int(value)
+			data = self.device.read(max(1, self.device.in_waiting))
+			self.readBuffer += data
+			if (self.recorder is not None):
+				self.recorder.record(API_Com.capture.IN, data)
+			return len(data)
 
-			#Format the stop bits
-			if (value == 1):
-				self.stopBits = serial.STOPBITS_ONE
+		def _readFrame(self, end, maxLength = None):
+			"""Returns the next frame from the read buffer, including 'end'.
+			A delimiter that is split across two reads is still found, because the search picks up just before where the last one stopped.
+			Returns None if the read timed out or the port closed; what was read stays in the buffer.
 
-			elif (value == 2):
-				self.stopBits = serial.STOPBITS_TWO
+			end (bytes) - What marks the end of a frame
+			maxLength (int) - The longest a frame can be before it is returned without 'end'
+				- If None: There is no limit
+			"""
 
-			elif (value == 1.5):
-				self.stopBits = serial.STOPBITS_ONE_POINT_FIVE
+			searchStart = 0
+			while True:
+				frame = self._takeFrame(end, maxLength = maxLength, searchStart = searchStart)
+				if (frame is not None):
+					return frame
+
+				searchStart = max(0, len(self.readBuffer) - len(end) + 1)
+				if ((not self.isOpen()) or (not self._fill())):
+					return None
+
+		def _waitReadable(self, timeout):
+			"""Waits up to 'timeout' seconds for the device to have something to read, without reading it.
+			Returns if there is something to read.
+			"""
+
+			fileno = self._getFileno()
+			if (fileno is None):
+				#Nothing to wait on, so check every millisecond
+				deadline = time.monotonic() + timeout
+				while (not self.device.in_waiting):
+					if (time.monotonic() >= deadline):
+						return False
+					time.sleep(0.001)
+				return True
+
+			if (hasattr(select, "poll")):
+				watcher = select.poll()
+				watcher.register(fileno, select.POLLIN)
+				return bool(watcher.poll(max(0, timeout) * 1000))
+			return bool(select.select([fileno], [], [], max(0, timeout))[0])
+
+		def _readFrameBefore(self, end, deadline, maxLength = None):
+			"""Returns the next frame that ends with 'end', or None if 'deadline' comes first.
+			Unlike _readFrame(), this does not depend on the read timeout.
+
+			end (bytes) - What marks the end of a frame
+			deadline (float) - When to give up, from time.monotonic()
+			maxLength (int) - The longest a frame can be before it is returned without 'end'
+			"""
 
+			searchStart = 0
+			while True:
+				frame = self._takeFrame(end, maxLength = maxLength, searchStart = searchStart)
+				if (frame is not None):
+					return frame
+
+				searchStart = max(0, len(self.readBuffer) - len(end) + 1)
+				if (not self._waitReadable(deadline - time.monotonic())):
+					return None
+				self._fill()
+
+		def _takeFrame(self, end, maxLength = None, searchStart = 0):
+			"""Returns the next frame if the read buffer already has all of it; otherwise returns None.
+			This never reads from the device.
+
+			end (bytes) - What marks the end of a frame
+			maxLength (int) - The longest a frame can be before it is returned without 'end'
+			searchStart (int) - Where in the buffer to start looking for 'end'
+			"""
+
+			index = self.readBuffer.find(end, searchStart)
+			if ((index != -1) and ((maxLength is None) or (index + len(end) <= maxLength))):
+				stop = index + len(end)
+			elif ((maxLength is not None) and (len(self.readBuffer) >= maxLength)):
+				stop = maxLength
 			else:
-				errorMessage = f"There is no stop bit {value}"
-				raise KeyError(errorMessage)
+				return None
 
-		def setTimeout(self, value = None):
-			"""Runs setTimeoutRead and setTimeoutWrite().
+			frame = bytes(self.readBuffer[:stop])
+			del self.readBuffer[:stop]
+			return frame
+
+		def readFrame(self, codec, timeout = None):
+			"""Returns the payload of the next valid frame, as found by 'codec'.
+			Frames whose CRC is wrong are skipped.
+			Returns None if the read timeout (or 'timeout') runs out first; what was read stays buffered for next time.
+			This cannot be used while startListen(), startTransact() or startPoll() is reading the device.
+
+			codec (API_Com.framing.Codec) - How frames are marked, such as API_Com.framing.getCodec("cobs")
+			timeout (float) - How many seconds to wait
+				- If None: Uses the read timeout
+
+			Example Input: readFrame(slipCodec)
+			Example Input: readFrame(API_Com.framing.getCodec("length", crc = "crc16"), timeout = 1)
+			"""
+
+			if (not self.isOpen()):
+				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
+				return
+
+			if (self.isListening()):
+				warnings.warn(f"Cannot use readFrame() while listening to {self.__repr__()}; use stopListen() first", Warning, stacklevel = 2)
+				return
+
+			if (self._isReadElsewhere("readFrame")):
+				return
+
+			start = time.perf_counter()
+			deadline = None if (timeout is None) else (time.monotonic() + timeout)
+			while True:
+				frame = codec.decodeOne(self.readBuffer)
+				if (frame is not None):
+					self.metrics.received(len(frame), time.perf_counter() - start)
+					return frame
+
+				if (deadline is None):
+					if (not self._fill()):
+						return None
+				elif (self._waitReadable(deadline - time.monotonic())):
+					self._fill()
+				else:
+					return None
+
+		def iter_frames(self, end = "\n", decode = False, maxLength = None, codec = None):
+			"""Yields each frame that ends with 'end' as it arrives.
+			Stops when the port is closed or the read timeout runs out.
+
+			end (str) - What marks the end of a frame
+			decode (bool) - If True: Will decode each frame
+			maxLength (int) - The longest a frame can be before it is returned without 'end'
+				- If None: There is no limit
+			codec (API_Com.framing.Codec) - How frames are marked; if given, 'end' and 'maxLength' are not used and the payload of each valid frame is yielded
+
+			Example Input: iter_frames()
+			Example Input: iter_frames(end = b"\x03", maxLength = 1024)
+			Example Input: iter_frames(codec = slipCodec)
+			"""
+
+			if (codec is not None):
+				while (self.isOpen()):
+					frame = self.readFrame(codec)
+					if (frame is None):
+						return
+					yield frame.decode("utf-8") if decode else frame
+				return
+
+			if (not isinstance(end, bytes)):
+				end = end.encode("utf-8")
+
+			while (self.isOpen()):
+				start = time.perf_counter()
+				frame = self._readFrame(end, maxLength = maxLength)
+				if (frame is None):
+					return
+				self.metrics.received(len(frame), time.perf_counter() - start)
+
+				if (decode):
+					yield frame.decode("utf-8")
+				else:
+					yield frame
+
+		def _isReadElsewhere(self, function):
+			"""Returns if another thread is reading the device, so 'function' cannot; if so, this also warns.
+			startListen() is not counted, since reading can take the frames it read instead.
+
+			function (str) - What wants to read, for the warning
+
+			Example Input: _isReadElsewhere("read")
+			"""
+
+			if (self.transactor is not None):
+				warnings.warn(f"Cannot use {function}() while sending commands to {self.__repr__()} with startTransact(); use submit() or stopTransact() first", Warning, stacklevel = 3)
+				return True
+
+			if ((self.parent is not None) and self.parent.isPolling()):
+				warnings.warn(f"Cannot use {function}() while {self.parent.__repr__()} is being polled with startPoll(); use stopPoll() first", Warning, stacklevel = 3)
+				return True
+
+			return False
+
+		#Asyncio
+		def _getFileno(self):
+			"""Returns the file descriptor of the device, or None if the event loop cannot watch it."""
+
+			try:
+				return self.device.fileno()
+			except (AttributeError, NotImplementedError, OSError, ValueError):
+				return None
+
+		async def _waitFor(self, register, unregister, fileno, timeout = None):
+			"""Waits for the event loop to say 'fileno' is ready.
+			Returns False if 'timeout' runs out first.
+			"""
+
+			loop = asyncio.get_running_loop()
+			future = loop.create_future()
+
+			def onReady():
+				if (not future.done()):
+					future.set_result(True)
+
+			getattr(loop, register)(fileno, onReady)
+			try:
+				return await asyncio.wait_for(future, timeout)
+			except asyncio.TimeoutError:
+				return False
+			finally:
+				getattr(loop, unregister)(fileno)
+
+		async def _fill_async(self, timeout = None):
+			"""Moves what is waiting on the port into the read buffer without blocking the event loop.
+			Returns how many bytes were added.
+			"""
+
+			fileno = self._getFileno()
+			try:
+				if (fileno is None):
+					raise NotImplementedError()
+				if (not await self._waitFor("add_reader", "remove_reader", fileno, timeout = timeout)):
+					return 0
+			except NotImplementedError:
+				#This event loop or platform cannot watch the device, so fall back to a thread
+				loop = asyncio.get_running_loop()
+				return await loop.run_in_executor(None, self._fill)
+
+			try:
+				data = os.read(fileno, max(1, self.device.in_waiting, 4096))
+			except BlockingIOError:
+				return 0
+			if (not data):
+				errorMessage = f"Device reports readiness to read but returned no data (device disconnected?) for {self.__repr__()}"
+				raise serial.SerialException(errorMessage)
+
+			self.readBuffer += data
+			if (self.recorder is not None):
+				self.recorder.record(API_Com.capture.IN, data)
+			return len(data)
+
+		async def open_async(self, *args, **kwargs):
+			"""Opens the COM Port without blocking the event loop.
+			Takes the same arguments as open(). Opening is done once on a worker thread; reading and sending after that are not.
+
+			Example Input: await open_async()
+			Example Input: await open_async("/dev/ttyUSB0")
+			"""
+
+			loop = asyncio.get_running_loop()
+			return await loop.run_in_executor(None, lambda: self.open(*args, **kwargs))
+
+		async def read_async(self, length = None, end = None, decode = True, timeout = None, maxLength = None):
+			"""Listens to the comport for a message without blocking the event loop.
+			On Linux the device is watched by the event loop itself, so no thread is used.
+			Returns None if 'timeout' runs out; what was read stays buffered for next time.
+			While startListen() is running, this returns the next frame it read instead.
+			This cannot be used while startTransact() or startPoll() is reading the device.
+
+			length (int) - How many bytes to read if 'end' is None
+				- If None: Will return the first byte in the buffer
+			end (str) - What to listen for as an end of message
+			decode (bool) - If True: Will decode the message
+			timeout (float) - How many seconds to wait
+				- If None: Wait forever
+			maxLength (int) - The longest a message can be before it is returned without 'end'
+
+			Example Input: await read_async()
+			Example Input: await read_async(end = "\n")
+			Example Input: await read_async(end = "\r\n", timeout = 1)
+			"""
+
+			if (not self.isOpen()):
+				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
+				return
+
+			if (self.listener is not None):
+				loop = asyncio.get_running_loop()
+				message = await loop.run_in_executor(None, self.getFrame, timeout)
+				if ((message is not None) and decode and isinstance(message, bytes)):
+					message = message.decode("utf-8")
+				return message
+
+			if (self._isReadElsewhere("read_async")):
+				return
+
+			if ((end is not None) and (not isinstance(end, bytes))):
+				end = end.encode("utf-8")
+			if (length is None):
+				length = 1
+
+			start = time.perf_counter()
+			deadline = None if (timeout is None) else (time.monotonic() + timeout)
+			searchStart = 0
+			while True:
+				if (end is None):
+					if (len(self.readBuffer) >= length):
+						message = bytes(self.readBuffer[:length])
+						del self.readBuffer[:length]
+						break
+				else:
+					message = self._takeFrame(end, maxLength = maxLength, searchStart = searchStart)
+					if (message is not None):
+						break
+					searchStart = max(0, len(self.readBuffer) - len(end) + 1)
+
+				remaining = None
+				if (deadline is not None):
+					remaining = deadline - time.monotonic()
+					if (remaining <= 0):
+						return None
+
+				await self._fill_async(timeout = remaining)
+
+			self.metrics.received(len(message), time.perf_counter() - start)
+
+			if (decode):
+				message = message.decode("utf-8")
+			return message
+
+		async def send_async(self, message = None, codec = None):
+			"""Sends a message to the COM device without blocking the event loop.
+			On Linux the device is watched by the event loop itself, so no thread is used.
+			Returns if the send was sucessful or not.
+			While startWrite() is running, the message is queued behind what was sent before it, as send() does.
+
+			message (str) - The message that will be sent to the listener
+				- If None: The internally stored message will be used.
+			codec (API_Com.framing.Codec) - What to wrap the message in, such as API_Com.framing.getCodec("slip")
+				- If None: The message is sent as is
+
+			Example Input: await send_async("Lorem ipsum")
+			Example Input: await send_async(b"\x01\x02", codec = slipCodec)
+			"""
+
+			if (message is None):
+				message = self.message
+
+			if (message is None):
+				warnings.warn(f"No message to send for send_async() in {self.__repr__()}", Warning, stacklevel = 2)
+				return
+
+			if (not self.isOpen()):
+				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
+				return
+
+			message = self._encode(message)
+			if (codec is not None):
+				#The codec reuses its buffer, so keep a copy in case something else encodes while this waits
+				message = bytes(codec.encode(message))
+
+			if (self.writer is not None):
+				if (self.writer.queue.full()):
+					#Wait for room on a worker thread, so the event loop is not blocked
+					loop = asyncio.get_running_loop()
+					queued = await loop.run_in_executor(None, self.writer.put, message)
+				else:
+					queued = self.writer.put(message)
+				if (queued):
+					return True
+				self.metrics.failed()
+				return False
 
-			Example Input: setTimeout()
-			Example Input: setTimeout(1000)
-			"""
+			start = time.perf_counter()
+			fileno = self._getFileno()
+			try:
+				if (fileno is None):
+					loop = asyncio.get_running_loop()
+					await loop.run_in_executor(None, self.device.write, message)
+				else:
+					view = memoryview(message)
+					while (view):
+						try:
+							view = view[os.write(fileno, view):]
+						except BlockingIOError:
+							await self._waitFor("add_writer", "remove_writer", fileno)
+			except Exception:
+				self.metrics.failed()
+				return False
+			if (self.recorder is not None):
+				self.recorder.record(API_Com.capture.OUT, message)
 
-			self.setTimeoutRead(value)
-			self.setTimeoutWrite(value)
+			self.metrics.sent(len(message), time.perf_counter() - start)
+			return True
 
-		def setTimeoutRead(self, value = None):
-			"""Changes the read timeout.
+		async def iter_frames_async(self, end = "\n", decode = False, maxLength = None, timeout = None):
+			"""Yields each frame that ends with 'end' as it arrives, without blocking the event loop.
+			Stops when the port is closed or 'timeout' runs out while waiting for a frame.
+			While startListen() is running, the frames it read are yielded instead.
 
-			value (int) - How many milli-seconds to wait for read()
+			end (str) - What marks the end of a frame
+			decode (bool) - If True: Will decode each frame
+			maxLength (int) - The longest a frame can be before it is returned without 'end'
+			timeout (float) - How many seconds to wait for each frame
 				- If None: Wait forever
-				- If 0: Do not wait
 
-			Example Input: setTimeoutRead()
-			Example Input: setTimeoutRead(1000)
+			Example Input: async for frame in iter_frames_async(): pass
 			"""
 
-			self.timeoutRead = value
+			while (self.isOpen()):
+				frame = await self.read_async(end = end, decode = decode, timeout = timeout, maxLength = maxLength)
+				if (frame is None):
+					return
+				yield frame
+
+		#Background Thread
+		def startListen(self, end = None, callback = None, queueSize = 1000, maxLength = None, decode = False):
+			"""Reads the COM Port on a separate thread, so nothing is lost while the caller is busy.
+			Use getFrame() or checkListen() to take out what was read, or give a callback to be handed each frame.
+			If the thread runs into an error, it stops and the error is raised by the next getFrame() or checkListen().
+
+			end (str) - What marks the end of a frame
+				- If None: Each chunk of bytes is handed over as it arrives
+			callback (function) - What to call with each frame. It is called on the listening thread
+				- If None: Frames are kept in a queue
+			queueSize (int) - How many frames the queue can hold before the oldest are dropped
+			maxLength (int) - The longest a frame can be before it is handed over without 'end'
+			decode (bool) - If True: Frames are decoded before being handed over
+
+			Example Input: startListen()
+			Example Input: startListen(end = "\r\n")
+			Example Input: startListen(end = "\n", callback = myFunction, decode = True)
+			"""
 
-		def setTimeoutWrite(self, value = None):
-			"""Changes the write timeout.
+			if (not self.isOpen()):
+				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
+				return
 
-			value (int) - How many milli-seconds to wait for write()
-				- If None: Wait forever
-				- If 0: Do not wait
+			if ((self.listener is not None) and self.listener.isAlive()):
+				warnings.warn(f"Already listening to {self.__repr__()}", Warning, stacklevel = 2)
+				return
 
-			Example Input: setTimeoutWrite()
-			Example Input: setTimeoutWrite(1000)
-			"""
+			if ((end is not None) and (not isinstance(end, bytes))):
+				end = end.encode("utf-8")
 
-			self.timeoutWrite = value
+			self.listener = Listener(self, end = end, callback = callback, queueSize = queueSize, maxLength = maxLength, decode = decode)
+			self.listener.start()
 
-		def setFlow(self, value):
-			"""Changes the software flow control.
+		def stopListen(self, timeout = None):
+			"""Stops reading the COM Port on a separate thread.
+			Frames that were already read can still be taken out with checkListen().
 
-			value (bool) - If True: Enables software flow control
+			timeout (float) - How many seconds to wait for the thread to finish
+				- If None: Wait forever
 
-			Example Input: setFlow(True)
+			Example Input: stopListen()
 			"""
 
-			self.flowControl = value
+			if (self.listener is None):
+				return
 
-		def setFlowS(self, value):
-			"""Changes the hardware flow control.
+			listener = self.listener
+			listener.stop(timeout = timeout)
+			self.listener = None
 
-			value (bool) - If True: Enables RTS/CTS flow control
+			#Keep what was read so checkListen() can still be used
+			if (not listener.queue.empty()):
+				self.listener = listener
 
-			Example Input: setFlowS(True)
+		def isListening(self):
+			"""Returns if the COM Port is being read on a separate thread.
+
+			Example Input: isListening()
 			"""
 
-			self.rtsCts = value
+			return (self.listener is not None) and self.listener.isAlive()
 
-		def setFlowR(self, value):
-			"""Changes the hardware flow control.
+		def getFrame(self, timeout = None):
+			"""Returns the next frame read by startListen().
+			Returns None if 'timeout' runs out, or if listening stopped with nothing left to take out.
 
-			value (bool) - If True: Enables DSR/DTR flow control
+			timeout (float) - How many seconds to wait
+				- If None: Wait until there is a frame
 
-			Example Input: setFlowR(True)
+			Example Input: getFrame()
+			Example Input: getFrame(timeout = 1)
 			"""
 
-			self.dsrDtr = value
+			if (self.listener is None):
+				warnings.warn(f"Not listening to {self.__repr__()}; use startListen() first", Warning, stacklevel = 2)
+				return
 
-		def setMessage(self, value):
-			"""Changes the message that will be sent.
+			frame = self.listener.get(timeout = timeout)
+			if ((frame is None) and (not self.listener.isAlive()) and self.listener.queue.empty()):
+				self.listener = None
+			return frame
 
-			value (str) - The new message
+		def checkListen(self):
+			"""Takes out every frame read by startListen() so far, without waiting.
+			Returns the frames and whether it is still listening.
 
-			Example Input: setMessage("Lorem ipsum")
+			Example Input: checkListen()
 			"""
 
-			self.message = value
-
-		def open(self, port = None, autoEmpty = True):
-			"""Gets the COM port that the zebra printer is plugged into and opens it.
-			Returns True if the port sucessfully opened.
-			Returns False if the port failed to open.
-			Special thanks to Mike Molt for how tos earch by vendor id and product id on https://stackoverflow.com/questions/38661797/is-it-possible-to-refer-to-a-serial-device-by-vendor-and-device-id-in-pyserial
-
-			port (str) - If Provided, opens this port instead of the port in memory
-				- If tuple: (vendorId (int or hex), productId (int or hex))
-			autoEmpty (bool) - Determines if the comPort is automatically flushed after opening
+			if (self.listener is None):
+				return [], False
 
-			Example Input: open()
-			Example Input: open("COM2")
-			Example Input: open(autoEmpty = False)
-			Example Input: open((1529, 16900))
-			Example Input: open((0x05F9, 0x4204))
+			listener = self.listener
+			frameList = []
+			while True:
+				try:
+					frameList.append(listener.queue.get_nowait())
+				except queue.Empty:
+					break
+
+			listening = listener.isAlive()
+			if ((not listening) and (not frameList)):
+				#Only give the error once everything read before it has been taken out
+				self.listener = None
+				listener.checkError()
+
+			return frameList, listening
+
+		#Transactions
+		def request(self, command, end = "\n", timeout = 1, retries = 0, backoff = 0.1, match = None, decode = True, maxLength = None):
+			"""Sends a command and waits for its reply.
+			Each round trip is recorded in the "request" latency of stats().
+			Returns None if no reply comes after every retry.
+			While startTransact() is running, the command is sent through it, so it can share the line with other commands in flight.
+			Then 'end' and 'maxLength' must be the same as were given to startTransact(), since every reply is read the same way,
+			and if 'match' is None, the one given to startTransact() is used.
+
+			command (str) - What to send
+			end (str) - What marks the end of the reply
+			timeout (float) - How many seconds to wait for the reply to each attempt
+			retries (int) - How many more times to send the command if there is no reply
+			backoff (float) - How many seconds to wait before the first retry; this doubles for each retry after
+			match (function) - Returns if a reply belongs to the command, such as myFunction(command, reply). Replies that do not are thrown away
+				- If None: The first reply is used
+			decode (bool) - If True: Will decode the reply
+			maxLength (int) - The longest a reply can be before it is returned without 'end'
+
+			Example Input: request("*IDN?")
+			Example Input: request("MEAS:VOLT?", end = "\r\n", timeout = 0.5, retries = 2)
 			"""
 
-			if (port is None):
-				port = self.port
-				if (port is None):
-					errorMessage = f"'port' cannot be None for open() in {self.__repr__()}"
-					raise ValueError(errorMessage)
+			if (not isinstance(end, bytes)):
+				end = end.encode("utf-8")
 
-			if (isinstance(port, (tuple, list, range, types.GeneratorType))):
-				if (len(port) != 2):
-					errorMessage = f"'port' should have a length of 2, not {len(port)} for open() in {self.__repr__()}"
+			if (self.transactor is not None):
+				if ((end != self.transactor.end) or ((maxLength is not None) and (maxLength != self.transactor.maxLength))):
+					errorMessage = f"request() cannot use end = {end!r} and maxLength = {maxLength} while startTransact() is reading with end = {self.transactor.end!r} and maxLength = {self.transactor.maxLength} for {self.__repr__()}"
 					raise ValueError(errorMessage)
 
-				self.vendorId = port[0]
-				self.productId = port[1]
-				port = None
-			else:
-				self.vendorId = None
-				self.productId = None
-				
-			if (isinstance(self.vendorId, str)):
-				try:
-					self.vendorId = hex(int(self.vendorId, 16))
-				except ValueError:
-					self.vendorId = int(self.vendorId)
-			if (isinstance(self.productId, str)):
 				try:
-					self.productId = hex(int(self.productId, 16))
-				except ValueError:
-					self.productId = int(self.productId)
+					return self.submit(command, timeout = timeout, retries = retries, backoff = backoff, match = match, decode = decode).result()
+				except TimeoutError:
+					return None
 
-			for item in serial.tools.list_ports.comports():
-				if (port is None):
-					if ((item.vid == self.vendorId) and (item.pid == self.productId)):
-						port = item.device
-						break
-				else:
-					if (item.device == port):
-						self.vendorId = item.vid
-						self.productId = item.pid
-						break
-			else:
-				if (port is None):
-					errorMessage = f"Cannot find COM Port with a device whose vendor id is {self.vendorId} and product id is {self.productId} for open() in {self.__repr__()}"
-				else:
-					errorMessage = f"Cannot find COM Port on port {port} for open() in {self.__repr__()}"
-				raise ValueError(errorMessage)
-			self.port = port
+			if (not self.isOpen()):
+				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
+				return
 
-			#Configure port options
-			self.device.port         = self.port
-			self.device.baudrate     = self.baudRate
-			self.device.bytesize     = self.byteSize
-			self.device.parity       = self.parity
-			self.device.stopbits     = self.stopBits
-			self.device.xonxoff      = self.flowControl
-			self.device.rtscts       = self.rtsCts
-			self.device.dsrdtr       = self.dsrDtr
-
-			if (self.timeoutRead is None):
-				self.device.timeout = None
-			else:
-				self.device.timeout = self.timeoutRead / 1000
+			if (self.isListening()):
+				warnings.warn(f"Cannot use request() while listening to {self.__repr__()}; use stopListen() first", Warning, stacklevel = 2)
+				return
 
-			if (self.timeoutWrite is None):
-				self.device.writeTimeout = None
-			else:
-				self.device.writeTimeout = self.timeoutWrite / 1000
+			for attempt in range(retries + 1):
+				if (attempt):
+					time.sleep(backoff * 2 ** (attempt - 1))
 
-			if (self.isOpen()):
-				self.close()
+				start = time.perf_counter()
+				deadline = time.monotonic() + timeout
+				if (not self.send(command)):
+					return None
 
-			#Open the port
-			try:
-				self.device.open()
-			except socket.error as error:
-				return error
+				while True:
+					frame = self._readFrameBefore(end, deadline, maxLength = maxLength)
+					if (frame is None):
+						break
 
-			#Check port status
-			if (not self.isOpen()):
-				error = ValueError(f"Cannot open serial port {self.device.port} for {self.__repr__()}")
-				return error
+					self.metrics.received(len(frame))
+					if (decode):
+						frame = frame.decode("utf-8")
+					if ((match is None) or match(command, frame)):
+						self.metrics.record("request", time.perf_counter() - start)
+						return frame
+
+			self.metrics.failed()
+			return None
+
+		def startTransact(self, end = "\n", maxInFlight = 1, match = None, decode = True, maxLength = None):
+			"""Reads replies on a separate thread, so several commands can wait for their replies at once.
+			Use submit() to send a command and get a future for its reply; request() also goes through it while it runs.
+			If the thread runs into an error, it stops, fails every waiting command, and the error is raised by stopTransact().
+
+			end (str) - What marks the end of a reply
+			maxInFlight (int) - How many commands can be waiting for a reply at once
+				- Only use more than 1 if the device can queue commands
+			match (function) - Returns if a reply belongs to a command, such as myFunction(command, reply)
+				- If None: Replies are matched to commands in the order they were sent.
+				  A reply that comes after its command timed out will then be given to the next command
+			decode (bool) - If True: Replies are decoded
+			maxLength (int) - The longest a reply can be before it is returned without 'end'
+
+			Example Input: startTransact()
+			Example Input: startTransact(end = "\r", maxInFlight = 4, match = lambda command, reply: reply[:2] == command[:2])
+			"""
 
-			if (autoEmpty):
-				self.empty()
+			if (not self.isOpen()):
+				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
+				return
 
-		def isOpen(self):
-			"""Checks whether the COM port is open or not."""
+			if ((self.transactor is not None) and self.transactor.isAlive()):
+				warnings.warn(f"Already sending commands to {self.__repr__()}", Warning, stacklevel = 2)
+				return
 
-			return self.device.isOpen()
+			if (self.isListening()):
+				warnings.warn(f"Cannot use startTransact() while listening to {self.__repr__()}; use stopListen() first", Warning, stacklevel = 2)
+				return
 
-		def empty(self):
-			"""Empties the buffer data in the given COM port."""
+			if (not isinstance(end, bytes)):
+				end = end.encode("utf-8")
 
-			if (not self.isOpen()):
-				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
-				
-			self.device.flushInput() #flush input buffer, discarding all its contents
-			self.device.flushOutput()#flush output buffer, aborting current output and discard all that is in buffer
+			self.transactor = Transactor(self, end = end, maxInFlight = maxInFlight, match = match, decode = decode, maxLength = maxLength)
+			self.transactor.start()
 
-		def close(self, port = None):
-			"""Closes the current COM Port.
+		def stopTransact(self, timeout = None):
+			"""Stops reading replies on a separate thread.
+			Commands still waiting for a reply are cancelled.
+			Raises the error that stopped the thread, if there was one.
 
-			### Not Yet Implemented ###
-			port (str) - If Provided, closes this port instead of the port in memory
+			timeout (float) - How many seconds to wait for the thread to finish
+				- If None: Wait forever
 
-			Example Input: close()
+			Example Input: stopTransact()
 			"""
 
-			if (not self.isOpen()):
-				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
+			if (self.transactor is None):
 				return
 
-			self.device.close()
+			transactor, self.transactor = self.transactor, None
+			transactor.stop(timeout = timeout)
+			transactor.checkError()
 
-		def send(self, message = None, autoEmpty = True):
-			"""Sends a message to the COM device.
-			Returns if the send was sucessful or not.
+		def isTransacting(self):
+			"""Returns if replies are being read on a separate thread.
 
-			message (str) - The message that will be sent to the listener
-							If None: The internally stored message will be used.
+			Example Input: isTransacting()
+			"""
 
-			Example Input: send()
-			Example Input: send("Lorem ipsum")
+			return (self.transactor is not None) and self.transactor.isAlive()
+
+		def submit(self, command, timeout = 1, retries = 0, backoff = 0.1, match = None, decode = None):
+			"""Sends a command through startTransact() without waiting for its reply.
+			Returns a concurrent.futures.Future whose result is the reply.
+			The future raises TimeoutError if no reply comes after every retry.
+
+			command (str) - What to send
+			timeout (float) - How many seconds to wait for the reply to each attempt
+			retries (int) - How many more times to send the command if there is no reply
+			backoff (float) - How many seconds to wait before the first retry; this doubles for each retry after
+			match (function) - Returns if a reply belongs to this command, such as myFunction(command, reply)
+				- If None: Uses the one given to startTransact()
+			decode (bool) - If True: Will decode the reply
+				- If None: Does what startTransact() was told to
+
+			Example Input: submit("MEAS:VOLT?")
+			Example Input: submit("MEAS:VOLT?", timeout = 0.5, retries = 2)
+			Example Input: submit("MEAS:VOLT?", decode = False)
 			"""
 
-			if (message is None):
-				message = self.message
+			if (self.transactor is None):
+				errorMessage = f"Not sending commands to {self.__repr__()}; use startTransact() first"
+				raise RuntimeError(errorMessage)
 
-			if (message is None):
-				warnings.warn(f"No message to send for send() in {self.__repr__()}", Warning, stacklevel = 2)
-				return
-			
-			if (not self.isOpen()):
-				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
-				return
+			return self.transactor.submit(command, timeout = timeout, retries = retries, backoff = backoff, match = match, decode = decode)
 
-			if (autoEmpty):
-				self.empty()
+		#Capture
+		def startCapture(self, path):
+			"""Saves everything read from and sent to the COM Port in a binary capture file, with when it happened.
+			Read it back with API_Com.capture.CaptureReader(), or play it back with replay().
 
-			if (not isinstance(message, bytes)):
-				message = message.encode("utf-8")
+			path (str) - Where to save the capture; an existing capture is added to
 
-			#write data
-			try:
-				self.device.write(message)
-			except:
-				return False
-			return True
+			Example Input: startCapture("session.cap")
+			"""
 
-		def read(self, length = None, end = None, decode = True, lines = 1, reply = None, 
-			reply_retryAttempts = 0, reply_retryDelay = 0, reply_retryPrintError = False):
-			"""Listens to the comport for a message.
+			if (self.recorder is not None):
+				self.stopCapture()
+			self.recorder = API_Com.capture.Recorder(path)
 
-			length (int) - How long the string is expected to be
+		def stopCapture(self):
+			"""Stops saving what is read and sent, and closes the capture file.
 
-			end (str) - What to listen for as an end of message
-				- If None: Will return the first character in the buffer
+			Example Input: stopCapture()
+			"""
 
-			decode (bool) - Determines if the sring should be automatically decoded
-				- If True: Will decode the string
-				- If False: Will not decode the string
+			if (self.recorder is None):
+				return
 
-			lines (int) - How many lines to read that end with 'end'
-				- Does not apply if 'end' is None
+			recorder, self.recorder = self.recorder, None
+			recorder.close()
 
-			reply (str) - What to send back after recieving the full message
+		def replay(self, path, speed = 1, start = 0):
+			"""Plays back what a capture read, so read(), iter_frames(), startListen(), etc. get the same bytes at the same pace.
+			This replaces the device until open() is used again; what is sent is thrown away.
 
-			Example Input: read()
-			Example Input: read(10000)
-			Example Input: read(end = "\n")
+			path (str) - Where the capture is
+			speed (float) - How many times faster than the original to play it back
+				- If 0: Everything is available right away
+			start (float) - Skips what was read before this many seconds into the capture
+
+			Example Input: replay("session.cap")
+			Example Input: replay("session.cap", speed = 10)
+			"""
+
+			if (self.isOpen()):
+				self.close()
+
+			device = API_Com.capture.ReplayDevice(path, speed = speed, start = start)
+			if (self.timeoutRead is not None):
+				device.timeout = self.timeoutRead / 1000
+			self.device = device
+			self.readBuffer.clear()
+
+		#Write Pipeline
+		def startWrite(self, queueSize = 1000, coalesceSize = 4096, highWater = None):
+			"""Writes to the COM Port on a separate thread, so send() only queues the message and returns.
+			Small messages that pile up are joined together and written with one write() call.
+			If the thread runs into an error, it stops and send() returns False.
+
+			queueSize (int) - How many messages can wait to be written before send() waits for room
+			coalesceSize (int) - How many bytes to join together into one write
+			highWater (int) - How many bytes the device can have waiting to go out before writing pauses
+				- If None: Does not check the device's output buffer
+
+			Example Input: startWrite()
+			Example Input: startWrite(highWater = 4096)
 			"""
 
 			if (not self.isOpen()):
 				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
 				return
 
-			if (reply is not None):
-				if (not isinstance(reply, bytes)):
-					reply = reply.encode("utf-8")
+			if ((self.writer is not None) and self.writer.isAlive()):
+				warnings.warn(f"Already writing to {self.__repr__()}", Warning, stacklevel = 2)
+				return
 
-			if (end is None):
-				if (length is None):
-					length = 1
-				message = self.device.read(length)
-			elif (end == "\n"):
-				if (lines <= 1):
-					if (length is None):
-						length = -1
-					message = self.device.readline(length)
-				else:
-					message = self.device.readlines(lines)
-			else:
-				message = b""
+			self.writer = Writer(self, queueSize = queueSize, coalesceSize = coalesceSize, highWater = highWater)
+			self.writer.start()
 
-				if (not isinstance(end, bytes)):
-					end = end.encode("utf-8")
-				if (length is None):
-					length = 1
+		def stopWrite(self, flush = True, timeout = None):
+			"""Stops writing to the COM Port on a separate thread.
+			Raises the error that stopped the thread, if there was one.
 
-				linesRead = 0
-				while True:
-					while True:
-						if (not self.isOpen()):
-							return
-
-						value = self.device.read(length)
-						message += value
-						if (end in value):
-							linesRead += 1
-							break
-					
-					if (linesRead >= lines):
-						break
+			flush (bool) - If True: Writes what is still queued first
+				- If False: What is still queued is thrown away
+			timeout (float) - How many seconds to wait for the thread to finish
+				- If None: Wait forever
 
-			if (reply is not None):
-				try:
-					self.device.write(reply)
-				except Exception as error_1:
-					if (reply_retryPrintError):
-						traceback.print_exception(type(error_1), error_1, error_1.__traceback__)
-					attempts = 0
-					while (attempts > reply_retryAttempts):
-						try: 
-							self.device.write(reply)
-							break
-						except Exception as error_2:
-							if (reply_retryPrintError):
-								traceback.print_exception(type(error_2), error_2, error_2.__traceback__)
-							time.sleep(reply_retryDelay / 1000)
-					else:
-						return False
+			Example Input: stopWrite()
+			Example Input: stopWrite(flush = False)
+			"""
 
-			if (decode):
-				message = message.decode("utf-8")
+			if (self.writer is None):
+				return
 
-			return message
+			writer, self.writer = self.writer, None
+			writer.stop(flush = flush, timeout = timeout)
+			writer.checkError()
+
+		def isWriting(self):
+			"""Returns if the COM Port is being written to on a separate thread.
+
+			Example Input: isWriting()
+			"""
+
+			return (self.writer is not None) and self.writer.isAlive()
+
+		def flush(self, timeout = None):
+			"""Waits until everything sent so far has left the computer.
+			Returns False if 'timeout' runs out first.
+
+			timeout (float) - How many seconds to wait for the queue from startWrite()
+				- If None: Wait forever
+
+			Example Input: flush()
+			Example Input: flush(timeout = 1)
+			"""
+
+			if (not self.isOpen()):
+				warnings.warn(f"Serial port has not been opened yet for {self.__repr__()}\n Make sure that ports are available and then launch this application again", Warning, stacklevel = 2)
+				return False
+
+			if ((self.writer is not None) and (not self.writer.flush(timeout = timeout))):
+				return False
+
+			self.device.flush()
+			return True
 
 		def checkId(self, vendor = None, product = None):
 			"""Returns if the connected COM Port has the given vendor id and/or product id.
@@ -747,13 +3111,11 @@ class ComPort(API_Com.utilities.Utilities_Container):
 				product = [product]
 
 			if ((self.vendorId is None) or (self.productId is None)):
-				for item in serial.tools.list_ports.comports():
-					if (item.device == port):
-						vendorId = item.vid
-						productId = item.pid
-						break
-				else:
+				item = portInventory.findDevice(self.port)
+				if (item is None):
 					return
+				vendorId = item.vid
+				productId = item.pid
 			else:
 				vendorId = self.vendorId
 				productId = self.productId
@@ -4,6 +4,7 @@ __version__ = "2.0.0"
 import re
 import os
 import sys
+import time
 import datetime
 
 import io
@@ -27,6 +28,8 @@ from email.mime.image import MIMEImage as email_MIMEImage
 from email.mime.multipart import MIMEMultipart as email_MIMEMultipart
 
 import MyUtilities.wxPython
+
+import API_Com.utilities
 # import API_Database as Database
 
 class ConnectionAlreadyOpenError(Exception):
@@ -151,6 +154,15 @@ class EmailServer():
 
 	def __init__(self):
 		self.current_address = None
+		self.metrics = API_Com.utilities.Metrics()
+
+	def stats(self):
+		"""Returns the metrics for this email server as a dictionary that can be saved as json.
+
+		Example Input: stats()
+		"""
+
+		return self.metrics.snapshot()
 
 	@contextlib.contextmanager
 	def openRead(self, address, password, host, port = None, *, encrypt = True, **kwargs):
@@ -174,12 +186,14 @@ class EmailServer():
 		self.current_readMode = True
 
 		try:
+			start = time.perf_counter()
 			with imaplib.IMAP4(host = host or "imap4.gmail.com", port = int(port or 143)) as serverHandle:
 				if (encrypt):
 					serverHandle.starttls()
 
 				serverHandle.login(address, password)
 				serverHandle.select("Inbox")
+				self.metrics.opened(time.perf_counter() - start)
 
 				yield serverHandle
 
@@ -209,11 +223,13 @@ class EmailServer():
 		self.current_readMode = False
 
 		try:
+			start = time.perf_counter()
 			with smtplib.SMTP(host = host or "smtp.gmail.com", port = int(port or 587)) as serverHandle:
 				if (encrypt):
 					serverHandle.starttls()
 
 				serverHandle.login(address, password)
+				self.metrics.opened(time.perf_counter() - start)
 
 				yield serverHandle
 
@@ -327,6 +343,7 @@ class EmailServer():
 
 			#Format Email
 			raw_email = data[0][1]
+			self.metrics.received(len(raw_email))
 			raw_email_string = raw_email.decode("utf-8")
 			emailHandle = email.message_from_string(raw_email_string)
 
@@ -348,12 +365,16 @@ class EmailServer():
 			if (testing_doNotSend):
 				print(f"An email would have been sent to {address} from {message['From']}")
 			else:
-				serverHandle.sendmail(message["From"], address, message.as_string())
+				payload = message.as_string()
+				start = time.perf_counter()
+				serverHandle.sendmail(message["From"], address, payload)
+				self.metrics.sent(len(payload), time.perf_counter() - start)
 
 			if (testing_printEmail):
 				print(message.as_string())
 
 		except Exception as error:
+			self.metrics.failed()
 			if ((onError is None) or (not onError(error))):
 				raise error
 
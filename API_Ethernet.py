@@ -3,9 +3,10 @@ __version__ = "2.0.0"
 #Import standard elements
 import re
 import sys
+import time
 import warnings
+import threading
 import traceback
-import subprocess
 
 #Import communication elements for talking to other devices such as printers, the internet, a raspberry pi, etc.
 import select
@@ -15,6 +16,10 @@ import netaddr
 import MyUtilities.common
 import MyUtilities.threadManager
 
+import API_Com.network
+import API_Com.framing
+import API_Com.utilities
+
 #Required Modules
 ##py -m pip install
 	# netaddr
@@ -45,6 +50,8 @@ class Ethernet(API_Com.utilities.Utilities_Container, MyUtilities.threadManager.
 	_________________________________________________________
 	"""
 
+	indexCatalogue = ("address", ("address", "port"))
+
 	def __init__(self, parent):
 		"""Defines the internal variables needed to run."""
 
@@ -54,9 +61,13 @@ class Ethernet(API_Com.utilities.Utilities_Container, MyUtilities.threadManager.
 	
 		#Internal Variables
 		self.ipScanBlock = [] #Used to store active ip addresses from an ip scan
-		self.ipScanStop  = False #Used to stop the ip scanning function early
+		self.scanner = None #Used to stop the ip scanning function early
+		self.scanThread = None
+		self.discoveryCache = None #Used to skip addresses that were scanned recently
+		self.neighbours = False #Used to find hosts from the ARP table before scanning
 
 		self._listener_scan = None
+		self.prober = API_Com.network.Prober() #Used by ping() and probe()
 
 	@MyUtilities.common.makeProperty()
 	class listener_scan():
@@ -96,93 +107,272 @@ class Ethernet(API_Com.utilities.Utilities_Container, MyUtilities.threadManager.
 
 	def ping(self, address):
 		"""Returns True if the given ip address is online. Otherwise, it returns False.
-		Code modified from http://www.opentechguides.com/how-to/article/python/57/python-ping-subnet.html
+		This is done in-process by 'prober'; see probe().
 
 		address (str) - The ip address to ping
 
 		Example Input: ping("169.254.231.0")
 		"""
 
-		#Configure subprocess to hide the console window
-		info = subprocess.STARTUPINFO()
-		info.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-		info.wShowWindow = subprocess.SW_HIDE
+		return self.probe(address)[0]
+
+	def probe(self, address):
+		"""Checks if the given ip address is online without starting a process.
+		Uses an ICMP echo if the system allows it without being root, then tries to connect to a few common TCP ports.
+		Returns if it is online and how many seconds it took to answer; the time is None if it is offline.
+		Use setProbe() to change the timeout or which ports are tried.
+
+		address (str) - The ip address or host name
+
+		Example Input: probe("169.254.231.0")
+		"""
 
 		#Remove Whitespace
 		address = re.sub("\s", "", address)
 
-		#Ping the address
-		output = subprocess.Popen(['ping', '-n', '1', '-w', '500', address], stdout=subprocess.PIPE, startupinfo=info).communicate()[0]
-		output = output.decode("utf-8")
+		return self.prober.probe(address)
 
-		#Interpret Ping Results
-		if ("Destination host unreachable" in output):
-			return False #Offline
+	def setProbe(self, timeout = 0.5, ports = None, icmp = True):
+		"""Changes how ping() and probe() check if an address is online.
 
-		elif ("Request timed out" in output):
-			return False #Offline
+		timeout (float) - How many seconds to wait for each address
+		ports (list) - Which TCP ports to try connecting to
+			- If None: Uses API_Com.network.Prober.defaultPorts
+		icmp (bool) - If True: Sends an ICMP echo first, if the system allows it
 
-		elif ("could not find host" in output):
-			return False #Offline
+		Example Input: setProbe(timeout = 0.2)
+		Example Input: setProbe(ports = (9100, 515, 631))
+		"""
 
+		self.prober = API_Com.network.Prober(timeout = timeout, ports = ports, icmp = icmp)
+
+	def setDiscoveryCache(self, path = None, ttl = 300, neighbours = True):
+		"""Makes scans remember what they found, so repeat scans only check addresses that are unknown or older than 'ttl'.
+		This is used by scanIpRange(), startScanIpRange() and getAll().
+
+		path (str) - Where to save the cache as json, so it lasts between runs
+			- If None: It is only kept in memory
+		ttl (float) - How many seconds a result is good for
+			- If None: Turns the cache off
+		neighbours (bool) - If True: Hosts in the kernel's ARP table are online without being checked
+
+		Example Input: setDiscoveryCache()
+		Example Input: setDiscoveryCache("discovery.json", ttl = 600)
+		Example Input: setDiscoveryCache(ttl = None)
+		"""
+
+		self.neighbours = neighbours
+		if (ttl is None):
+			self.discoveryCache = None
 		else:
-			return True #Online
+			self.discoveryCache = API_Com.network.DiscoveryCache(path = path, ttl = ttl)
 
-	def startScanIpRange(self, start = None, end = None, *, asBackground = True):
-		"""Scans a range of ip addresses in the given range for online ones.
-		Because this can take some time, it saves the list of ip addresses as an internal variable.
-		Special thanks to lovetocode on http://stackoverflow.com/questions/4525492/python-list-of-addressable-ip-addresses
+	def getNetworks(self, loopback = False):
+		"""Returns the networks this computer is on, found from each network interface.
+
+		loopback (bool) - If True: Includes the loopback network
+
+		Example Input: getNetworks()
+		"""
+
+		return API_Com.network.getNetworks(loopback = loopback)
+
+	def getScanRange(self, start = None, end = None, network = None):
+		"""Returns the ip addresses to scan.
+		They are made as they are needed, so a /16 or larger does not have to fit in memory.
 
 		start (str) - The ip address to start at
-			- If None: Will use the current ip address group and start at 0
+			- If None: Will scan 'network'
 		end (str)  - The ip address to stop after
-			- If None: Will use the current ip address group and end at 255
+			- If None: Will scan 'network'
+		network (str) - Which network to scan, in cidr notation; can also be a list of them
+			- If None: Will scan every network this computer is on; ones larger than a /20 only have the /24 around this computer scanned
 
-		Example Input: startScanIpRange()
-		Example Input: startScanIpRange("169.254.231.0", "169.254.231.24")
+		Example Input: getScanRange("169.254.231.0", "169.254.231.24")
+		Example Input: getScanRange(network = "10.20.0.0/20")
 		"""
 
-		def runFunction(self, start, end):
-			"""Needed to scan on a separate thread so the GUI is not tied up."""
-
+		if ((start is not None) and (end is not None)):
 			#Remove Whitespace
 			start = re.sub("\s", "", start)
 			end = re.sub("\s", "", end)
+			return API_Com.network.iterHosts(netaddr.IPRange(start, end))
 
-			#Get ip scan range
-			networkAddressSet = list(netaddr.IPRange(start, end))
+		return API_Com.network.iterHosts(network)
 
-			#For each IP address in the subnet, run the ping command with the subprocess.popen interface
-			for i in range(len(networkAddressSet)):
-				if (self.ipScanStop):
-					self.ipScanStop = False
-					break
+	def getScanner(self, start = None, end = None, *, network = None, concurrency = 256, rate = None):
+		"""Returns an API_Com.network.Scanner for a range of ip addresses, which checks them the same way probe() does.
 
-				address = str(networkAddressSet[i])
-				online = self.ping(address)
+		start (str) - The ip address to start at
+			- If None: Will scan 'network'
+		end (str)  - The ip address to stop after
+			- If None: Will scan 'network'
+		network (str) - Which network to scan, in cidr notation; can also be a list of them
+			- If None: Will scan every network this computer is on; ones larger than a /20 only have the /24 around this computer scanned
+		concurrency (int) - How many addresses to check at once
+		rate (float) - The most addresses to start checking each second
+			- If None: There is no limit
+
+		Example Input: getScanner()
+		Example Input: getScanner("169.254.231.0", "169.254.231.24", rate = 100)
+		"""
 
-				#Determine if the address is desired by the user
-				if (online):
-					self.ipScanBlock.append(address)
+		return API_Com.network.Scanner(self.getScanRange(start, end, network), timeout = self.prober.timeout, ports = self.prober.ports, 
+			icmp = self.prober.icmp, concurrency = concurrency, rate = rate, cache = self.discoveryCache, neighbours = self.neighbours)
 
-			#Mark end of message
-			self.ipScanBlock.append(None)
+	def scanIpRange(self, start = None, end = None, *, network = None, concurrency = 256, rate = None):
+		"""Yields each online ip address in the given range as soon as it answers.
+		Every address is checked at the same time (up to 'concurrency'), so the whole range takes about one probe timeout.
+		Closing the generator stops the scan.
 
-		if ((start is None) or (end is None)):
-			# raise FutureWarning("Add code here for getting the current ip Address")
-			currentIp = socket.gethostbyname(socket.gethostname())
-			start = currentIp[:-2] + "0"
-			end = currentIp[:-2] + "255"
+		start (str) - The ip address to start at
+			- If None: Will scan 'network'
+		end (str)  - The ip address to stop after
+			- If None: Will scan 'network'
+		network (str) - Which network to scan, in cidr notation; can also be a list of them
+			- If None: Will scan every network this computer is on; ones larger than a /20 only have the /24 around this computer scanned
+		concurrency (int) - How many addresses to check at once
+		rate (float) - The most addresses to start checking each second
+			- If None: There is no limit
+
+		Example Input: scanIpRange()
+		Example Input: scanIpRange("169.254.231.0", "169.254.231.24")
+		Example Input: scanIpRange(network = ["10.20.0.0/20", "192.168.0.0/24"])
+		"""
 
-		#Listen for data on a separate thread
+		for host in self.getScanner(start, end, network = network, concurrency = concurrency, rate = rate):
+			yield host.address
+
+	async def scanIpRange_async(self, start = None, end = None, *, network = None, concurrency = 256, rate = None):
+		"""Yields each online ip address in the given range as soon as it answers, without blocking the event loop.
+		See scanIpRange().
+
+		Example Input: async for address in scanIpRange_async(): pass
+		"""
+
+		async for host in API_Com.network.scan_async(self.getScanRange(start, end, network), timeout = self.prober.timeout, 
+			ports = self.prober.ports, icmp = self.prober.icmp, concurrency = concurrency, rate = rate, cache = self.discoveryCache, 
+			neighbours = self.neighbours):
+
+			yield host.address
+
+	def getServiceScanner(self, ports, start = None, end = None, *, network = None, addresses = None, timeout = 1, 
+		concurrency = 512, rate = None, banner = False):
+		"""Returns an API_Com.network.ServiceScanner for the given ports on a range of ip addresses.
+
+		ports (list) - Which TCP ports to try on each address
+		start (str) - The ip address to start at
+			- If None: Will scan 'network'
+		end (str)  - The ip address to stop after
+			- If None: Will scan 'network'
+		network (str) - Which network to scan, in cidr notation; can also be a list of them
+			- If None: Will scan every network this computer is on; ones larger than a /20 only have the /24 around this computer scanned
+		addresses (list) - Which ip addresses to scan instead of a range; can also be (address, port) pairs
+		timeout (float) - How many seconds to wait for each connection
+		concurrency (int) - How many connections to try at once
+		rate (float) - The most connections to start each second
+			- If None: There is no limit
+		banner (bool) - If True: Waits up to 'timeout' for each service to send something after connecting
+
+		Example Input: getServiceScanner((9100, 502, 10000))
+		"""
+
+		if (addresses is None):
+			addresses = self.getScanRange(start, end, network)
+
+		return API_Com.network.ServiceScanner(addresses, ports = ports, timeout = timeout, concurrency = concurrency, rate = rate, banner = banner)
+
+	def scanServices(self, ports, start = None, end = None, *, network = None, addresses = None, timeout = 1, 
+		concurrency = 512, rate = None, banner = False):
+		"""Yields an API_Com.network.Service for each address and port that accepts a connection, as soon as it does.
+		Many connections are tried at once from one thread; closing the generator stops the scan.
+		Give what it yields to openService() to connect to it.
+		See getServiceScanner() for the arguments.
+
+		Example Input: scanServices((9100, 502, 10000))
+		Example Input: scanServices((22,), network = "10.20.0.0/20", banner = True)
+		Example Input: scanServices((9100,), addresses = ["192.168.0.21", "192.168.0.22"])
+		"""
+
+		return iter(self.getServiceScanner(ports, start, end, network = network, addresses = addresses, timeout = timeout, 
+			concurrency = concurrency, rate = rate, banner = banner))
+
+	async def scanServices_async(self, ports, start = None, end = None, *, network = None, addresses = None, timeout = 1, 
+		concurrency = 512, rate = None, banner = False):
+		"""Yields an API_Com.network.Service for each address and port that accepts a connection, without blocking the event loop.
+		See scanServices().
+
+		Example Input: async for service in scanServices_async((9100,)): pass
+		"""
+
+		if (addresses is None):
+			addresses = self.getScanRange(start, end, network)
+
+		async for service in API_Com.network.scanServices_async(addresses, ports = ports, timeout = timeout, 
+			concurrency = concurrency, rate = rate, banner = banner):
+
+			yield service
+
+	def openService(self, service, label = None, **kwargs):
+		"""Opens a connection to a service found by scanServices().
+		Returns the child that was opened.
+
+		service (Service) - What to connect to; can also be an (address, port) pair
+		label (any) - What to call the child
+			- If None: Makes a new child
+		Any other keywords are given to Child.open()
+
+		Example Input: openService(service)
+		Example Input: openService(("192.168.0.21", 9100), label = "printer", timeout = 5)
+		"""
+
+		child = self.add(label)
+		child.open(service, **kwargs)
+		return child
+
+	def startScanIpRange(self, start = None, end = None, *, network = None, asBackground = True, concurrency = 256, rate = None):
+		"""Scans a range of ip addresses in the given range for online ones.
+		Because this can take some time, it saves the list of ip addresses as an internal variable.
+		Special thanks to lovetocode on http://stackoverflow.com/questions/4525492/python-list-of-addressable-ip-addresses
+
+		start (str) - The ip address to start at
+			- If None: Will scan 'network'
+		end (str)  - The ip address to stop after
+			- If None: Will scan 'network'
+		network (str) - Which network to scan, in cidr notation; can also be a list of them
+			- If None: Will scan every network this computer is on; ones larger than a /20 only have the /24 around this computer scanned
+		asBackground (bool) - If True: Scans on a separate thread; use checkScanIpRange() to get the results
+			- If False: Returns the online addresses, in order
+		concurrency (int) - How many addresses to check at once
+		rate (float) - The most addresses to start checking each second
+			- If None: There is no limit
+
+		Example Input: startScanIpRange()
+		Example Input: startScanIpRange("169.254.231.0", "169.254.231.24")
+		Example Input: startScanIpRange(network = "10.20.0.0/20")
+		"""
+
+		def runFunction():
+			"""Needed to scan on a separate thread so the GUI is not tied up."""
+
+			try:
+				for host in scanner:
+					self.ipScanBlock.append(host.address)
+			finally:
+				#Mark end of message
+				self.ipScanBlock.append(None)
+
+		self.stopScanIpRange()
+		scanner = self.getScanner(start, end, network = network, concurrency = concurrency, rate = rate)
 		self.ipScanBlock = []
 
-		if (asBackground):
-			raise FutureWarning("Get this working again")
-			self.backgroundRun(runFunction, [self, start, end])
-		else:
-			runFunction(self, start, end)
-			return self.ipScanBlock
+		if (not asBackground):
+			return sorted((host.address for host in scanner), key = netaddr.IPAddress)
+
+		#Listen for data on a separate thread
+		self.scanner = scanner
+		self.scanThread = threading.Thread(target = runFunction, name = "API_Com.Ethernet.scan", daemon = True)
+		self.scanThread.start()
 
 	def checkScanIpRange(self):
 		"""Checks for found active ip addresses from the scan.
@@ -192,7 +382,6 @@ class Ethernet(API_Com.utilities.Utilities_Container, MyUtilities.threadManager.
 		Example Input: checkScanIpRange()
 		"""
 
-		raise FutureWarning("Get this working again")
 		#The entire message has been read once the last element is None.
 		finished = False
 		if (len(self.ipScanBlock) != 0):
@@ -202,20 +391,29 @@ class Ethernet(API_Com.utilities.Utilities_Container, MyUtilities.threadManager.
 
 		return self.ipScanBlock, finished
 
-	def stopScanIpRange(self):
-		"""Stops listening for data from the socket.
-		Note: The data is still in the buffer. You can resume listening by starting startRecieve() again.
-		To flush it, close the socket and then open it again.
+	def stopScanIpRange(self, timeout = None):
+		"""Stops scanning early and waits for it to finish.
+		The addresses found so far are still returned by checkScanIpRange().
+
+		timeout (float) - How many seconds to wait
+			- If None: Wait forever
 
 		Example Input: stopScanIpRange()
 		"""
 
-		raise FutureWarning("Get this working again")
-		self.ipScanStop = True
+		if (self.scanner is None):
+			return
+
+		self.scanner.cancel()
+		if (self.scanThread.is_alive() and (self.scanThread is not threading.current_thread())):
+			self.scanThread.join(timeout)
+		self.scanner = None
 
 	class Child(API_Com.utilities.Utilities_Child):
 		"""An Ethernet connection."""
 
+		__slots__ = ("dataBlock", "clientDict", "recieveStop", "recieveListening", "device", "stream", "address", "port", "readBuffer")
+
 		def __init__(self, parent, label):
 			"""Defines the internal variables needed to run."""
 
@@ -234,6 +432,7 @@ class Ethernet(API_Com.utilities.Utilities_Container, MyUtilities.threadManager.
 			self.stream = None
 			self.address = None
 			self.port = None
+			self.readBuffer = bytearray() #What has been recieved but not returned yet; see readFrame()
 
 		def __exit__(self, exc_type, exc_value, traceback):
 			"""Allows the user to use a with statement to make sure the socket connection gets closed after use."""
@@ -242,20 +441,35 @@ class Ethernet(API_Com.utilities.Utilities_Container, MyUtilities.threadManager.
 
 			return API_Com.utilities.Utilities_Container.__exit__(self, exc_type, exc_value, traceback)
 
-		def open(self, address, port = 9100, error = False, pingCheck = False, 
+		def open(self, address = None, port = None, error = False, pingCheck = False, 
 			timeout = -1, stream = True):
 			"""Opens the socket connection.
 
-			address (str) - The ip address/website you are connecting to
+			address (str) - The ip address/website you are connecting to; can also be a Service from scanServices(), or an (address, port) pair
+				- If None: Will use the address it was last opened with
 			port (int)    - The socket port that is being used
+				- If None: Will use the port it was last opened with, or 9100
 			error (bool)  - Determines what happens if an error occurs
 				If True: If there is an error, returns an error indicator. Otherwise, returns a 0
 				If False: Raises an error exception
 			pingCheck (bool) - Determines if it will ping an ip address before connecting to it to confirm it exists
 
 			Example Input: open("www.example.com")
+			Example Input: open(service)
 			"""
 
+			if (isinstance(address, tuple)):
+				address, port = address[0], address[1]
+
+			if (address is None):
+				address = self.address
+				if (address is None):
+					errorMessage = f"'address' cannot be None for open() in {self.__repr__()}"
+					raise ValueError(errorMessage)
+
+			if (port is None):
+				port = self.port or 9100
+
 			if (self.device is not None):
 				warnings.warn(f"Socket already opened", Warning, stacklevel = 2)
 
@@ -289,11 +503,20 @@ class Ethernet(API_Com.utilities.Utilities_Container, MyUtilities.threadManager.
 
 			#Connect to the socket
 			if (stream):
+				start = time.perf_counter()
 				if (error):
 					error = self.device.connect_ex((address, port))
+					if (error):
+						self.metrics.failed()
+					else:
+						self.metrics.opened(time.perf_counter() - start)
 					return error
 				else:
-					self.device.connect((address, port))
+					with self.metrics.timer("open"):
+						self.device.connect((address, port))
+					self.metrics.opened()
+			else:
+				self.metrics.opened()
 
 			#Finish
 			if (pingCheck):
@@ -328,13 +551,16 @@ class Ethernet(API_Com.utilities.Utilities_Container, MyUtilities.threadManager.
 
 			self.device = None
 
-		def send(self, data):
+		def send(self, data, codec = None):
 			"""Sends data across the socket connection.
 
 			data (str) - What will be sent
+			codec (API_Com.framing.Codec) - What to wrap the data in, such as API_Com.framing.getCodec("length")
+				- If None: The data is sent as is
 
 			Example Input: send("lorem")
 			Example Input: send(1234)
+			Example Input: send(b"\x01\x02", codec = lengthCodec)
 			"""
 
 			#Account for numbers, lists, etc.
@@ -345,12 +571,66 @@ class Ethernet(API_Com.utilities.Utilities_Container, MyUtilities.threadManager.
 			if (type(data) != bytes):
 				data = data.encode() #The .encode() is needed for python 3.4, but not for python 2.7
 
+			if (codec is not None):
+				data = codec.encode(data)
+
 			#Send the data
-			if (self.stream == "SOCK_DGRAM"):
-				self.device.sendto(data, (self.address, self.port))
-			else:
-				self.device.sendall(data)
-				# self.device.send(data)
+			start = time.perf_counter()
+			try:
+				if (self.stream == "SOCK_DGRAM"):
+					self.device.sendto(data, (self.address, self.port))
+				else:
+					self.device.sendall(data)
+					# self.device.send(data)
+			except Exception:
+				self.metrics.failed()
+				raise
+			self.metrics.sent(len(data), time.perf_counter() - start)
+
+		def readFrame(self, codec, timeout = None, bufferSize = 4096):
+			"""Returns the payload of the next valid frame recieved, as found by 'codec'.
+			Frames whose CRC is wrong are skipped.
+			Returns None if 'timeout' runs out or the connection closes first; what was recieved stays buffered for next time.
+			This cannot be used while startRecieve() is running.
+
+			codec (API_Com.framing.Codec) - How frames are marked, such as API_Com.framing.getCodec("length")
+			timeout (float) - How many seconds to wait
+				- If None: Wait forever
+			bufferSize (int) - The most bytes to recieve at a time
+
+			Example Input: readFrame(lengthCodec)
+			Example Input: readFrame(API_Com.framing.getCodec("stxetx", crc = "crc16"), timeout = 1)
+			"""
+
+			if (self.device is None):
+				warnings.warn(f"Socket has not been opened yet for {self.__repr__()}", Warning, stacklevel = 2)
+				return
+
+			if (self.recieveListening):
+				warnings.warn(f"Cannot use readFrame() while recieving from {self.__repr__()}; use stopRecieve() first", Warning, stacklevel = 2)
+				return
+
+			start = time.perf_counter()
+			deadline = None if (timeout is None) else (time.monotonic() + timeout)
+			while True:
+				frame = codec.decodeOne(self.readBuffer)
+				if (frame is not None):
+					self.metrics.received(len(frame), time.perf_counter() - start)
+					return frame
+
+				if (deadline is not None):
+					remaining = deadline - time.monotonic()
+					if ((remaining <= 0) or (not select.select([self.device], [], [], remaining)[0])):
+						return None
+
+				try:
+					data = self.device.recv(bufferSize)
+				except Exception:
+					self.metrics.failed()
+					raise
+				if (not data):
+					return None
+				self.readBuffer += data
 
 		def startRecieve(self, bufferSize = 256, scanDelay = 500):
 			"""Retrieves data from the socket connection.
@@ -384,7 +664,9 @@ class Ethernet(API_Com.utilities.Utilities_Container, MyUtilities.threadManager.
 						break
 
 					#Retrieve the block of data
-					data = self.device.recv(bufferSize).decode() #The .decode is needed for python 3.4, but not for python 2.7
+					data = self.device.recv(bufferSize)
+					self.metrics.received(len(data))
+					data = data.decode() #The .decode is needed for python 3.4, but not for python 2.7
 					# data, address = self.device.recvfrom(bufferSize)#.decode() #The .decode is needed for python 3.4, but not for python 2.7
 
 					#Check for end of data stream
@@ -550,6 +832,7 @@ class Ethernet(API_Com.utilities.Utilities_Container, MyUtilities.threadManager.
 			#Send the data
 			client = self.clientDict[clientIp]["device"]
 			client.sendall(data)
+			self.metrics.sent(len(data))
 
 			# if (logoff):
 			# 	client.shutdown(socket.SHUT_WR)
@@ -583,7 +866,9 @@ class Ethernet(API_Com.utilities.Utilities_Container, MyUtilities.threadManager.
 						break
 
 					#Retrieve the block of data
-					data = client.recv(bufferSize).decode() #The .decode is needed for python 3.4, but not for python 2.7
+					data = client.recv(bufferSize)
+					self.metrics.received(len(data))
+					data = data.decode() #The .decode is needed for python 3.4, but not for python 2.7
 
 					#Save the data
 					self.clientDict[clientIp]["data"] += data
@@ -2,10 +2,12 @@ __version__ = "2.0.0"
 
 #Import standard elements
 import sys
+import time
 
 # #Import communication elements for talking to other devices such as printers, the internet, a raspberry pi, etc.
 import usb
 import select
+import socket
 
 import API_Com.utilities
 
@@ -38,6 +40,8 @@ class USB(API_Com.utilities.Utilities_Container):
 	_________________________________________________________
 	"""
 
+	indexCatalogue = (("vendorId", "productId"),)
+
 	def __init__(self, parent):
 		"""Defines the internal variables needed to run."""
 
@@ -65,6 +69,8 @@ class USB(API_Com.utilities.Utilities_Container):
 	class Child(API_Com.utilities.Utilities_Child):
 		"""A USB conection."""
 
+		__slots__ = ("device", "vendorId", "productId", "current_config", "current_interface", "current_endpoint")
+
 		def __init__(self, parent, label):
 			"""Defines the internal variables needed to run."""
 
@@ -73,6 +79,8 @@ class USB(API_Com.utilities.Utilities_Container):
 		
 			#Internal Variables
 			self.device = None
+			self.vendorId = None
+			self.productId = None
 
 			self.current_config = None
 			self.current_interface = None
@@ -102,9 +110,14 @@ class USB(API_Com.utilities.Utilities_Container):
 				vendor = vendor[0]
 
 			#Locate the device
+			start = time.perf_counter()
 			self.device = usb.core.find(idVendor = vendor, idProduct = product)#, find_all = True)
 			if (self.device is None):
+				self.metrics.failed()
 				raise ValueError(f"Device {vendor}:{product} not found in open() for {self.__repr__()}")
+			self.vendorId = vendor
+			self.productId = product
+			self.metrics.opened(time.perf_counter() - start)
 
 			#Get info on device
 			self.catalogue[None] = self.device
@@ -176,9 +189,11 @@ class USB(API_Com.utilities.Utilities_Container):
 				for i in range(300):
 					try:
 						data = device.read(endpoint.bEndpointAddress, endpoint.wMaxPacketSize, timeout = None)
+						self.metrics.received(len(data))
 						print("@1", data)
 						print("@3", ''.join([chr(x) for x in data]))
 					except usb.core.USBError as error:
+						self.metrics.failed()
 						print("@2")
 						data = None
 						if (error.__str__() == "Operation timed out"):
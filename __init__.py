@@ -1,30 +1,67 @@
-# import lazyLoad
-# lazyLoad.load("wx", useCatalogue = False)
-# lazyLoad.load(
-# 	"usb", 
-# 	"email", 
-# 	"socket", 
-# 	"serial", 
-
-# 	"qrcode", 
-# 	"barcode", 
-
-# 	"io", 
-# 	"xml", 
-# 	"glob", 
-# 	"base64", 
-# 	"zipfile", 
-
-# 	"bisect", 
-# 	"select", 
-# 	"netaddr", 
-# 	"smtplib", 
-
-# 	"API_Database", 
-# ) 
-
-
-#Import the controller module as this namespace
-# from .controller import *
-# __version__ = controller.__version__
-# del controller
\ No newline at end of file
+#Import standard elements
+import importlib
+
+#Nothing is imported until it is used, so that a serial-only program does not pay for wx, exchangelib, qrcode, etc.
+#A missing optional dependency will only raise an ImportError once the transport that needs it is used
+##{name (str): module that contains it (str)}
+lazyCatalogue = {
+	"__version__": "controller",
+	"controller": "controller",
+	"utilities": "utilities",
+	"framing": "framing",
+	"capture": "capture",
+	"network": "network",
+	"loopback": "loopback",
+	"API_ComPort": "API_ComPort",
+	"API_Ethernet": "API_Ethernet",
+	"API_Email": "API_Email",
+	"API_Barcode": "API_Barcode",
+	"API_Usb": "API_Usb",
+
+	"CommunicationManager": "controller",
+	"rootManager": "controller",
+	"getRootManager": "controller",
+	"registerTransport": "controller",
+	"ethernetError": "controller",
+	"getEthernet": "controller",
+	"getCom": "controller",
+	"getUsb": "controller",
+	"getBarcode": "controller",
+	"getEmail": "controller",
+
+	"ComPort": "API_ComPort",
+	"Ethernet": "API_Ethernet",
+	"Barcode": "API_Barcode",
+	"USB": "API_Usb",
+	"EmailServer": "API_Email",
+	"ExchangeServer": "API_Email",
+	"sendEmail": "API_Email",
+
+	"VirtualPort": "loopback",
+	"getCodec": "framing",
+	"registerCodec": "framing",
+}
+
+def __getattr__(name):
+	"""Imports the module that 'name' lives in the first time it is asked for.
+
+	Example Input: __getattr__("getCom")
+	"""
+
+	if (name not in lazyCatalogue):
+		errorMessage = f"module {__name__!r} has no attribute {name!r}"
+		raise AttributeError(errorMessage)
+
+	moduleName = lazyCatalogue[name]
+	module = importlib.import_module(f"{__name__}.{moduleName}")
+	if (name == moduleName):
+		value = module
+	else:
+		value = getattr(module, name)
+
+	#Remember it so __getattr__ is not needed next time
+	globals()[name] = value
+	return value
+
+def __dir__():
+	return sorted(set(globals()) | set(lazyCatalogue))
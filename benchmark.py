@@ -0,0 +1,582 @@
+__version__ = "2.0.0"
+
+#Import standard elements
+import sys
+import json
+import time
+import platform
+import random
+import argparse
+import importlib
+import tracemalloc
+import threading
+import statistics
+import subprocess
+
+#Use: py -m API_Com.benchmark
+#Use: py -m API_Com.benchmark --repeat 10 --output benchmark.json
+#Use: py -m API_Com.benchmark --only startup
+
+#What benchmarks can be ran
+##{label (str): (group (str), function (function))}
+benchmarkCatalogue = {}
+
+def benchmark(label, group = "other"):
+	"""Decorator that adds a function to the benchmark catalogue.
+	The function is given how many times to repeat and should return a dictionary of results.
+
+	Example Use: @benchmark("import controller", group = "startup")
+	"""
+
+	def decorator(function):
+		benchmarkCatalogue[label] = (group, function)
+		return function
+	return decorator
+
+def summarize(valueList):
+	"""Returns the min, median, and max of the given measurements.
+
+	Example Input: summarize([0.1, 0.2, 0.15])
+	"""
+
+	return {"min": min(valueList), "median": statistics.median(valueList), "max": max(valueList), "count": len(valueList)}
+
+def percentile(valueList, percent):
+	"""Returns the value below which 'percent' of the measurements fall.
+
+	Example Input: percentile([0.1, 0.2, 0.15], 99)
+	"""
+
+	valueList = sorted(valueList)
+	index = min(len(valueList) - 1, max(0, round(percent / 100 * len(valueList)) - 1))
+	return valueList[index]
+
+#Startup Benchmarks
+##Each startup case runs in its own interpreter, so nothing it measures has been imported yet
+##The hardware back-ends are swapped out so the case does not depend on what is plugged in
+stubCode = """
+import sys
+sys.path[:0] = {path!r}
+
+try:
+	import serial.tools.list_ports
+	class _FakePort():
+		def __init__(self, i):
+			self.device = f"/dev/ttyFAKE{{i}}"; self.name = f"ttyFAKE{{i}}"; self.description = "Benchmark port"; self.hwid = "USB VID:PID=05F9:4204"
+			self.vid = 0x05F9; self.pid = 0x4204 + i; self.serial_number = f"BENCH{{i}}"; self.location = None
+			self.manufacturer = "API_Com"; self.product = "Benchmark"; self.interface = None
+	serial.tools.list_ports.comports = lambda *args, **kwargs: [_FakePort(i) for i in range(8)]
+except ImportError:
+	pass
+
+try:
+	import usb.core
+	usb.core.find = lambda *args, **kwargs: None
+except ImportError:
+	pass
+"""
+
+timedCode = """
+import time
+import json
+import resource
+{tracemalloc}
+{setup}
+
+rss_start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+{tracemallocStart}
+start = time.perf_counter()
+{timed}
+seconds = time.perf_counter() - start
+{tracemallocStop}
+rss_end = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+print(json.dumps({{"seconds": seconds, "maxRss": rss_end * 1024, "rssIncrease": (rss_end - rss_start) * 1024, "allocatedPeak": allocatedPeak}}))
+"""
+
+def runFresh(setup, timed, *, traceAllocations = False):
+	"""Runs 'timed' in a new interpreter and returns what it measured.
+
+	setup (str) - Code to run before the timer starts
+	timed (str) - Code to time
+	traceAllocations (bool) - Determines if tracemalloc is used to find the peak allocation
+		- Note: tracemalloc slows things down, so the time from this run should not be used
+
+	Example Input: runFresh("", "import API_Com.controller")
+	"""
+
+	code = stubCode.format(path = sys.path) + timedCode.format(
+		setup = setup, timed = timed,
+		tracemalloc = "import tracemalloc" if traceAllocations else "allocatedPeak = None",
+		tracemallocStart = "tracemalloc.start()" if traceAllocations else "",
+		tracemallocStop = "allocatedPeak = tracemalloc.get_traced_memory()[1]" if traceAllocations else "",
+	)
+
+	process = subprocess.run([sys.executable, "-c", code], capture_output = True, text = True)
+	if (process.returncode != 0):
+		errorMessage = (process.stderr.strip().splitlines() or [f"exited with {process.returncode}"])[-1]
+		raise RuntimeError(errorMessage)
+
+	return json.loads(process.stdout.strip().splitlines()[-1])
+
+def startupBenchmark(label, setup, timed):
+	"""Adds a startup case to the benchmark catalogue.
+
+	Example Input: startupBenchmark("import controller", "", "import API_Com.controller")
+	"""
+
+	def function(repeat):
+		runList = [runFresh(setup, timed) for i in range(repeat)]
+		traced = runFresh(setup, timed, traceAllocations = True)
+
+		return {
+			"seconds": summarize([item["seconds"] for item in runList]),
+			"maxRss": summarize([item["maxRss"] for item in runList]),
+			"rssIncrease": summarize([item["rssIncrease"] for item in runList]),
+			"allocatedPeak": traced["allocatedPeak"],
+		}
+
+	benchmark(label, group = "startup")(function)
+
+startupBenchmark("import API_Com", "", "import API_Com")
+for _moduleName in ("controller", "API_ComPort", "API_Ethernet", "API_Email", "API_Barcode", "API_Usb"):
+	startupBenchmark(f"import {_moduleName}", "import API_Com", f"import API_Com.{_moduleName}")
+
+startupBenchmark("CommunicationManager()", "import API_Com.controller", "API_Com.controller.CommunicationManager()")
+startupBenchmark("first getCom()", "import API_Com.controller", "API_Com.controller.getCom()")
+startupBenchmark("first getEthernet()", "import API_Com.controller", "API_Com.controller.getEthernet()")
+startupBenchmark("first getBarcode()", "import API_Com.controller", "API_Com.controller.getBarcode()")
+startupBenchmark("first getUsb()", "import API_Com.controller", "API_Com.controller.getUsb()")
+startupBenchmark("ComPort.getAll()", "import API_Com.controller; comPort = API_Com.controller.getRootManager().comPort", "comPort.getAll()")
+
+#Memory Benchmarks
+def measureEach(function, count):
+	"""Returns how many bytes each of 'count' calls to 'function' keeps allocated, and what they returned."""
+
+	tracemalloc.start()
+	try:
+		before = tracemalloc.get_traced_memory()[0]
+		itemList = [function() for i in range(count)]
+		after = tracemalloc.get_traced_memory()[0]
+	finally:
+		tracemalloc.stop()
+	return (after - before) / count, itemList
+
+def memoryBenchmark(label, moduleName, className, budget, count = 10000):
+	"""Adds a case to the benchmark catalogue that measures how much memory each child of the given container takes.
+	Fails if a child takes more than 'budget' bytes on top of what MyUtilities' base classes take,
+	or if it keeps any of its own attributes in a __dict__ instead of its __slots__.
+	If a child is meant to grow, raise its budget here.
+
+	Example Input: memoryBenchmark("ComPort.Child", "API_ComPort", "ComPort", 1200)
+	"""
+
+	def function(repeat):
+		import API_Com.utilities
+
+		module = importlib.import_module(f"API_Com.{moduleName}")
+		container = getattr(module, className)(None)
+
+		#MyUtilities' base classes are not slotted, so what they keep is not counted
+		baseBytes, baseList = measureEach(API_Com.utilities.Utilities_Base, count)
+		baseAttributes = set(vars(baseList[0]))
+		del baseList
+
+		byteList = []
+		for i in range(repeat):
+			childBytes, children = measureEach(container.add, count)
+			byteList.append(childBytes - baseBytes)
+
+			extraAttributes = set(vars(children[0])) - baseAttributes
+			if (extraAttributes):
+				errorMessage = f"{className}.Child keeps {sorted(extraAttributes)} in a __dict__; add them to its __slots__"
+				raise AssertionError(errorMessage)
+
+			for child in children:
+				child.remove()
+
+		if (statistics.median(byteList) > budget):
+			errorMessage = f"Each {className}.Child takes {statistics.median(byteList):.0f} bytes, which is over its budget of {budget}"
+			raise AssertionError(errorMessage)
+
+		return {"bytesPerChild": summarize(byteList), "budget": budget, "children": count}
+
+	benchmark(f"{label} footprint", group = "memory")(function)
+
+memoryBenchmark("ComPort.Child", "API_ComPort", "ComPort", 1200)
+memoryBenchmark("Ethernet.Child", "API_Ethernet", "Ethernet", 680)
+memoryBenchmark("Barcode.Child", "API_Barcode", "Barcode", 360)
+memoryBenchmark("USB.Child", "API_Usb", "USB", 390)
+
+#Concurrency Benchmarks
+@benchmark("container add/remove/select", group = "concurrency")
+def benchmark_containerStress(repeat, threadCount = 16, operations = 2000):
+	"""Hammers one Utilities_Container from many threads, then checks that it is still consistent.
+	Raises an AssertionError if any thread hit an error or the container is not consistent, so the run fails.
+	"""
+
+	import API_Com.utilities
+
+	class StressContainer(API_Com.utilities.Utilities_Container):
+		indexCatalogue = ("port",)
+
+		class Child(API_Com.utilities.Utilities_Child):
+			__slots__ = ("port",)
+
+			def __init__(self, parent, label):
+				API_Com.utilities.Utilities_Child.__init__(self, parent, label)
+				self.port = None
+
+	def worker(container, seed, sharedList, errorList):
+		generator = random.Random(seed)
+		try:
+			for i in range(operations):
+				choice = generator.random()
+				if (choice < 0.35):
+					child = container.add()
+					child.port = f"COM{generator.randrange(8)}"
+				elif (choice < 0.45):
+					sharedList.append(container.add(label = f"shared{generator.randrange(4)}"))
+				elif (choice < 0.7):
+					child = next(iter(container), None)
+					if ((child is not None) and (not isinstance(child.label, str))):
+						child.remove()
+				elif (choice < 0.8):
+					try:
+						container.select(generator.choice((None, next(iter(container), None))))
+					except KeyError:
+						#The child was removed by another thread
+						pass
+				elif (choice < 0.9):
+					#Read without the lock, the same way Poller and Watcher do; children should never be seen half made
+					for child in list(container):
+						child.port
+				else:
+					container.find(port = f"COM{generator.randrange(8)}")
+		except Exception as error:
+			errorList.append(error)
+
+	secondList = []
+	errorList = []
+	consistent = True
+	for i in range(repeat):
+		container = StressContainer(None)
+		sharedList = []
+
+		threadList = [threading.Thread(target = worker, args = (container, seed, sharedList, errorList)) for seed in range(threadCount)]
+		oldInterval = sys.getswitchinterval()
+		sys.setswitchinterval(1e-4)
+		try:
+			start = time.perf_counter()
+			for thread in threadList:
+				thread.start()
+			for thread in threadList:
+				thread.join()
+			secondList.append(time.perf_counter() - start)
+		finally:
+			sys.setswitchinterval(oldInterval)
+
+
+		#Every child should be stored under its own label exactly once
+		childList = list(container)
+		if (len({id(child) for child in childList}) != len(childList)):
+			consistent = False
+		if (any((container[child.label] is not child) for child in childList)):
+			consistent = False
+
+		#Every shared label should have only ever been made once
+		sharedCatalogue = {}
+		for child in sharedList:
+			if (sharedCatalogue.setdefault(child.label, child) is not child):
+				consistent = False
+
+		#The index should agree with the children
+		for port in (f"COM{j}" for j in range(8)):
+			if ({id(child) for child in container.find(port = port)} != {id(child) for child in childList if (child.port == port)}):
+				consistent = False
+
+	if (errorList):
+		errorMessage = f"{len(errorList)} threads failed while using the container; the first was {type(errorList[0]).__name__}: {errorList[0]}"
+		raise AssertionError(errorMessage)
+	if (not consistent):
+		errorMessage = "The container's children, labels, or index did not agree after being used from many threads"
+		raise AssertionError(errorMessage)
+
+	return {
+		"seconds": summarize(secondList),
+		"operationsPerSecond": threadCount * operations / statistics.median(secondList),
+		"threads": threadCount,
+	}
+
+#Framing Benchmarks
+def framingBenchmark(label, codecName, count = 2000, payloadSize = 256, chunkSize = 4096, **kwargs):
+	"""Adds a case to the benchmark catalogue that measures how fast a codec encodes and decodes, in MB/s of framed bytes.
+	The stream is decoded in 'chunkSize' pieces, the same way it would arrive from a device.
+
+	Example Input: framingBenchmark("slip", "slip")
+	Example Input: framingBenchmark("length + crc32", "length", crc = "crc32")
+	"""
+
+	def function(repeat):
+		import API_Com.framing
+
+		generator = random.Random(0)
+		payloadList = [bytes(generator.randrange(256) for j in range(payloadSize)) for i in range(count)]
+		if (codecName == "stxetx"):
+			payloadList = [payload.replace(b"\x03", b"\x04") for payload in payloadList]
+
+		if ((codecName == "cobs") and (not kwargs)):
+			#Peers that check for strict COBS reject a frame with an empty block after a full one at the end
+			codec = API_Com.framing.getCodec(codecName)
+			for payload, frame in (
+				(b"\x11\x22\x00\x33", b"\x03\x11\x22\x02\x33\x00"),
+				(bytes(range(1, 255)), b"\xFF" + bytes(range(1, 255)) + b"\x00"),
+				(bytes(range(1, 256)), b"\xFF" + bytes(range(1, 255)) + b"\x02\xFF\x00"),
+				(bytes(range(2, 256)) + b"\x00", b"\xFF" + bytes(range(2, 256)) + b"\x01\x01\x00"),
+			):
+				if (bytes(codec.encode(payload)) != frame):
+					errorMessage = f"{label} did not encode {len(payload)} bytes as canonical COBS"
+					raise AssertionError(errorMessage)
+
+		encodeList = []
+		decodeList = []
+		for i in range(repeat):
+			codec = API_Com.framing.getCodec(codecName, **kwargs)
+			streamList = []
+			start = time.perf_counter()
+			for payload in payloadList:
+				streamList.append(bytes(codec.encode(payload)))
+			encodeList.append(time.perf_counter() - start)
+			stream = b"".join(streamList)
+
+			codec = API_Com.framing.getCodec(codecName, **kwargs)
+			buffer = bytearray()
+			frameList = []
+			start = time.perf_counter()
+			for j in range(0, len(stream), chunkSize):
+				buffer += stream[j:j + chunkSize]
+				frameList.extend(codec.decode(buffer))
+			decodeList.append(time.perf_counter() - start)
+
+			if (frameList != payloadList):
+				errorMessage = f"{label} did not decode what it encoded"
+				raise AssertionError(errorMessage)
+
+		return {
+			"encodeMBps": len(stream) / statistics.median(encodeList) / 1e6,
+			"decodeMBps": len(stream) / statistics.median(decodeList) / 1e6,
+			"decodeSeconds": summarize(decodeList),
+			"frames": count,
+			"streamBytes": len(stream),
+		}
+
+	benchmark(f"{label} codec", group = "framing")(function)
+
+framingBenchmark("slip", "slip")
+framingBenchmark("slip + crc16", "slip", crc = "crc16")
+framingBenchmark("cobs", "cobs")
+framingBenchmark("length", "length")
+framingBenchmark("length + crc32", "length", crc = "crc32")
+framingBenchmark("stxetx + crc16", "stxetx", crc = "crc16")
+framingBenchmark("stxetx + crc16modbus", "stxetx", crc = "crc16modbus")
+
+#Serial Benchmarks
+##These talk to a fake device on a pseudo-terminal, so they do not need hardware; see API_Com.loopback
+def openVirtual(behavior, **kwargs):
+	"""Returns a fake device and a ComPort child that is open to it.
+
+	Example Input: openVirtual("echo")
+	"""
+
+	import API_Com.loopback
+	import API_Com.API_ComPort
+
+	virtual = API_Com.loopback.VirtualPort(behavior, **kwargs)
+	child = API_Com.API_ComPort.ComPort(None).add()
+	child.setTimeoutRead(1000)
+	error = child.open(virtual.port, autoEmpty = False)
+	if (error is not None):
+		virtual.close()
+		raise error
+	return virtual, child
+
+def serialBenchmark(label, behavior, operations = 2000, size = 64, **kwargs):
+	"""Adds a case to the benchmark catalogue that times 'function' against a fake device.
+	The function is given the ComPort child and the fake device, and returns how many bytes it moved.
+	Reports bytes per second and the p50/p99 of each call.
+
+	Example Use: @serialBenchmark("read(end)", "stream", message = b"x\n")
+	"""
+
+	def decorator(function):
+		def wrapper(repeat):
+			latencyList = []
+			secondList = []
+			byteCount = 0
+			for i in range(repeat):
+				virtual, child = openVirtual(behavior, **kwargs)
+				try:
+					start = time.perf_counter()
+					byteCount += function(child, virtual, operations, size, latencyList)
+					secondList.append(time.perf_counter() - start)
+				finally:
+					child.close()
+					virtual.close()
+
+			return {
+				"bytesPerSecond": byteCount / sum(secondList),
+				"p50": percentile(latencyList, 50),
+				"p99": percentile(latencyList, 99),
+				"seconds": summarize(secondList),
+				"operations": operations,
+			}
+
+		benchmark(label, group = "serial")(wrapper)
+		return function
+	return decorator
+
+@serialBenchmark("ComPort read(end)", "stream", message = b"x" * 63 + b"\n")
+def benchmark_readEnd(child, virtual, operations, size, latencyList):
+	byteCount = 0
+	for i in range(operations):
+		start = time.perf_counter()
+		byteCount += len(child.read(end = "\n", decode = False))
+		latencyList.append(time.perf_counter() - start)
+	return byteCount
+
+@serialBenchmark("ComPort read(length)", "stream", message = b"x" * 64)
+def benchmark_readLength(child, virtual, operations, size, latencyList):
+	byteCount = 0
+	for i in range(operations):
+		start = time.perf_counter()
+		byteCount += len(child.read(length = 4096, decode = False))
+		latencyList.append(time.perf_counter() - start)
+	return byteCount
+
+@serialBenchmark("ComPort send()", "sink")
+def benchmark_send(child, virtual, operations, size, latencyList):
+	message = b"x" * size
+	for i in range(operations):
+		start = time.perf_counter()
+		child.send(message)
+		latencyList.append(time.perf_counter() - start)
+	child.flush()
+	return size * operations
+
+@serialBenchmark("ComPort send(autoEmpty = True)", "sink")
+def benchmark_sendEmpty(child, virtual, operations, size, latencyList):
+	message = b"x" * size
+	for i in range(operations):
+		start = time.perf_counter()
+		child.send(message, autoEmpty = True)
+		latencyList.append(time.perf_counter() - start)
+	child.flush()
+	return size * operations
+
+@serialBenchmark("ComPort send() with startWrite()", "sink")
+def benchmark_sendWriter(child, virtual, operations, size, latencyList):
+	message = b"x" * size
+	child.startWrite()
+	for i in range(operations):
+		start = time.perf_counter()
+		child.send(message)
+		latencyList.append(time.perf_counter() - start)
+	child.flush()
+	child.stopWrite()
+	return size * operations
+
+@serialBenchmark("ComPort send() while capturing", "sink")
+def benchmark_sendCapture(child, virtual, operations, size, latencyList):
+	import os
+	import tempfile
+
+	message = b"x" * size
+	fileHandle, path = tempfile.mkstemp(suffix = ".cap")
+	os.close(fileHandle)
+	os.remove(path)
+	try:
+		child.startCapture(path)
+		for i in range(operations):
+			start = time.perf_counter()
+			child.send(message)
+			latencyList.append(time.perf_counter() - start)
+		child.flush()
+		child.stopCapture()
+	finally:
+		if (os.path.exists(path)):
+			os.remove(path)
+	return size * operations
+
+@serialBenchmark("ComPort request()", "responder", operations = 500)
+def benchmark_request(child, virtual, operations, size, latencyList):
+	message = b"x" * (size - 1) + b"\n"
+	for i in range(operations):
+		start = time.perf_counter()
+		child.request(message, timeout = 1, decode = False)
+		latencyList.append(time.perf_counter() - start)
+	return 2 * size * operations
+
+def run(repeat = 5, only = None):
+	"""Runs the benchmarks and returns the results as a dictionary that can be saved as json.
+
+	repeat (int) - How many times to run each benchmark
+	only (str) - Only runs benchmarks whose label or group contains this
+		- If None: Runs all benchmarks
+
+	Example Input: run()
+	Example Input: run(repeat = 10, only = "startup")
+	"""
+
+	import API_Com.controller
+
+	results = {
+		"version": API_Com.controller.__version__,
+		"python": platform.python_version(),
+		"implementation": platform.python_implementation(),
+		"platform": platform.platform(),
+		"time": time.time(),
+		"repeat": repeat,
+		"benchmarks": {},
+	}
+
+	for label, (group, function) in benchmarkCatalogue.items():
+		if ((only is not None) and (only not in label) and (only not in group)):
+			continue
+
+		try:
+			catalogue = function(repeat)
+		except AssertionError as error:
+			#A check inside the benchmark found something wrong
+			catalogue = {"failed": str(error)}
+		except Exception as error:
+			catalogue = {"error": f"{type(error).__name__}: {error}"}
+
+		results["benchmarks"][label] = {"group": group, **catalogue}
+
+	return results
+
+def main(argumentList = None):
+	parser = argparse.ArgumentParser(description = "Measures how long API_Com takes to start up and communicate.")
+	parser.add_argument("--repeat", type = int, default = 5, help = "How many times to run each benchmark")
+	parser.add_argument("--only", default = None, help = "Only run benchmarks whose label or group contains this")
+	parser.add_argument("--output", default = None, help = "Where to save the json results; prints them if not given")
+	arguments = parser.parse_args(argumentList)
+
+	results = run(repeat = arguments.repeat, only = arguments.only)
+
+	if (arguments.output is None):
+		json.dump(results, sys.stdout, indent = 2)
+		print()
+	else:
+		with open(arguments.output, "w") as fileHandle:
+			json.dump(results, fileHandle, indent = 2)
+
+	#Exit with an error if any check failed, so this can be used as a test
+	failedList = [label for label, catalogue in results["benchmarks"].items() if ("failed" in catalogue)]
+	if (failedList):
+		print(f"Failed: {', '.join(failedList)}", file = sys.stderr)
+		return 1
+	return 0
+
+if (__name__ == "__main__"):
+	sys.exit(main())
@@ -0,0 +1,385 @@
+__version__ = "2.0.0"
+
+#Import standard elements
+import os
+import mmap
+import time
+import bisect
+import struct
+import threading
+import collections
+
+#Use: comPort.startCapture("session.cap")
+#Use: for record in API_Com.capture.CaptureReader("session.cap"): print(record)
+#Use: comPort.replay("session.cap", speed = 10)
+
+#File Layout
+##Header: magic (6 bytes), version (1 byte), padding (1 byte), when the capture started in seconds since the epoch (float64)
+##Each record: nanoseconds since the capture started (uint64), direction (uint8), length (uint32), then the data
+fileHeader = struct.Struct("<6sBxd")
+recordHeader = struct.Struct("<QBI")
+magic = b"APICAP"
+version = 1
+
+#Directions
+IN = 0 #Read from the device
+OUT = 1 #Sent to the device
+
+#One record from a capture
+##timestamp (float): Seconds since the capture started
+##direction (int): IN or OUT
+##data (memoryview): What was read or sent; only good until the reader is closed
+Record = collections.namedtuple("Record", ("timestamp", "direction", "data"))
+
+class Recorder():
+	"""Appends everything a connection reads and sends to a binary capture file.
+	Records go through a large write buffer, so recording costs about one struct.pack() per read or send.
+	Opening an existing capture adds to the end of it, keeping its timestamps going.
+
+	Example Use: Recorder("session.cap")
+	"""
+
+	def __init__(self, path, bufferSize = 1 << 20):
+		"""Defines the internal variables needed to run.
+
+		path (str) - Where to save the capture
+		bufferSize (int) - How many bytes to hold before writing to the file
+		"""
+
+		self.path = path
+		self.lock = threading.Lock()
+
+		startTime = None
+		if (os.path.exists(path) and (os.path.getsize(path) >= fileHeader.size)):
+			with open(path, "rb") as fileHandle:
+				startTime = readHeader(fileHandle.read(fileHeader.size), path)
+
+		self.file = open(path, "ab", buffering = bufferSize)
+		if (startTime is None):
+			startTime = time.time()
+			self.file.write(fileHeader.pack(magic, version, startTime))
+
+		#Timestamps count from when the capture started, using the high resolution clock
+		self.startTime = startTime
+		self.origin = time.perf_counter_ns() - int((time.time() - startTime) * 1e9)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def record(self, direction, data):
+		"""Adds a record.
+
+		direction (int) - IN or OUT
+		data (bytes) - What was read or sent
+
+		Example Input: record(API_Com.capture.IN, b"OK\r\n")
+		"""
+
+		stamp = time.perf_counter_ns() - self.origin
+		with self.lock:
+			self.file.write(recordHeader.pack(stamp, direction, len(data)))
+			self.file.write(data)
+
+	def flush(self):
+		"""Writes what is buffered to the file."""
+
+		with self.lock:
+			self.file.flush()
+
+	def close(self):
+		"""Writes what is buffered and closes the file."""
+
+		with self.lock:
+			if (not self.file.closed):
+				self.file.close()
+
+def readHeader(data, path = None):
+	"""Returns when the capture started, or raises a ValueError if 'data' is not a capture header."""
+
+	if (len(data) < fileHeader.size):
+		errorMessage = f"{path or 'The file'} is too short to be a capture"
+		raise ValueError(errorMessage)
+
+	fileMagic, fileVersion, startTime = fileHeader.unpack_from(data)
+	if (fileMagic != magic):
+		errorMessage = f"{path or 'The file'} is not a capture"
+		raise ValueError(errorMessage)
+	if (fileVersion != version):
+		errorMessage = f"{path or 'The file'} is capture version {fileVersion}, but only version {version} can be read"
+		raise ValueError(errorMessage)
+	return startTime
+
+class CaptureReader():
+	"""Reads a capture file through mmap, so large captures are not loaded into memory.
+	Iterating goes straight through the file; indexing and seek() build an index of where each record is the first time they are used.
+	A record cut off at the end, such as from a crash while capturing, is ignored.
+
+	Example Use: for record in CaptureReader("session.cap"): print(record.timestamp, bytes(record.data))
+	Example Use: CaptureReader("session.cap")[1000]
+	"""
+
+	def __init__(self, path):
+		"""Defines the internal variables needed to run.
+
+		path (str) - Where the capture is
+		"""
+
+		self.path = path
+		self.file = open(path, "rb")
+		try:
+			self.map = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+		except ValueError:
+			self.file.close()
+			errorMessage = f"{path} is empty"
+			raise ValueError(errorMessage)
+
+		self.startTime = readHeader(self.map, path)
+		self.view = memoryview(self.map)
+
+		self.offsetList = None #Where each record starts
+		self.stampList = None #Each record's timestamp in nanoseconds
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def __iter__(self):
+		return self.iterate()
+
+	def __len__(self):
+		self.index()
+		return len(self.offsetList)
+
+	def __getitem__(self, index):
+		self.index()
+		return self._readRecord(self.offsetList[index])[0]
+
+	def _readRecord(self, offset):
+		"""Returns the record at 'offset' and where the next one starts, or (None, offset) if it is cut off."""
+
+		if (offset + recordHeader.size > len(self.map)):
+			return None, offset
+
+		stamp, direction, length = recordHeader.unpack_from(self.map, offset)
+		start = offset + recordHeader.size
+		stop = start + length
+		if (stop > len(self.map)):
+			return None, offset
+		return Record(stamp / 1e9, direction, self.view[start:stop]), stop
+
+	def iterate(self, start = 0, direction = None):
+		"""Yields each record, oldest first.
+
+		start (float) - Skips records from before this many seconds into the capture
+		direction (int) - Only yields records going this way; IN or OUT
+			- If None: Yields both
+
+		Example Input: iterate()
+		Example Input: iterate(start = 60, direction = API_Com.capture.IN)
+		"""
+
+		if (start):
+			number = self.seek(start)
+			offset = self.offsetList[number] if (number < len(self.offsetList)) else len(self.map)
+		else:
+			offset = fileHeader.size
+
+		while True:
+			record, offset = self._readRecord(offset)
+			if (record is None):
+				return
+			if ((direction is None) or (record.direction == direction)):
+				yield record
+
+	def index(self):
+		"""Finds where every record starts, so they can be looked up by number or time."""
+
+		if (self.offsetList is not None):
+			return
+
+		offsetList = []
+		stampList = []
+		offset = fileHeader.size
+		size = len(self.map)
+		while (offset + recordHeader.size <= size):
+			stamp, direction, length = recordHeader.unpack_from(self.map, offset)
+			if (offset + recordHeader.size + length > size):
+				break
+			offsetList.append(offset)
+			stampList.append(stamp)
+			offset += recordHeader.size + length
+
+		self.offsetList = offsetList
+		self.stampList = stampList
+
+	def seek(self, seconds):
+		"""Returns the number of the first record at or after 'seconds' into the capture.
+
+		seconds (float) - How far into the capture
+
+		Example Input: seek(60)
+		"""
+
+		self.index()
+		return bisect.bisect_left(self.stampList, int(seconds * 1e9))
+
+	def duration(self):
+		"""Returns how many seconds the capture covers."""
+
+		self.index()
+		if (not self.stampList):
+			return 0
+		return self.stampList[-1] / 1e9
+
+	def close(self):
+		"""Closes the capture.
+		Records that are still being used keep the file mapped until they are gone.
+		"""
+
+		self.view.release()
+		try:
+			self.map.close()
+		except BufferError:
+			#A record's data is still in use; it will be unmapped once that is let go
+			pass
+		self.file.close()
+
+class ReplayDevice():
+	"""Stands in for serial.Serial and gives back what a capture read, at the pace it was read.
+	Give it to a ComPort child with replay(), and read(), iter_frames(), startListen(), etc. work as they did live.
+	What is sent to it is counted and thrown away.
+
+	Example Use: comPort.replay("session.cap")
+	Example Use: ReplayDevice("session.cap", speed = 0)
+	"""
+
+	#The most seconds to sleep at a time while waiting for the next record
+	sleepInterval = 0.05
+
+	def __init__(self, reader, speed = 1, start = 0):
+		"""Defines the internal variables needed to run.
+
+		reader (CaptureReader) - What to replay; can also be the path to a capture, which is then closed by close()
+		speed (float) - How many times faster than the original to replay
+			- If 0: Everything is available right away
+		start (float) - Skips records from before this many seconds into the capture
+		"""
+
+		self.ownsReader = (not isinstance(reader, CaptureReader)) #Only close the reader if this made it
+		if (self.ownsReader):
+			reader = CaptureReader(reader)
+
+		self.reader = reader
+		self.speed = speed
+		self.port = reader.path
+		self.timeout = None
+		self.writeTimeout = None
+		self.is_open = True
+
+		self.pending = bytearray() #What has come due but not been read
+		self.bytesWritten = 0
+
+		self.iterator = reader.iterate(start = start, direction = IN)
+		self.nextRecord = next(self.iterator, None)
+		self.firstStamp = None if (self.nextRecord is None) else self.nextRecord.timestamp
+		self.startedAt = time.monotonic()
+
+	def isOpen(self):
+		return self.is_open
+
+	def open(self):
+		self.is_open = True
+
+	def close(self):
+		"""Stops the replay, and closes the capture if this opened it.
+		It cannot be opened again after that.
+		"""
+
+		self.is_open = False
+		if (self.ownsReader):
+			#Let go of the records first, so the file can be unmapped
+			self.nextRecord = None
+			self.iterator.close()
+			self.reader.close()
+
+	def isExhausted(self):
+		"""Returns if every record has been read."""
+
+		self.release()
+		return ((self.nextRecord is None) and (not self.pending))
+
+	def release(self):
+		"""Moves every record that has come due into the pending buffer."""
+
+		if (self.speed):
+			now = (time.monotonic() - self.startedAt) * self.speed + (self.firstStamp or 0)
+		else:
+			now = float("inf")
+
+		while ((self.nextRecord is not None) and (self.nextRecord.timestamp <= now)):
+			self.pending += self.nextRecord.data
+			self.nextRecord = next(self.iterator, None)
+
+	def untilNext(self):
+		"""Returns how many seconds until the next record comes due."""
+
+		if (self.nextRecord is None):
+			return None
+		return max(0, (self.nextRecord.timestamp - (self.firstStamp or 0)) / self.speed - (time.monotonic() - self.startedAt))
+
+	@property
+	def in_waiting(self):
+		self.release()
+		return len(self.pending)
+
+	def read(self, size = 1):
+		"""Returns up to 'size' bytes, waiting for them the same way serial.Serial.read() does."""
+
+		deadline = None if (self.timeout is None) else (time.monotonic() + self.timeout)
+		while True:
+			self.release()
+			if ((len(self.pending) >= size) or (self.nextRecord is None)):
+				break
+
+			wait = self.untilNext()
+			if (deadline is not None):
+				remaining = deadline - time.monotonic()
+				if (remaining <= 0):
+					break
+				wait = min(wait, remaining)
+			time.sleep(min(wait, self.sleepInterval))
+
+		data = bytes(self.pending[:size])
+		del self.pending[:size]
+		return data
+
+	def write(self, data):
+		self.bytesWritten += len(data)
+		return len(data)
+
+	def apply_settings(self, settings):
+		"""Only the timeouts mean anything for a replay."""
+
+		self.timeout = settings.get("timeout", self.timeout)
+		self.writeTimeout = settings.get("write_timeout", self.writeTimeout)
+
+	def flush(self):
+		pass
+
+	def reset_input_buffer(self):
+		self.pending.clear()
+
+	def reset_output_buffer(self):
+		pass
+
+	flushInput = reset_input_buffer
+	flushOutput = reset_output_buffer
+
+	@property
+	def out_waiting(self):
+		return 0
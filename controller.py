@@ -1,48 +1,11 @@
 __version__ = "1.1.1"
 
 #Import standard elements
-import re
-import os
-import sys
-import warnings
-import traceback
+import socket
 import threading
-import subprocess
 
-# #Import communication elements for talking to other devices such as printers, the internet, a raspberry pi, etc.
-import usb
-import types
-import bisect
-import select
-import socket
-import serial
-import netaddr
-import serial.tools.list_ports
-
-# #Import barcode modules for drawing and decoding barcodes
-import qrcode
-import barcode
-
-# #Import email modules for sending and viewing emails
-import smtplib
-import xml.etree.cElementTree as xml
-from email import encoders as email_encoders
-from email.mime.base import MIMEBase as email_MIMEBase
-from email.mime.text import MIMEText as email_MIMEText
-from email.mime.image import MIMEImage as email_MIMEImage
-from email.mime.multipart import MIMEMultipart as email_MIMEMultipart
-
-import io
-import wx
-import glob
-import PIL
-import base64
-import zipfile
-import collections
-
-import API_Database as Database
-import MyUtilities.common
-import MyUtilities.threadManager
+#The transport modules are imported the first time they are used; see API_Com.__init__
+import API_Com
 
 #Required Modules
 ##py -m pip install
@@ -60,8 +23,33 @@ import MyUtilities.threadManager
 #User Access Variables
 ethernetError = socket.error
 
+#Which containers a CommunicationManager can have; they are only built the first time they are used
+##{attribute (str): (title (str), builder (function))}
+transportCatalogue = {}
+
+def registerTransport(attribute, builder, title = None):
+	"""Adds a communication type that every CommunicationManager can build on demand.
+
+	attribute (str) - What attribute of the CommunicationManager the container is stored in
+	builder (function) - What is called with the CommunicationManager to build the container
+	title (str) - What to call it when the CommunicationManager is printed out
+		- If None: Will use 'attribute'
+
+	Example Input: registerTransport("gpio", lambda comManager: Gpio(comManager))
+	Example Input: registerTransport("gpio", Gpio, title = "GPIO Pins")
+	"""
+
+	transportCatalogue[attribute] = (title or attribute, builder)
+
+registerTransport("ethernet", lambda comManager: API_Com.Ethernet(comManager), title = "Ethernets")
+registerTransport("comPort", lambda comManager: API_Com.ComPort(comManager), title = "COM Ports")
+registerTransport("usb", lambda comManager: API_Com.USB(comManager), title = "USB Ports")
+registerTransport("barcode", lambda comManager: API_Com.Barcode(comManager), title = "Barcodes")
+registerTransport("email", lambda comManager: API_Com.EmailServer(), title = "Email Accounts")
+
 class CommunicationManager():
 	"""Helps the user to communicate with other devices.
+	Each communication type is built the first time it is used; see registerTransport().
 
 	CURRENTLY SUPPORTED METHODS
 		- COM Port
@@ -80,22 +68,36 @@ class CommunicationManager():
 	def __init__(self):
 		"""Initialized internal variables."""
 
-		self.ethernet = Ethernet(self)
-		self.barcode = Barcode(self)
-		self.comPort = ComPort(self)
-		self.email = Email(self)
-		self.usb = USB(self)
+		self._transportLock = threading.RLock()
+
+	def __getattr__(self, name):
+		"""Builds the container for 'name' the first time it is used.
+		Once built, it is a normal attribute and this is not called again.
+		"""
+
+		if (name.startswith("_") or (name not in transportCatalogue)):
+			errorMessage = f"{self.__repr__()} has no attribute {name!r}"
+			raise AttributeError(errorMessage)
+
+		with self._transportLock:
+			if (name not in self.__dict__):
+				self.__dict__[name] = transportCatalogue[name][1](self)
+		return self.__dict__[name]
 
 	def __str__(self):
 		"""Gives diagnostic information on the GUI when it is printed out."""
 
 		output = f"Communication()\n-- id: {id(self)}\n"
 
-		output += f"-- Ethernets: {len(self.ethernet)}\n"
-		output += f"-- COM Ports: {len(self.comPort)}\n"
-		output += f"-- USB Ports: {len(self.usb)}\n"
-		output += f"-- Barcodes: {len(self.barcode)}\n"
-		output += f"-- Email Accounts: {len(self.email)}\n"
+		for attribute, (title, builder) in transportCatalogue.items():
+			container = self.__dict__.get(attribute)
+			if (container is None):
+				count = 0
+			elif (hasattr(container, "__len__")):
+				count = len(container)
+			else:
+				count = 1
+			output += f"-- {title}: {count}\n"
 
 		return output
 
@@ -103,15 +105,62 @@ class CommunicationManager():
 		representation = f"Communication(id = {id(self)})"
 		return representation
 
+	def isBuilt(self, attribute):
+		"""Returns if the container for the given communication type has been built yet.
+
+		Example Input: isBuilt("ethernet")
+		"""
+
+		return attribute in self.__dict__
+
+	def stats(self):
+		"""Returns the metrics for every communication type that has been built, as a dictionary that can be saved as json.
+
+		Example Input: stats()
+		"""
+
+		catalogue = {}
+		for attribute in transportCatalogue:
+			container = self.__dict__.get(attribute)
+			if ((container is not None) and hasattr(container, "stats")):
+				catalogue[attribute] = container.stats()
+
+		return catalogue
+
 	def getAll(self):
 		"""Returns all available communication types.
+		Note: This builds every container that has not been built yet.
 
 		Example Input: getAll()
 		"""
 
-		return [self.ethernet, self.comPort, self.usb, self.barcode, self.email]
+		return [getattr(self, attribute) for attribute in transportCatalogue]
+
+_rootLock = threading.Lock()
+_rootManager = None
 
-rootManager = CommunicationManager()
+def getRootManager():
+	"""Returns the CommunicationManager that is used when none is given.
+	It is made the first time it is needed.
+
+	Example Input: getRootManager()
+	"""
+	global _rootManager
+
+	if (_rootManager is None):
+		with _rootLock:
+			if (_rootManager is None):
+				_rootManager = CommunicationManager()
+	return _rootManager
+
+def __getattr__(name):
+	"""Makes 'rootManager' the first time it is used."""
+
+	if (name == "rootManager"):
+		return getRootManager()
+
+	errorMessage = f"module {__name__!r} has no attribute {name!r}"
+	raise AttributeError(errorMessage)
 
 def getEthernet(label = None, *, comManager = None):
 	"""Returns an ethernet handle with the given label. If it does not exist, it will make one.
@@ -122,9 +171,8 @@ def getEthernet(label = None, *, comManager = None):
 	Example Input: getEthernet()
 	Example Input: getEthernet(1)
 	"""
-	global rootManager
-	
-	comManager = MyUtilities.common.ensure_default(comManager, default = rootManager)
+	if (comManager is None):
+		comManager = getRootManager()
 	return comManager.ethernet.add(label = label)
 
 def getCom(label = None, *, comManager = None):
@@ -136,9 +184,8 @@ def getCom(label = None, *, comManager = None):
 	Example Input: getCom()
 	Example Input: getCom(1)
 	"""
-	global rootManager
-	
-	comManager = MyUtilities.common.ensure_default(comManager, default = rootManager)
+	if (comManager is None):
+		comManager = getRootManager()
 	return comManager.comPort.add(label = label)
 
 def getUsb(label = None, *, comManager = None):
@@ -150,9 +197,8 @@ def getUsb(label = None, *, comManager = None):
 	Example Input: getusb()
 	Example Input: getusb(1)
 	"""
-	global rootManager
-	
-	comManager = MyUtilities.common.ensure_default(comManager, default = rootManager)
+	if (comManager is None):
+		comManager = getRootManager()
 	return comManager.usb.add(label = label)
 
 def getBarcode(label = None, *, comManager = None):
@@ -164,24 +210,19 @@ def getBarcode(label = None, *, comManager = None):
 	Example Input: getBarcode()
 	Example Input: getBarcode(1)
 	"""
-	global rootManager
-	
-	comManager = MyUtilities.common.ensure_default(comManager, default = rootManager)
+	if (comManager is None):
+		comManager = getRootManager()
 	return comManager.barcode.add(label = label)
 
-def getEmail(label = None, *, comManager = None):
-	"""Returns an email handle with the given label. If it does not exist, it will make one.
-
-	label (str) - What email to get
-		- If None: Will make a new email port
+def getEmail(*, comManager = None):
+	"""Returns the email server.
+	Unlike the other transports, there is only one, so it does not take a label.
 
 	Example Input: getEmail()
-	Example Input: getEmail(1)
 	"""
-	global rootManager
-	
-	comManager = MyUtilities.common.ensure_default(comManager, default = rootManager)
-	return comManager.email.add(label = label)
+	if (comManager is None):
+		comManager = getRootManager()
+	return comManager.email
 
 # def runFile():
 
@@ -0,0 +1,620 @@
+__version__ = "2.0.0"
+
+#Import standard elements
+import zlib
+import struct
+import binascii
+
+#Framing codecs that ComPort and Ethernet children can wrap, such as read_frame(codec) and send(message, codec = codec)
+##Frames are found with bytearray.find() and memoryview slices, so the stream is not copied until a frame is taken out
+##Each payload is then copied once, into the bytearray that is returned; escaped frames are unescaped straight into it
+
+#CRCs
+class Crc16():
+	"""A table driven 16 bit CRC.
+	CRC-16/CCITT-FALSE uses binascii.crc_hqx(), which is the same table done in C.
+
+	Example Use: Crc16(0x1021, 0xFFFF).calculate(b"123456789")
+	Example Use: Crc16(0xA001, 0xFFFF, reflected = True, byteorder = "little").calculate(b"123456789")
+	"""
+
+	size = 2
+
+	def __init__(self, polynomial = 0x1021, initial = 0xFFFF, reflected = False, byteorder = "big"):
+		"""Defines the internal variables needed to run.
+
+		polynomial (int) - The generator polynomial; give it bit reversed if 'reflected' is True
+		initial (int) - What the CRC starts at
+		reflected (bool) - If True: Bytes are shifted in least significant bit first, such as for Modbus
+		byteorder (str) - How the CRC is written after the payload
+		"""
+
+		self.polynomial = polynomial
+		self.initial = initial
+		self.reflected = reflected
+		self.byteorder = byteorder
+
+		self.table = []
+		for i in range(256):
+			if (reflected):
+				value = i
+				for j in range(8):
+					value = (value >> 1) ^ polynomial if (value & 1) else (value >> 1)
+			else:
+				value = i << 8
+				for j in range(8):
+					value = ((value << 1) ^ polynomial) if (value & 0x8000) else (value << 1)
+			self.table.append(value & 0xFFFF)
+
+	def calculate(self, data):
+		"""Returns the CRC of 'data'.
+
+		data (bytes) - What to check; a memoryview is not copied
+
+		Example Input: calculate(b"123456789")
+		"""
+
+		if ((self.polynomial == 0x1021) and (not self.reflected)):
+			return binascii.crc_hqx(data, self.initial)
+
+		table = self.table
+		value = self.initial
+		if (self.reflected):
+			for byte in data:
+				value = (value >> 8) ^ table[(value ^ byte) & 0xFF]
+		else:
+			for byte in data:
+				value = ((value << 8) & 0xFFFF) ^ table[(value >> 8) ^ byte]
+		return value
+
+	def pack(self, data):
+		"""Returns the CRC of 'data' as the bytes that follow it."""
+
+		return self.calculate(data).to_bytes(self.size, self.byteorder)
+
+	def check(self, data, trailer):
+		"""Returns if 'trailer' is the CRC of 'data'."""
+
+		return self.calculate(data) == int.from_bytes(trailer, self.byteorder)
+
+class Crc32(Crc16):
+	"""The CRC-32 used by zlib, Ethernet and PNG.
+
+	Example Use: Crc32().calculate(b"123456789")
+	"""
+
+	size = 4
+
+	def __init__(self, byteorder = "big"):
+		"""Defines the internal variables needed to run.
+
+		byteorder (str) - How the CRC is written after the payload
+		"""
+
+		self.byteorder = byteorder
+
+	def calculate(self, data):
+		"""Returns the CRC of 'data'.
+
+		data (bytes) - What to check; a memoryview is not copied
+
+		Example Input: calculate(b"123456789")
+		"""
+
+		return zlib.crc32(data)
+
+#What CRCs can be asked for by name
+##{name (str): CRC}
+crcCatalogue = {
+	"crc16": Crc16(0x1021, 0xFFFF),
+	"crc16ccitt": Crc16(0x1021, 0xFFFF),
+	"crc16xmodem": Crc16(0x1021, 0x0000),
+	"crc16modbus": Crc16(0xA001, 0xFFFF, reflected = True, byteorder = "little"),
+	"crc32": Crc32(),
+}
+
+def getCrc(crc):
+	"""Returns the CRC with the given name, or 'crc' itself if it is already a CRC.
+
+	crc (str) - The name of the CRC
+		- If None: Returns None
+
+	Example Input: getCrc("crc16")
+	Example Input: getCrc(Crc16(0x8005, 0x0000))
+	"""
+
+	if ((crc is None) or (not isinstance(crc, str))):
+		return crc
+
+	if (crc not in crcCatalogue):
+		errorMessage = f"There is no CRC named {crc!r}; use one of {list(crcCatalogue)}"
+		raise KeyError(errorMessage)
+	return crcCatalogue[crc]
+
+#Codecs
+class Codec():
+	"""Splits a stream of bytes into frames and wraps payloads into frames.
+	Frames whose CRC is wrong or that are too long are thrown away and counted in 'invalid'.
+	Subclasses only need to define _scan() and _wrap().
+	Each payload is copied out of the read buffer once, and each piece of a frame is copied into the encode buffer once.
+	"""
+
+	def __init__(self, crc = None, maxLength = None):
+		"""Defines the internal variables needed to run.
+
+		crc (str) - Which CRC follows each payload inside the frame, such as "crc16" or "crc32"
+			- If None: Frames are not checked
+		maxLength (int) - The longest a frame's contents (payload and CRC) can be; a frame that has grown longer while waiting for the rest of it is thrown away
+			- If None: There is no limit
+		"""
+
+		self.crc = getCrc(crc)
+		self.maxLength = maxLength
+
+		self.invalid = 0 #How many frames were thrown away
+
+		#Encoded frames are written here, so sending does not need a new buffer each time
+		self.encodeBuffer = bytearray()
+		self.encodeView = None
+
+	def encode(self, payload):
+		"""Returns 'payload' wrapped in a frame.
+		The frame is a memoryview of a buffer that is reused, so it is only good until the next encode().
+		The pieces of the frame are copied straight into that buffer; only SLIP copies 'payload' first, and only if it has something to escape.
+
+		payload (bytes) - What to wrap
+
+		Example Input: encode(b"Lorem ipsum")
+		"""
+
+		if (self.encodeView is not None):
+			self.encodeView.release()
+			self.encodeView = None
+
+		if (self.crc is not None):
+			partList = self._wrap(payload, self.crc.pack(payload))
+		else:
+			partList = self._wrap(payload, b"")
+
+		#Only grow the buffer; writing over it in place does not reallocate
+		size = sum(map(len, partList))
+		buffer = self.encodeBuffer
+		if (len(buffer) < size):
+			buffer.extend(bytes(size - len(buffer)))
+
+		position = 0
+		for part in partList:
+			stop = position + len(part)
+			buffer[position:stop] = part
+			position = stop
+
+		self.encodeView = memoryview(buffer)[:size]
+		return self.encodeView
+
+	def decode(self, buffer):
+		"""Takes every complete frame out of 'buffer' and returns their payloads, as bytearrays.
+		What is left in 'buffer' is the start of a frame that has not fully arrived yet.
+
+		buffer (bytearray) - What has been read so far
+
+		Example Input: decode(self.readBuffer)
+		"""
+
+		return self._decode(buffer, None)
+
+	def decodeOne(self, buffer):
+		"""Takes the next complete frame out of 'buffer' and returns its payload, as a bytearray.
+		Returns None if there is not a complete frame yet.
+
+		buffer (bytearray) - What has been read so far
+
+		Example Input: decodeOne(self.readBuffer)
+		"""
+
+		frameList = self._decode(buffer, 1)
+		return frameList[0] if frameList else None
+
+	def _decode(self, buffer, count):
+		frameList = []
+		start = 0
+		incomplete = False
+		with memoryview(buffer) as view:
+			while ((count is None) or (len(frameList) < count)):
+				content, start = self._scan(buffer, view, start)
+				if (content is None):
+					incomplete = True
+					break
+
+				frame = self._unwrap(content)
+				content = None
+				if (frame is None):
+					self.invalid += 1
+				else:
+					frameList.append(frame)
+
+		#Only what is after the last complete frame can be too long; complete frames that were not asked for yet are kept
+		if ((self.maxLength is not None) and incomplete and (self._tailLength(buffer, start) > self.maxLength)):
+			#The rest of this frame is never coming, or it is too long to keep
+			self.invalid += 1
+			start = len(buffer)
+
+		if (start):
+			del buffer[:start]
+		return frameList
+
+	def _unwrap(self, content):
+		"""Returns the payload in 'content' as a bytearray, or None if its CRC is wrong.
+		If 'content' is a bytearray the codec built, its CRC is cut off in place and it is returned; only a memoryview is copied.
+		"""
+
+		if (self.crc is None):
+			return content if isinstance(content, bytearray) else bytearray(content)
+
+		length = len(content) - self.crc.size
+		if (length < 0):
+			return None
+
+		if (not isinstance(content, bytearray)):
+			if (not self.crc.check(content[:length], content[length:])):
+				return None
+			return bytearray(content[:length])
+
+		#Check it through a view, which has to be let go before the CRC can be cut off
+		view = memoryview(content)
+		valid = self.crc.check(view[:length], view[length:])
+		view.release()
+		if (not valid):
+			return None
+		del content[length:]
+		return content
+
+	def _tailLength(self, buffer, start):
+		"""Returns how many bytes of contents the incomplete frame at 'start' has so far, counted the same way as 'maxLength'."""
+
+		return len(buffer) - start
+
+	def _scan(self, buffer, view, start):
+		"""Finds the next frame in 'buffer' that begins at or after 'start'.
+		Returns the frame's contents and where the next frame begins.
+		The contents are a memoryview of 'buffer', or a new bytearray if they had to be unescaped.
+		If there is no complete frame, returns None and where the incomplete frame begins.
+		"""
+
+		raise NotImplementedError()
+
+	def _wrap(self, payload, trailer):
+		"""Returns a list of the pieces that make up the frame for 'payload' followed by 'trailer'.
+		Pieces can be memoryview slices of 'payload', so it does not need to be copied before encode() copies them.
+		"""
+
+		raise NotImplementedError()
+
+class SlipCodec(Codec):
+	"""Serial Line Internet Protocol (RFC 1055) framing.
+	Each frame ends with 0xC0; 0xC0 and 0xDB inside it are escaped.
+	Frames are unescaped straight into the payload that is returned.
+	Payloads are escaped with bytes.replace(), which is faster than escaping byte by byte; one with nothing to escape is not copied.
+
+	Example Use: SlipCodec()
+	Example Use: SlipCodec(crc = "crc16")
+	"""
+
+	END = b"\xC0"
+	ESC = b"\xDB"
+	ESC_END = b"\xDB\xDC"
+	ESC_ESC = b"\xDB\xDD"
+
+	def _scan(self, buffer, view, start):
+		while True:
+			index = buffer.find(self.END, start)
+			if (index == -1):
+				return None, start
+			if (index == start):
+				#Empty frames are how SLIP flushes line noise
+				start += 1
+				continue
+			break
+
+		#Copy the runs between escapes straight out of the read buffer
+		content = bytearray()
+		position = start
+		while True:
+			escape = buffer.find(self.ESC, position, index)
+			if (escape == -1):
+				content += view[position:index]
+				return content, index + 1
+
+			content += view[position:escape]
+			code = buffer[escape + 1] if (escape + 1 < index) else None
+			if (code == 0xDC):
+				content.append(0xC0)
+			elif (code == 0xDD):
+				content.append(0xDB)
+			else:
+				#Not a real escape, so keep both bytes
+				content.append(0xDB)
+				position = escape + 1
+				continue
+			position = escape + 2
+
+	def _tailLength(self, buffer, start):
+		#Each escape is two bytes for one byte of contents
+		return len(buffer) - start - buffer.count(self.ESC, start)
+
+	def _wrap(self, payload, trailer):
+		#Only escape what has something to escape, so most payloads and CRCs are not copied
+		ESC = self.ESC
+		END = self.END
+		if (ESC in payload):
+			payload = payload.replace(ESC, self.ESC_ESC)
+		if (END in payload):
+			payload = payload.replace(END, self.ESC_END)
+
+		if (not trailer):
+			return (END, payload, END)
+		if (ESC in trailer):
+			trailer = trailer.replace(ESC, self.ESC_ESC)
+		if (END in trailer):
+			trailer = trailer.replace(END, self.ESC_END)
+		return (END, payload, trailer, END)
+
+class CobsCodec(Codec):
+	"""Consistent Overhead Byte Stuffing framing.
+	Each frame ends with 0x00 and there is no 0x00 inside it, for at most one byte of overhead per 254 bytes.
+
+	Example Use: CobsCodec()
+	Example Use: CobsCodec(crc = "crc32")
+	"""
+
+	#The code byte for each block length
+	codeList = [bytes((i,)) for i in range(256)]
+
+	def _scan(self, buffer, view, start):
+		while True:
+			index = buffer.find(b"\x00", start)
+			if (index == -1):
+				return None, start
+			if (index == start):
+				start += 1
+				continue
+
+			block = view[start:index]
+			try:
+				content = self.unstuff(block)
+			finally:
+				block.release()
+			if (content is None):
+				#Skip the broken frame, but count it
+				self.invalid += 1
+				start = index + 1
+				continue
+			return content, index + 1
+
+	def _tailLength(self, buffer, start):
+		#There is one code byte to start with, then one more for each 254 bytes; the rest only stand in for zeros
+		size = len(buffer) - start
+		return max(0, size - 1 - (size - 1) // 255)
+
+	@staticmethod
+	def unstuff(block):
+		"""Returns what 'block' was before it was stuffed, or None if it is not valid COBS.
+		The runs between zeros are copied straight from 'block' into the bytearray that is returned.
+		"""
+
+		content = bytearray()
+		size = len(block)
+		i = 0
+		while (i < size):
+			code = block[i]
+			stop = i + code
+			if ((code == 0) or (stop > size)):
+				return None
+
+			content += block[i + 1:stop]
+			if ((code != 0xFF) and (stop < size)):
+				content.append(0)
+			i = stop
+		return content
+
+	def _wrap(self, payload, trailer):
+		#Each block starts with a code byte that is only known once the block ends, so leave a space for it
+		partList = [None]
+		codeIndex = 0
+		runLength = 0
+		afterFull = False #If the last block ended because it was full, rather than at a zero
+		for data in (payload, trailer):
+			view = memoryview(data)
+			position = 0
+			while True:
+				index = data.find(0, position)
+				if (index == -1):
+					break
+				if (index - position + runLength < 0xFE):
+					if (index > position):
+						partList.append(view[position:index])
+					runLength += index - position
+				else:
+					runLength, codeIndex = self._stuff(view, position, index, runLength, codeIndex, partList)
+				position = index
+
+				#This zero ends the block
+				partList[codeIndex] = self.codeList[runLength + 1]
+				codeIndex = len(partList)
+				partList.append(None)
+				runLength = 0
+				afterFull = False
+				position += 1
+
+			if (position < len(view)):
+				runLength, codeIndex = self._stuff(view, position, len(view), runLength, codeIndex, partList)
+				afterFull = (runLength == 0)
+
+		if ((runLength == 0) and afterFull):
+			#A full block at the very end does not need an empty one after it
+			del partList[codeIndex]
+		else:
+			partList[codeIndex] = self.codeList[runLength + 1]
+		partList.append(b"\x00")
+		return partList
+
+	def _stuff(self, view, position, stop, runLength, codeIndex, partList):
+		"""Adds the bytes in 'view' from 'position' to 'stop', none of which are zero, to the blocks being wrapped.
+		A block that fills up is given its code and a new one is started.
+		Returns the run length and where the code goes for the block that is still open.
+		"""
+
+		while (position < stop):
+			size = min(stop - position, 0xFE - runLength)
+			partList.append(view[position:position + size])
+			runLength += size
+			position += size
+			if (runLength == 0xFE):
+				partList[codeIndex] = b"\xFF"
+				codeIndex = len(partList)
+				partList.append(None)
+				runLength = 0
+		return runLength, codeIndex
+
+class LengthPrefixCodec(Codec):
+	"""Framing where each frame starts with how many bytes follow.
+
+	Example Use: LengthPrefixCodec()
+	Example Use: LengthPrefixCodec(size = 4, byteorder = "little", crc = "crc32")
+	"""
+
+	def __init__(self, size = 2, byteorder = "big", **kwargs):
+		"""Defines the internal variables needed to run.
+
+		size (int) - How many bytes the length takes up; 1, 2, 4 or 8
+		byteorder (str) - How the length is written
+		"""
+
+		super().__init__(**kwargs)
+
+		formatCatalogue = {1: "B", 2: "H", 4: "I", 8: "Q"}
+		if (size not in formatCatalogue):
+			errorMessage = f"The length can only be {list(formatCatalogue)} bytes, not {size}"
+			raise ValueError(errorMessage)
+
+		self.header = struct.Struct((">" if (byteorder == "big") else "<") + formatCatalogue[size])
+
+	def _scan(self, buffer, view, start):
+		while True:
+			if (len(buffer) - start < self.header.size):
+				return None, start
+
+			length = self.header.unpack_from(buffer, start)[0]
+			if ((self.maxLength is not None) and (length > self.maxLength)):
+				#This cannot be a real header; look for the next one
+				self.invalid += 1
+				start += 1
+				continue
+
+			stop = start + self.header.size + length
+			if (len(buffer) < stop):
+				return None, start
+			return view[start + self.header.size:stop], stop
+
+	def _tailLength(self, buffer, start):
+		return max(0, len(buffer) - start - self.header.size)
+
+	def _wrap(self, payload, trailer):
+		return (self.header.pack(len(payload) + len(trailer)), payload, trailer)
+
+class StxEtxCodec(Codec):
+	"""Framing where each frame starts with STX (0x02) and ends with ETX (0x03), followed by the CRC if there is one.
+	The CRC only covers the payload. The payload cannot contain ETX.
+
+	Example Use: StxEtxCodec()
+	Example Use: StxEtxCodec(crc = "crc16")
+	"""
+
+	def __init__(self, stx = b"\x02", etx = b"\x03", **kwargs):
+		"""Defines the internal variables needed to run.
+
+		stx (bytes) - What starts a frame
+		etx (bytes) - What ends a frame
+		"""
+
+		super().__init__(**kwargs)
+
+		self.stx = stx
+		self.etx = etx
+
+	def _scan(self, buffer, view, start):
+		index = buffer.find(self.stx, start)
+		if (index == -1):
+			#Nothing here is part of a frame
+			return None, len(buffer)
+
+		stop = buffer.find(self.etx, index + len(self.stx))
+		if (stop == -1):
+			return None, index
+
+		stop += len(self.etx)
+		if (self.crc is not None):
+			stop += self.crc.size
+		if (len(buffer) < stop):
+			return None, index
+		return view[index + len(self.stx):stop], stop
+
+	def _tailLength(self, buffer, start):
+		if (len(buffer) - start < len(self.stx)):
+			return 0
+
+		#Do not count STX, or ETX if it has arrived and only the CRC is missing
+		stop = buffer.find(self.etx, start + len(self.stx))
+		if (stop == -1):
+			return len(buffer) - start - len(self.stx)
+		return len(buffer) - start - len(self.stx) - len(self.etx)
+
+	def _unwrap(self, content):
+		size = 0 if (self.crc is None) else self.crc.size
+		payload = content[:len(content) - size - len(self.etx)]
+		if ((self.crc is not None) and (not self.crc.check(payload, content[len(content) - size:]))):
+			return None
+		return bytearray(payload)
+
+	def _wrap(self, payload, trailer):
+		if (self.etx in payload):
+			errorMessage = f"The payload cannot contain ETX {self.etx!r}; use a different codec"
+			raise ValueError(errorMessage)
+		return (self.stx, payload, self.etx, trailer)
+
+#What codecs can be asked for by name
+##{name (str): codec class}
+codecCatalogue = {
+	"slip": SlipCodec,
+	"cobs": CobsCodec,
+	"length": LengthPrefixCodec,
+	"stxetx": StxEtxCodec,
+}
+
+def registerCodec(name, codecClass):
+	"""Adds a codec that getCodec() can make.
+
+	name (str) - What the codec is called
+	codecClass (class) - A subclass of Codec
+
+	Example Input: registerCodec("myProtocol", MyCodec)
+	"""
+
+	codecCatalogue[name] = codecClass
+
+def getCodec(codec, **kwargs):
+	"""Returns a new codec with the given name, or 'codec' itself if it is already a codec.
+	Each connection should have its own codec, since it remembers how many frames were invalid and reuses its encode buffer.
+
+	codec (str) - The name of the codec, such as "slip", "cobs", "length" or "stxetx"
+
+	Example Input: getCodec("slip")
+	Example Input: getCodec("length", size = 4, crc = "crc32")
+	"""
+
+	if (isinstance(codec, Codec)):
+		return codec
+
+	if (codec not in codecCatalogue):
+		errorMessage = f"There is no codec named {codec!r}; use one of {list(codecCatalogue)}"
+		raise KeyError(errorMessage)
+	return codecCatalogue[codec](**kwargs)
@@ -0,0 +1,218 @@
+__version__ = "2.0.0"
+
+#Import standard elements
+import os
+import sys
+import time
+import heapq
+import select
+import threading
+
+#Pseudo-terminals are only on Linux, macOS and other unix systems
+if (sys.platform != "win32"):
+	import tty
+
+class VirtualPort():
+	"""A pseudo-terminal pair with a fake device on the far end, so a ComPort can be used without hardware.
+	Open a ComPort child on 'port' and it talks to the fake device.
+	Only works where there are pseudo-terminals, such as Linux and macOS.
+
+	The fake device can behave like:
+		"echo" - Writes back everything it is sent
+		"sink" - Reads and throws away everything it is sent
+		"stream" - Writes 'message' every 'interval' seconds, like a sensor; sent data is thrown away
+		"responder" - Waits 'delay' seconds after each line that ends with 'end', then writes 'reply(line)'
+		function - Calls it with this VirtualPort and what was sent each time something arrives
+
+	Example Use:
+		with API_Com.loopback.VirtualPort("echo") as virtual:
+			comPort.open(virtual.port)
+			comPort.send("Lorem ipsum\n")
+			comPort.read(end = "\n")
+
+	Example Use: VirtualPort("stream", message = b"23.5C\r\n", interval = 0.01)
+	Example Use: VirtualPort("responder", delay = 0.002, reply = lambda line: b"OK " + line)
+	"""
+
+	#How many seconds each wait lasts before checking if it should stop
+	pollInterval = 0.05
+
+	#The most bytes to read from the pseudo-terminal at a time
+	chunkSize = 65536
+
+	def __init__(self, behavior = "echo", *, message = b"\n", interval = 0, count = None,
+		delay = 0, end = b"\n", reply = None, start = True):
+		"""Defines the internal variables needed to run.
+
+		behavior (str) - How the fake device acts; "echo", "sink", "stream", "responder", or a function
+		message (bytes) - What "stream" writes each time
+		interval (float) - How many seconds "stream" waits between messages
+			- If 0: Writes as fast as the other end reads
+		count (int) - How many messages "stream" writes before it stops
+			- If None: Does not stop
+		delay (float) - How many seconds "responder" waits before replying
+		end (bytes) - What ends each line for "responder"
+		reply (function) - What "responder" sends back for each line, including 'end'
+			- If None: Sends the line back
+		start (bool) - If True: Starts the fake device right away
+		"""
+
+		if (sys.platform == "win32"):
+			errorMessage = "VirtualPort needs pseudo-terminals, which Windows does not have"
+			raise OSError(errorMessage)
+
+		if ((not callable(behavior)) and (behavior not in ("echo", "sink", "stream", "responder"))):
+			errorMessage = f"'behavior' should be 'echo', 'sink', 'stream', 'responder' or a function, not {behavior!r}"
+			raise ValueError(errorMessage)
+
+		self.behavior = behavior
+		self.message = message.encode("utf-8") if isinstance(message, str) else message
+		self.interval = interval
+		self.count = count
+		self.delay = delay
+		self.end = end.encode("utf-8") if isinstance(end, str) else end
+		self.reply = reply
+
+		#The slave end is kept open, so the master end does not error while the ComPort is closed
+		self.master, self.slave = os.openpty()
+		tty.setraw(self.master)
+		tty.setraw(self.slave)
+		self.port = os.ttyname(self.slave)
+
+		self.received = 0 #How many bytes the fake device was sent
+		self.sent = 0 #How many bytes the fake device wrote
+		self.lineBuffer = bytearray()
+		self.scheduled = [] #Heap of (when (float), order (int), data (bytes)) for "responder"
+		self.scheduledCount = 0
+
+		self.stopEvent = threading.Event()
+		self.thread = threading.Thread(target = self.run, name = f"API_Com.VirtualPort.{self.port}", daemon = True)
+		if (start):
+			self.start()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def start(self):
+		"""Starts the fake device."""
+
+		self.thread.start()
+
+	def stop(self, timeout = None):
+		"""Stops the fake device and waits for it to finish.
+
+		timeout (float) - How many seconds to wait
+			- If None: Wait forever
+		"""
+
+		self.stopEvent.set()
+		if (self.thread.is_alive() and (self.thread is not threading.current_thread())):
+			self.thread.join(timeout)
+
+	def close(self):
+		"""Stops the fake device and removes the pseudo-terminal."""
+
+		self.stop()
+		for fileno in (self.master, self.slave):
+			try:
+				os.close(fileno)
+			except OSError:
+				pass
+
+	def write(self, data):
+		"""Writes 'data' to the ComPort as if the fake device sent it.
+
+		data (bytes) - What to write
+
+		Example Input: write(b"ALARM\n")
+		"""
+
+		if (isinstance(data, str)):
+			data = data.encode("utf-8")
+
+		view = memoryview(data)
+		while (view):
+			view = view[os.write(self.master, view):]
+		self.sent += len(data)
+
+	def schedule(self, data, delay):
+		"""Writes 'data' to the ComPort after 'delay' seconds."""
+
+		heapq.heappush(self.scheduled, (time.monotonic() + delay, self.scheduledCount, data))
+		self.scheduledCount += 1
+
+	def onReceive(self, data):
+		"""Acts on 'data' the way 'behavior' says to."""
+
+		if (callable(self.behavior)):
+			self.behavior(self, data)
+
+		elif (self.behavior == "echo"):
+			self.write(data)
+
+		elif (self.behavior == "responder"):
+			self.lineBuffer += data
+			while True:
+				index = self.lineBuffer.find(self.end)
+				if (index == -1):
+					break
+				line = bytes(self.lineBuffer[:index + len(self.end)])
+				del self.lineBuffer[:index + len(self.end)]
+
+				reply = line if (self.reply is None) else self.reply(line)
+				if (self.delay):
+					self.schedule(reply, self.delay)
+				else:
+					self.write(reply)
+
+	def run(self):
+		"""Needed to run the fake device on a separate thread."""
+
+		streaming = (self.behavior == "stream")
+		streamed = 0
+		nextStream = time.monotonic()
+		while (not self.stopEvent.is_set()):
+			now = time.monotonic()
+
+			#Write what is due
+			while (self.scheduled and (self.scheduled[0][0] <= now)):
+				self.write(heapq.heappop(self.scheduled)[2])
+
+			if (streaming and ((self.count is None) or (streamed < self.count))):
+				if (not self.interval):
+					#Only write when the other end has room, so it can still be stopped
+					if (select.select([], [self.master], [], self.pollInterval)[1]):
+						self.write(self.message)
+						streamed += 1
+				elif (now >= nextStream):
+					self.write(self.message)
+					streamed += 1
+					nextStream += self.interval
+
+			#Wait for something to read or something to be due
+			wait = self.pollInterval
+			if (self.scheduled):
+				wait = min(wait, self.scheduled[0][0] - now)
+			if (streaming and self.interval and ((self.count is None) or (streamed < self.count))):
+				wait = min(wait, nextStream - now)
+			if (streaming and (not self.interval) and ((self.count is None) or (streamed < self.count))):
+				wait = 0
+
+			try:
+				readable = select.select([self.master], [], [], max(0, wait))[0]
+			except (OSError, ValueError):
+				#The pseudo-terminal was closed
+				return
+			if (not readable):
+				continue
+
+			try:
+				data = os.read(self.master, self.chunkSize)
+			except OSError:
+				return
+			self.received += len(data)
+			if (not streaming):
+				self.onReceive(data)
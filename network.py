@@ -0,0 +1,1067 @@
+__version__ = "2.0.0"
+
+#Import standard elements
+import os
+import time
+import json
+import errno
+import struct
+import select
+import socket
+import asyncio
+import selectors
+import threading
+import warnings
+import collections
+
+import netaddr
+
+#Only unix systems can say how many files can be open
+try:
+	import resource
+except ImportError:
+	resource = None
+
+#Only unix systems can ask the kernel about each interface
+try:
+	import fcntl
+except ImportError:
+	fcntl = None
+
+#ICMP echo message types
+##{family: (request type (int), reply type (int), protocol (int))}
+icmpCatalogue = {
+	socket.AF_INET: (8, 0, socket.IPPROTO_ICMP),
+	socket.AF_INET6: (128, 129, getattr(socket, "IPPROTO_ICMPV6", 58)),
+}
+
+#Errors from connect() that mean something answered, so the host is up
+refusedErrors = (errno.ECONNREFUSED, getattr(errno, "WSAECONNREFUSED", errno.ECONNREFUSED), errno.ECONNRESET)
+
+def icmpChecksum(data):
+	"""Returns the internet checksum (RFC 1071) of 'data'.
+
+	Example Input: icmpChecksum(b"\x08\x00\x00\x00\x12\x34\x00\x01")
+	"""
+
+	if (len(data) % 2):
+		data += b"\x00"
+	total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+	total = (total >> 16) + (total & 0xFFFF)
+	total += total >> 16
+	return ~total & 0xFFFF
+
+def resolve(address):
+	"""Returns the family and socket address for 'address', or None if it cannot be found.
+
+	Example Input: resolve("192.168.0.21")
+	Example Input: resolve("printer.local")
+	"""
+
+	try:
+		family, kind, protocol, name, socketAddress = socket.getaddrinfo(address.strip(), None, proto = socket.IPPROTO_TCP)[0]
+	except (socket.gaierror, UnicodeError, IndexError):
+		return None
+	return family, socketAddress
+
+#ioctl requests for reading an interface's settings on Linux
+##{setting: request (int)}
+interfaceRequestCatalogue = {
+	"flags": 0x8913, #SIOCGIFFLAGS
+	"address": 0x8915, #SIOCGIFADDR
+	"netmask": 0x891b, #SIOCGIFNETMASK
+}
+interfaceUp = 0x1 #IFF_UP
+interfaceLoopback = 0x8 #IFF_LOOPBACK
+
+#The largest local network that is scanned whole without being asked for, such as a /20 with 4094 hosts
+##Larger ones, such as the /16 bridges that docker makes, only have the /24 around this computer scanned
+largestDefaultPrefix = 20
+narrowedPrefix = 24
+
+#One local network interface
+##name (str): What the system calls it, such as "eth0"; None if it could not be found
+##address (str): This computer's ipv4 address on it
+##network (netaddr.IPNetwork): The network it is on, such as 192.168.0.21/24
+##loopback (bool): If it only reaches this computer
+Interface = collections.namedtuple("Interface", ("name", "address", "network", "loopback"))
+
+def _readInterface(device, name, setting):
+	"""Asks the kernel for one of an interface's settings."""
+
+	data = fcntl.ioctl(device.fileno(), interfaceRequestCatalogue[setting], struct.pack("256s", name.encode("utf-8")[:15]))
+	if (setting == "flags"):
+		return struct.unpack_from("H", data, 16)[0]
+	return socket.inet_ntoa(data[20:24])
+
+def getInterfaces(loopback = False):
+	"""Returns the ipv4 network interfaces that are up.
+	On Linux every interface is asked about; elsewhere, only the one that the default route goes out of is found.
+
+	loopback (bool) - If True: Includes interfaces that only reach this computer
+
+	Example Input: getInterfaces()
+	"""
+
+	interfaceList = []
+	if ((fcntl is not None) and hasattr(socket, "if_nameindex")):
+		with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as device:
+			for index, name in socket.if_nameindex():
+				try:
+					flags = _readInterface(device, name, "flags")
+					if (not flags & interfaceUp):
+						continue
+					address = _readInterface(device, name, "address")
+					netmask = _readInterface(device, name, "netmask")
+				except OSError:
+					#It has no ipv4 address, or is not something ioctl() knows about
+					continue
+
+				interfaceList.append(Interface(name, address, netaddr.IPNetwork(f"{address}/{netmask}"), bool(flags & interfaceLoopback)))
+
+	if (not interfaceList):
+		#Connecting a datagram socket sends nothing, but picks the address the default route would use
+		with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as device:
+			try:
+				device.connect(("192.0.2.1", 9))
+				address = device.getsockname()[0]
+			except OSError:
+				address = None
+
+		if (address not in (None, "0.0.0.0")):
+			warnings.warn(f"Could not read the netmask for {address}; assuming it is on a /24", Warning, stacklevel = 2)
+			interfaceList.append(Interface(None, address, netaddr.IPNetwork(f"{address}/24"), address.startswith("127.")))
+
+	if (not loopback):
+		interfaceList = [interface for interface in interfaceList if (not interface.loopback)]
+	return interfaceList
+
+def getNetworks(loopback = False):
+	"""Returns the networks this computer is on, with overlapping ones merged.
+
+	loopback (bool) - If True: Includes the loopback network
+
+	Example Input: getNetworks()
+	"""
+
+	return netaddr.cidr_merge([interface.network.cidr for interface in getInterfaces(loopback = loopback)])
+
+def iterHosts(networks = None):
+	"""Yields every host address in 'networks' without making a list of them, so a /16 or larger costs no more memory than a /24.
+	The network and broadcast addresses are skipped, and addresses in overlapping networks are only given once.
+
+	networks (list) - What to go through; each can be a netaddr.IPNetwork, netaddr.IPRange, or cidr string
+		- If None: Uses every network this computer is on. Ones larger than 'largestDefaultPrefix' only have the /24 around this computer's address,
+		  so a docker bridge does not add 65 thousand hosts; give them here to go through all of them
+
+	Example Input: iterHosts()
+	Example Input: iterHosts(["10.20.0.0/20", "192.168.0.0/24"])
+	"""
+
+	if (networks is None):
+		networks = []
+		for interface in getInterfaces():
+			network = interface.network.cidr
+			if (network.prefixlen < largestDefaultPrefix):
+				narrowed = netaddr.IPNetwork(f"{interface.address}/{narrowedPrefix}").cidr
+				warnings.warn(f"{interface.name or interface.address} is on {network}, which is too large to scan unless it is asked for; only scanning {narrowed}", Warning, stacklevel = 2)
+				network = narrowed
+			networks.append(network)
+	elif (isinstance(networks, (str, netaddr.IPNetwork, netaddr.IPRange))):
+		networks = [networks]
+
+	rangeList = []
+	for network in networks:
+		if (isinstance(network, netaddr.IPRange)):
+			rangeList.append((network.version, network.first, network.last))
+			continue
+
+		if (isinstance(network, str)):
+			network = netaddr.IPNetwork(network)
+		if ((network.version == 4) and (network.prefixlen < 31)):
+			rangeList.append((network.version, network.first + 1, network.last - 1))
+		else:
+			rangeList.append((network.version, network.first, network.last))
+
+	#Merge overlapping ranges so no address is checked twice
+	mergedList = []
+	for version, first, last in sorted(rangeList):
+		if (mergedList and (mergedList[-1][0] == version) and (first <= mergedList[-1][2] + 1)):
+			mergedList[-1][2] = max(mergedList[-1][2], last)
+		else:
+			mergedList.append([version, first, last])
+
+	for version, first, last in mergedList:
+		for value in range(first, last + 1):
+			yield str(netaddr.IPAddress(value, version))
+
+class Prober():
+	"""Checks if hosts are online without starting a process.
+	It sends an ICMP echo over an unprivileged datagram socket where the kernel allows it,
+	such as Linux when the user's group is in net.ipv4.ping_group_range, and macOS.
+	Otherwise, or if there is no echo reply, it tries to connect to 'ports' at the same time;
+	a host that accepts or refuses a connection is online.
+
+	Example Use: Prober().probe("192.168.0.21")
+	Example Use: Prober(timeout = 0.2, ports = (9100,)).probe("192.168.0.21")
+	"""
+
+	#Ports that many devices answer on: http, https, ssh, smb, netbios, and raw printing
+	defaultPorts = (80, 443, 22, 445, 139, 9100)
+
+	def __init__(self, timeout = 0.5, ports = None, icmp = True):
+		"""Defines the internal variables needed to run.
+
+		timeout (float) - How many seconds to wait for each host
+		ports (list) - Which TCP ports to try connecting to
+			- If None: Uses defaultPorts
+		icmp (bool) - If True: Sends an ICMP echo first, if the kernel allows it
+		"""
+
+		self.timeout = timeout
+		self.ports = tuple(self.defaultPorts if (ports is None) else ports)
+		self.icmp = icmp
+
+		self._sequence = 0
+		self._lock = threading.Lock()
+
+	@classmethod
+	def icmpAvailable(cls, family = socket.AF_INET):
+		"""Returns if this process can send ICMP echoes without being root.
+
+		Example Input: icmpAvailable()
+		"""
+
+		catalogue = cls.__dict__.get("_icmpCatalogue")
+		if (catalogue is None):
+			catalogue = cls._icmpCatalogue = {}
+
+		if (family not in catalogue):
+			try:
+				socket.socket(family, socket.SOCK_DGRAM, icmpCatalogue[family][2]).close()
+				catalogue[family] = True
+			except (OSError, AttributeError, KeyError):
+				catalogue[family] = False
+		return catalogue[family]
+
+	def nextSequence(self):
+		with self._lock:
+			self._sequence = (self._sequence + 1) & 0xFFFF
+			return self._sequence
+
+	def probe(self, address):
+		"""Returns if the host is online, and how many seconds it took to answer.
+		If it is offline, the time is None.
+
+		address (str) - The ip address or host name
+
+		Example Input: probe("192.168.0.21")
+		"""
+
+		resolved = resolve(address)
+		if (resolved is None):
+			return False, None
+		family, socketAddress = resolved
+
+		if (self.icmp and self.icmpAvailable(family)):
+			online, rtt = self.probeIcmp(family, socketAddress)
+			if (online or (not self.ports)):
+				return online, rtt
+
+		return self.probeTcp(family, socketAddress)
+
+	def probeIcmp(self, family, socketAddress, timeout = None):
+		"""Sends an ICMP echo and waits for the reply.
+		Returns if there was a reply, and how many seconds it took.
+		"""
+
+		if (timeout is None):
+			timeout = self.timeout
+		requestType, replyType, protocol = icmpCatalogue[family]
+		sequence = self.nextSequence()
+		payload = struct.pack("!d", time.perf_counter())
+
+		#The kernel puts in its own identifier
+		header = struct.pack("!BBHHH", requestType, 0, 0, 0, sequence)
+		checksum = icmpChecksum(header + payload) if (family == socket.AF_INET) else 0
+		packet = struct.pack("!BBHHH", requestType, 0, checksum, 0, sequence) + payload
+
+		try:
+			device = socket.socket(family, socket.SOCK_DGRAM, protocol)
+		except OSError:
+			return False, None
+
+		with device:
+			device.setblocking(False)
+			start = time.perf_counter()
+			deadline = time.monotonic() + timeout
+			try:
+				device.sendto(packet, socketAddress[:2] if (family == socket.AF_INET) else socketAddress)
+			except OSError:
+				return False, None
+
+			while True:
+				remaining = deadline - time.monotonic()
+				if ((remaining <= 0) or (not select.select([device], [], [], remaining)[0])):
+					return False, None
+
+				try:
+					data = device.recv(1024)
+				except BlockingIOError:
+					continue
+				except OSError:
+					#Such as the host being unreachable
+					return False, None
+
+				#Raw sockets on some systems give the IP header too
+				if ((family == socket.AF_INET) and data and ((data[0] >> 4) == 4)):
+					data = data[(data[0] & 0x0F) * 4:]
+
+				if ((len(data) >= 8) and (data[0] == replyType) and (struct.unpack_from("!H", data, 6)[0] == sequence)):
+					return True, time.perf_counter() - start
+
+	def probeTcp(self, family, socketAddress, timeout = None):
+		"""Tries to connect to every port at once.
+		Returns if any port accepted or refused the connection, and how many seconds the first answer took.
+		"""
+
+		if (timeout is None):
+			timeout = self.timeout
+
+		selector = selectors.DefaultSelector()
+		deviceList = []
+		start = time.perf_counter()
+		try:
+			for port in self.ports:
+				device = socket.socket(family, socket.SOCK_STREAM)
+				device.setblocking(False)
+				deviceList.append(device)
+
+				error = device.connect_ex((socketAddress[0], port) + tuple(socketAddress[2:]))
+				if ((error == 0) or (error in refusedErrors)):
+					return True, time.perf_counter() - start
+				selector.register(device, selectors.EVENT_WRITE)
+
+			deadline = time.monotonic() + timeout
+			while (selector.get_map()):
+				remaining = deadline - time.monotonic()
+				if (remaining <= 0):
+					break
+
+				for key, events in selector.select(remaining):
+					error = key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+					if ((error == 0) or (error in refusedErrors)):
+						return True, time.perf_counter() - start
+					selector.unregister(key.fileobj)
+
+			return False, None
+
+		finally:
+			selector.close()
+			for device in deviceList:
+				device.close()
+
+def readNeighbours(path = "/proc/net/arp"):
+	"""Returns the hosts the kernel has recently talked to on the local network, from its ARP table.
+	Only complete entries are given; these hosts answered an ARP request within the last few minutes.
+	Returns an empty dictionary where there is no such table, such as on Windows and macOS.
+
+	path (str) - Where the ARP table is
+
+	Example Input: readNeighbours()
+	"""
+
+	neighbourCatalogue = {} #{address (str): hardware address (str)}
+	try:
+		with open(path) as fileHandle:
+			lineList = fileHandle.read().splitlines()[1:]
+	except OSError:
+		return neighbourCatalogue
+
+	for line in lineList:
+		fieldList = line.split()
+		if (len(fieldList) < 4):
+			continue
+
+		address, hardwareType, flags, hardwareAddress = fieldList[:4]
+		if ((int(flags, 16) & 0x2) and (hardwareAddress != "00:00:00:00:00:00")):
+			neighbourCatalogue[address] = hardwareAddress
+	return neighbourCatalogue
+
+class DiscoveryCache():
+	"""Remembers which addresses were online or offline, so a repeat scan only checks the ones it has not seen lately.
+	If 'path' is given, it is loaded from there and saved back after each scan, so it lasts between runs.
+	It can be used from more than one thread.
+
+	Example Use: DiscoveryCache("discovery.json", ttl = 300)
+	Example Use: Scanner(addresses, cache = DiscoveryCache())
+	"""
+
+	#Changes when the file layout does
+	version = 1
+
+	def __init__(self, path = None, ttl = 300):
+		"""Defines the internal variables needed to run.
+
+		path (str) - Where to save the cache as json
+			- If None: It is only kept in memory
+		ttl (float) - How many seconds a result is good for
+		"""
+
+		self.path = path
+		self.ttl = ttl
+		self.lock = threading.Lock()
+		self.hostCatalogue = {} #{address (str): (when it was checked in seconds since the epoch (float), online (bool), rtt (float))}
+
+		if ((path is not None) and os.path.exists(path)):
+			self.load()
+
+	def __len__(self):
+		return len(self.hostCatalogue)
+
+	def __contains__(self, address):
+		return (self.get(address) is not None)
+
+	def get(self, address):
+		"""Returns if 'address' was online and how many seconds it took to answer, or None if it was not checked within 'ttl'.
+
+		address (str) - The ip address
+
+		Example Input: get("192.168.0.21")
+		"""
+
+		with self.lock:
+			entry = self.hostCatalogue.get(address)
+		if ((entry is None) or (time.time() - entry[0] > self.ttl)):
+			return None
+		return entry[1], entry[2]
+
+	def update(self, address, online, rtt = None):
+		"""Records that 'address' was just checked.
+
+		address (str) - The ip address
+		online (bool) - If it answered
+		rtt (float) - How many seconds it took to answer
+
+		Example Input: update("192.168.0.21", True, 0.004)
+		"""
+
+		with self.lock:
+			self.hostCatalogue[address] = (time.time(), online, rtt)
+
+	def getOnline(self):
+		"""Returns the addresses that were online within 'ttl'.
+
+		Example Input: getOnline()
+		"""
+
+		oldest = time.time() - self.ttl
+		with self.lock:
+			return [address for address, (seen, online, rtt) in self.hostCatalogue.items() if (online and (seen >= oldest))]
+
+	def prune(self):
+		"""Forgets results older than 'ttl'."""
+
+		oldest = time.time() - self.ttl
+		with self.lock:
+			self.hostCatalogue = {address: entry for address, entry in self.hostCatalogue.items() if (entry[0] >= oldest)}
+
+	def clear(self):
+		"""Forgets every result."""
+
+		with self.lock:
+			self.hostCatalogue.clear()
+
+	def load(self):
+		"""Reads the cache from 'path'; a file that cannot be read is ignored with a warning."""
+
+		try:
+			with open(self.path) as fileHandle:
+				data = json.load(fileHandle)
+			if (data.get("version") != self.version):
+				errorMessage = f"version {data.get('version')} is not {self.version}"
+				raise ValueError(errorMessage)
+			hostCatalogue = {address: tuple(entry) for address, entry in data["hosts"].items()}
+		except (OSError, ValueError, KeyError, TypeError, AttributeError) as error:
+			warnings.warn(f"Could not load the discovery cache from {self.path}; {error}", Warning, stacklevel = 2)
+			return
+
+		with self.lock:
+			hostCatalogue.update(self.hostCatalogue)
+			self.hostCatalogue = hostCatalogue
+
+	def save(self):
+		"""Writes the cache to 'path', leaving out results older than 'ttl'.
+		The file is replaced all at once, so a crash while saving does not lose the old one.
+		"""
+
+		if (self.path is None):
+			return
+
+		self.prune()
+		with self.lock:
+			data = {"version": self.version, "hosts": self.hostCatalogue}
+			temporaryPath = f"{self.path}.tmp"
+			with open(temporaryPath, "w") as fileHandle:
+				json.dump(data, fileHandle)
+			os.replace(temporaryPath, self.path)
+
+#One host that answered a scan
+##address (str): The ip address
+##rtt (float): How many seconds it took to answer; 0 if it was found in the ARP table
+Host = collections.namedtuple("Host", ("address", "rtt"))
+
+class ScanTarget():
+	"""An address being scanned; see Scanner."""
+
+	__slots__ = ("address", "family", "socketAddress", "start", "deadline", "deviceList", "sequence")
+
+	def __init__(self, address, family, socketAddress, deadline):
+		self.address = address
+		self.family = family
+		self.socketAddress = socketAddress
+		self.start = time.perf_counter()
+		self.deadline = deadline
+		self.deviceList = []
+		self.sequence = None
+
+class Scanner():
+	"""Checks many hosts at once from one thread, and yields each one as soon as it answers.
+	Each host gets an ICMP echo (if the system allows it without being root) and TCP connects to 'ports', all at the same time,
+	so scanning a /24 takes about one 'timeout' instead of one for each host.
+	Addresses are only taken from 'addresses' as there is room for them, so it can be a huge range or a generator.
+	Stop it early with cancel(), from any thread, or by closing the generator.
+	Give it a DiscoveryCache and it only checks addresses without a recent result, and with 'neighbours' it trusts the ARP table first.
+
+	Example Use: for host in Scanner(netaddr.IPNetwork("192.168.0.0/24").iter_hosts()): print(host.address, host.rtt)
+	Example Use: Scanner(addressList, timeout = 0.2, concurrency = 64, rate = 500)
+	Example Use: Scanner(addressList, cache = DiscoveryCache("discovery.json"), neighbours = True)
+	"""
+
+	def __init__(self, addresses, timeout = 0.5, ports = None, icmp = True, concurrency = 256, rate = None,
+		cache = None, neighbours = False):
+		"""Defines the internal variables needed to run.
+
+		addresses (iterable) - Which ip addresses to check
+		timeout (float) - How many seconds to wait for each host
+		ports (list) - Which TCP ports to try connecting to
+			- If None: Uses Prober.defaultPorts
+		icmp (bool) - If True: Sends ICMP echoes too, if the system allows it
+		concurrency (int) - How many hosts to check at once
+			- This is lowered if there would not be enough file descriptors for every port of every host
+		rate (float) - The most hosts to start checking each second
+			- If None: There is no limit
+		cache (DiscoveryCache) - Where to look up recent results first, and to record new ones
+			- If None: Every address is checked
+		neighbours (bool) - If True: Hosts in the kernel's ARP table are online without being checked
+		"""
+
+		self.addresses = iter(addresses)
+		self.cache = cache
+		self.neighbours = neighbours
+		self.timeout = timeout
+		self.ports = tuple(Prober.defaultPorts if (ports is None) else ports)
+		self.icmp = icmp
+		self.rate = rate
+
+		if ((resource is not None) and self.ports):
+			limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+			if (limit != resource.RLIM_INFINITY):
+				concurrency = max(1, min(concurrency, (limit - 64) // len(self.ports)))
+		self.concurrency = concurrency
+
+		self.cancelEvent = threading.Event()
+		self.checked = 0 #How many addresses have been checked so far
+		self.found = 0 #How many of them were online
+
+	def __iter__(self):
+		return self.run()
+
+	def cancel(self):
+		"""Stops the scan; it finishes on its own thread soon after.
+
+		Example Input: cancel()
+		"""
+
+		self.cancelEvent.set()
+
+	def run(self):
+		"""Yields a Host for each address that answers, in the order they answer."""
+
+		selector = selectors.DefaultSelector()
+		echoCatalogue = {} #{family: ICMP socket}
+		sequenceCatalogue = {} #{sequence (int): target}
+		activeList = []
+		sequence = 0
+		nextStart = time.monotonic()
+		exhausted = False
+		neighbourCatalogue = readNeighbours() if (self.neighbours) else {}
+
+		def finish(target, online):
+			for device in target.deviceList:
+				selector.unregister(device)
+				device.close()
+			target.deviceList.clear()
+			sequenceCatalogue.pop(target.sequence, None)
+			activeList.remove(target)
+			found(target.address, online, (time.perf_counter() - target.start) if online else None)
+
+		def found(address, online, rtt):
+			self.checked += 1
+			if (self.cache is not None):
+				self.cache.update(address, online, rtt)
+			if (online):
+				self.found += 1
+				foundList.append(Host(address, rtt))
+
+		try:
+			while (not self.cancelEvent.is_set()):
+				foundList = []
+				now = time.monotonic()
+
+				#Start on more addresses while there is room
+				while ((not exhausted) and (len(activeList) < self.concurrency) and (nextStart <= now)):
+					address = next(self.addresses, None)
+					if (address is None):
+						exhausted = True
+						break
+
+					address = str(address)
+					if (self.cache is not None):
+						cached = self.cache.get(address)
+						if (cached is not None):
+							self.checked += 1
+							if (cached[0]):
+								self.found += 1
+								foundList.append(Host(address, cached[1]))
+								if (len(foundList) >= self.concurrency):
+									break
+							continue
+
+					if (address in neighbourCatalogue):
+						found(address, True, 0.0)
+						if (len(foundList) >= self.concurrency):
+							break
+						continue
+
+					resolved = resolve(address)
+					if (resolved is None):
+						self.checked += 1
+						continue
+
+					family, socketAddress = resolved
+					target = ScanTarget(address, family, socketAddress, now + self.timeout)
+					activeList.append(target)
+
+					if (self.icmp and Prober.icmpAvailable(family)):
+						if (family not in echoCatalogue):
+							device = socket.socket(family, socket.SOCK_DGRAM, icmpCatalogue[family][2])
+							device.setblocking(False)
+							selector.register(device, selectors.EVENT_READ, None)
+							echoCatalogue[family] = device
+
+						sequence = (sequence + 1) & 0xFFFF
+						target.sequence = sequence
+						sequenceCatalogue[sequence] = target
+						if (not self.sendEcho(echoCatalogue[family], target)):
+							del sequenceCatalogue[sequence]
+							target.sequence = None
+
+					for port in self.ports:
+						device = socket.socket(family, socket.SOCK_STREAM)
+						device.setblocking(False)
+						error = device.connect_ex((socketAddress[0], port) + tuple(socketAddress[2:]))
+						if ((error == 0) or (error in refusedErrors)):
+							device.close()
+							target.deviceList.append(None)
+							break
+						if (error not in (errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK))):
+							device.close()
+							continue
+						selector.register(device, selectors.EVENT_WRITE, target)
+						target.deviceList.append(device)
+
+					if (None in target.deviceList):
+						#It answered right away
+						target.deviceList.remove(None)
+						finish(target, True)
+					elif ((not target.deviceList) and (target.sequence is None)):
+						#There was nothing that could be tried
+						finish(target, False)
+
+					if (self.rate):
+						nextStart = max(nextStart + 1 / self.rate, now - 1 / self.rate)
+
+				if (exhausted and (not activeList)):
+					for host in foundList:
+						yield host
+					return
+
+				#Wait for answers, the next timeout, or room to start another address
+				wake = min([target.deadline for target in activeList] + [now + 0.05])
+				if ((not exhausted) and (len(activeList) < self.concurrency)):
+					wake = min(wake, nextStart)
+
+				for key, events in selector.select(max(0, wake - time.monotonic())):
+					if (key.data is None):
+						#An ICMP echo reply
+						for target in self.readEchoes(key.fileobj, sequenceCatalogue):
+							if (target in activeList):
+								finish(target, True)
+						continue
+
+					target = key.data
+					if (target not in activeList):
+						continue
+
+					error = key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+					if ((error == 0) or (error in refusedErrors)):
+						finish(target, True)
+						continue
+
+					#Nothing is listening on that port and the host did not say so
+					selector.unregister(key.fileobj)
+					key.fileobj.close()
+					target.deviceList.remove(key.fileobj)
+					if ((not target.deviceList) and (target.sequence is None)):
+						finish(target, False)
+
+				now = time.monotonic()
+				for target in [target for target in activeList if (target.deadline <= now)]:
+					finish(target, False)
+
+				for host in foundList:
+					yield host
+
+		finally:
+			for target in list(activeList):
+				for device in target.deviceList:
+					device.close()
+			for device in echoCatalogue.values():
+				device.close()
+			selector.close()
+			if (self.cache is not None):
+				self.cache.save()
+
+	@staticmethod
+	def sendEcho(device, target):
+		"""Sends an ICMP echo to 'target'; returns if it could be sent."""
+
+		requestType, replyType, protocol = icmpCatalogue[target.family]
+		header = struct.pack("!BBHHH", requestType, 0, 0, 0, target.sequence)
+		checksum = icmpChecksum(header) if (target.family == socket.AF_INET) else 0
+		try:
+			device.sendto(struct.pack("!BBHHH", requestType, 0, checksum, 0, target.sequence), target.socketAddress[:2] if (target.family == socket.AF_INET) else target.socketAddress)
+		except OSError:
+			return False
+		return True
+
+	@staticmethod
+	def readEchoes(device, sequenceCatalogue):
+		"""Returns the targets whose echo replies are waiting on 'device'."""
+
+		replyTypes = [replyType for requestType, replyType, protocol in icmpCatalogue.values()]
+		targetList = []
+		while True:
+			try:
+				data = device.recv(1024)
+			except (BlockingIOError, InterruptedError):
+				return targetList
+			except OSError:
+				#Such as an unreachable error for an earlier echo
+				continue
+
+			if ((data[0] >> 4) == 4):
+				data = data[(data[0] & 0x0F) * 4:]
+			if ((len(data) >= 8) and (data[0] in replyTypes)):
+				target = sequenceCatalogue.get(struct.unpack_from("!H", data, 6)[0])
+				if (target is not None):
+					targetList.append(target)
+
+def scan(addresses, **kwargs):
+	"""Yields a Host for each address that is online, as soon as it answers.
+	Takes the same arguments as Scanner.
+
+	Example Input: scan(["192.168.0.1", "192.168.0.2"])
+	Example Input: scan(netaddr.IPRange("192.168.0.1", "192.168.0.254"), timeout = 0.3, rate = 200)
+	"""
+
+	return iter(Scanner(addresses, **kwargs))
+
+async def _iterate_async(scanner, name):
+	"""Runs 'scanner' on a separate thread and yields what it finds without blocking the event loop.
+	It is cancelled if the loop stops iterating.
+	"""
+
+	loop = asyncio.get_running_loop()
+	answers = asyncio.Queue()
+	finished = object()
+
+	def put(item):
+		try:
+			loop.call_soon_threadsafe(answers.put_nowait, item)
+		except RuntimeError:
+			#The event loop is gone
+			scanner.cancel()
+
+	def runFunction():
+		try:
+			for answer in scanner:
+				put(answer)
+		except Exception as error:
+			put(error)
+		finally:
+			put(finished)
+
+	thread = threading.Thread(target = runFunction, name = name, daemon = True)
+	thread.start()
+	try:
+		while True:
+			item = await answers.get()
+			if (item is finished):
+				return
+			if (isinstance(item, Exception)):
+				raise item
+			yield item
+	finally:
+		scanner.cancel()
+
+async def scan_async(addresses, **kwargs):
+	"""Yields a Host for each address that is online, as soon as it answers, without blocking the event loop.
+	The scan runs on one separate thread and is cancelled if the loop stops iterating.
+	Takes the same arguments as Scanner.
+
+	Example Input: async for host in scan_async(addressList): pass
+	"""
+
+	async for host in _iterate_async(Scanner(addresses, **kwargs), "API_Com.network.scan_async"):
+		yield host
+
+#One service that accepted a connection
+##address (str): The ip address
+##port (int): The TCP port
+##rtt (float): How many seconds it took to connect
+##banner (bytes): The first thing it sent, if a banner was asked for; otherwise None
+Service = collections.namedtuple("Service", ("address", "port", "rtt", "banner"))
+
+class ServiceAttempt():
+	"""One connection being tried; see ServiceScanner."""
+
+	__slots__ = ("address", "port", "device", "start", "deadline", "rtt", "banner")
+
+	def __init__(self, address, port, device, deadline):
+		self.address = address
+		self.port = port
+		self.device = device
+		self.start = time.perf_counter()
+		self.deadline = deadline
+		self.rtt = None #Set once it connects
+		self.banner = bytearray()
+
+class ServiceScanner():
+	"""Finds which hosts accept TCP connections on which ports, trying many (address, port) pairs at once from one thread.
+	Each pair that connects is yielded as soon as it does, or once its banner arrives if 'banner' is True.
+	Pairs are only taken from 'targets' as there is room for them, so it can be a huge range or a generator.
+	Stop it early with cancel(), from any thread, or by closing the generator.
+
+	Example Use: for service in ServiceScanner(API_Com.network.iterHosts(), ports = (9100, 502, 10000)): print(service.address, service.port)
+	Example Use: ServiceScanner([("192.168.0.21", 22), ("192.168.0.22", 22)], banner = True)
+	"""
+
+	def __init__(self, targets, ports = None, timeout = 1, concurrency = 512, rate = None, banner = False, 
+		bannerSize = 256, bannerTimeout = None):
+		"""Defines the internal variables needed to run.
+
+		targets (iterable) - Which ip addresses to check each of 'ports' on; can also be (address, port) pairs
+		ports (list) - Which TCP ports to try on each address
+			- If None: Uses Prober.defaultPorts
+		timeout (float) - How many seconds to wait for each connection
+		concurrency (int) - How many connections to try at once
+			- This is lowered if there would not be enough file descriptors
+		rate (float) - The most connections to start each second
+			- If None: There is no limit
+		banner (bool) - If True: Waits for each service to send something after connecting
+		bannerSize (int) - The most bytes of banner to keep
+		bannerTimeout (float) - How many seconds to wait for a banner; services that send nothing are still yielded
+			- If None: Uses 'timeout'
+		"""
+
+		self.ports = tuple(Prober.defaultPorts if (ports is None) else ports)
+		for port in self.ports:
+			if ((not isinstance(port, int)) or (not 0 < port < 65536)):
+				errorMessage = f"'ports' should only have numbers from 1 to 65535, not {port!r}"
+				raise ValueError(errorMessage)
+
+		self.targets = iter(targets)
+		self.timeout = timeout
+		self.rate = rate
+		self.banner = banner
+		self.bannerSize = bannerSize
+		self.bannerTimeout = timeout if (bannerTimeout is None) else bannerTimeout
+
+		if (resource is not None):
+			limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+			if (limit != resource.RLIM_INFINITY):
+				concurrency = max(1, min(concurrency, limit - 64))
+		self.concurrency = concurrency
+
+		self.cancelEvent = threading.Event()
+		self.checked = 0 #How many pairs have been tried so far
+		self.found = 0 #How many of them connected
+
+	def __iter__(self):
+		return self.run()
+
+	def cancel(self):
+		"""Stops the scan; it finishes on its own thread soon after.
+
+		Example Input: cancel()
+		"""
+
+		self.cancelEvent.set()
+
+	def iterPairs(self):
+		"""Yields each (address, port) pair to try."""
+
+		for target in self.targets:
+			if (isinstance(target, tuple)):
+				yield str(target[0]), target[1]
+				continue
+
+			address = str(target)
+			for port in self.ports:
+				yield address, port
+
+	def run(self):
+		"""Yields a Service for each pair that accepts a connection, in the order they connect."""
+
+		selector = selectors.DefaultSelector()
+		activeSet = set()
+		pairs = self.iterPairs()
+		nextStart = time.monotonic()
+		exhausted = False
+
+		def finish(attempt, connected):
+			try:
+				selector.unregister(attempt.device)
+			except KeyError:
+				pass
+			attempt.device.close()
+			activeSet.discard(attempt)
+			self.checked += 1
+			if (connected):
+				self.found += 1
+				foundList.append(Service(attempt.address, attempt.port, attempt.rtt, bytes(attempt.banner) if (self.banner) else None))
+
+		def connect(attempt):
+			attempt.rtt = time.perf_counter() - attempt.start
+			if (not self.banner):
+				finish(attempt, True)
+				return
+
+			attempt.deadline = time.monotonic() + self.bannerTimeout
+			try:
+				selector.modify(attempt.device, selectors.EVENT_READ, attempt)
+			except KeyError:
+				selector.register(attempt.device, selectors.EVENT_READ, attempt)
+
+		try:
+			while (not self.cancelEvent.is_set()):
+				foundList = []
+				now = time.monotonic()
+
+				#Start more connections while there is room
+				while ((not exhausted) and (len(activeSet) < self.concurrency) and (nextStart <= now)):
+					pair = next(pairs, None)
+					if (pair is None):
+						exhausted = True
+						break
+
+					address, port = pair
+					resolved = resolve(address)
+					if (resolved is None):
+						self.checked += 1
+						continue
+
+					family, socketAddress = resolved
+					device = socket.socket(family, socket.SOCK_STREAM)
+					device.setblocking(False)
+					attempt = ServiceAttempt(address, port, device, now + self.timeout)
+					activeSet.add(attempt)
+
+					error = device.connect_ex((socketAddress[0], port) + tuple(socketAddress[2:]))
+					if (error == 0):
+						connect(attempt)
+					elif (error in (errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK))):
+						selector.register(device, selectors.EVENT_WRITE, attempt)
+					else:
+						finish(attempt, False)
+
+					if (self.rate):
+						nextStart = max(nextStart + 1 / self.rate, now - 1 / self.rate)
+
+				if (exhausted and (not activeSet)):
+					for service in foundList:
+						yield service
+					return
+
+				#Wait for connections, banners, the next timeout, or room to start another pair
+				wake = min([attempt.deadline for attempt in activeSet] + [now + 0.05])
+				if ((not exhausted) and (len(activeSet) < self.concurrency)):
+					wake = min(wake, nextStart)
+
+				for key, events in selector.select(max(0, wake - time.monotonic())):
+					attempt = key.data
+					if (attempt not in activeSet):
+						continue
+
+					if (attempt.rtt is None):
+						error = attempt.device.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+						if (error):
+							finish(attempt, False)
+						else:
+							connect(attempt)
+						continue
+
+					try:
+						data = attempt.device.recv(self.bannerSize)
+					except (BlockingIOError, InterruptedError):
+						continue
+					except OSError:
+						data = b""
+					attempt.banner += data
+					finish(attempt, True)
+
+				#Connections that timed out never connected; services that sent no banner are still open
+				now = time.monotonic()
+				for attempt in [attempt for attempt in activeSet if (attempt.deadline <= now)]:
+					finish(attempt, attempt.rtt is not None)
+
+				for service in foundList:
+					yield service
+
+		finally:
+			for attempt in activeSet:
+				attempt.device.close()
+			selector.close()
+
+def scanServices(targets, **kwargs):
+	"""Yields a Service for each (address, port) that accepts a connection, as soon as it does.
+	Takes the same arguments as ServiceScanner.
+
+	Example Input: scanServices(["192.168.0.21", "192.168.0.22"], ports = (9100, 502))
+	Example Input: scanServices(API_Com.network.iterHosts("10.20.0.0/20"), ports = (22,), banner = True)
+	"""
+
+	return iter(ServiceScanner(targets, **kwargs))
+
+async def scanServices_async(targets, **kwargs):
+	"""Yields a Service for each (address, port) that accepts a connection, as soon as it does, without blocking the event loop.
+	The scan runs on one separate thread and is cancelled if the loop stops iterating.
+	Takes the same arguments as ServiceScanner.
+
+	Example Input: async for service in scanServices_async(addressList, ports = (9100,)): pass
+	"""
+
+	async for service in _iterate_async(ServiceScanner(targets, **kwargs), "API_Com.network.scanServices_async"):
+		yield service
@@ -1,7 +1,268 @@
 __version__ = "2.0.0"
 
+#Import standard elements
+import time
+import heapq
+import bisect
+import threading
+import contextlib
+import types
+import concurrent.futures
+
 import MyUtilities.common
 
+#Metric Classes
+class Histogram():
+	"""Counts how many latency measurements fall into each bucket.
+	The buckets double in size from 1 microsecond up to about 67 seconds, so recording is a single bisect.
+	"""
+
+	__slots__ = ("bucketCounts", "count", "total", "minimum", "maximum")
+
+	#The upper edge of each bucket in seconds
+	bucketList = tuple(1e-6 * 2 ** i for i in range(27))
+
+	def __init__(self):
+		self.bucketCounts = [0] * (len(self.bucketList) + 1)
+		self.count = 0
+		self.total = 0
+		self.minimum = None
+		self.maximum = None
+
+	def record(self, seconds):
+		"""Adds a measurement.
+
+		seconds (float) - How long it took
+
+		Example Input: record(0.0012)
+		"""
+
+		self.bucketCounts[bisect.bisect_left(self.bucketList, seconds)] += 1
+		self.count += 1
+		self.total += seconds
+		if ((self.minimum is None) or (seconds < self.minimum)):
+			self.minimum = seconds
+		if ((self.maximum is None) or (seconds > self.maximum)):
+			self.maximum = seconds
+
+	def percentile(self, percent):
+		"""Returns the upper edge of the bucket that 'percent' of the measurements fall into.
+
+		Example Input: percentile(99)
+		"""
+
+		if (not self.count):
+			return None
+
+		target = percent / 100 * self.count
+		runningTotal = 0
+		for i, bucketCount in enumerate(self.bucketCounts):
+			runningTotal += bucketCount
+			if (runningTotal >= target):
+				break
+		if (i >= len(self.bucketList)):
+			return self.maximum
+		return min(self.bucketList[i], self.maximum)
+
+	def merge(self, other):
+		"""Adds the measurements from another histogram to this one.
+
+		Example Input: merge(histogram)
+		"""
+
+		for i, bucketCount in enumerate(other.bucketCounts):
+			self.bucketCounts[i] += bucketCount
+		self.count += other.count
+		self.total += other.total
+		if ((other.minimum is not None) and ((self.minimum is None) or (other.minimum < self.minimum))):
+			self.minimum = other.minimum
+		if ((other.maximum is not None) and ((self.maximum is None) or (other.maximum > self.maximum))):
+			self.maximum = other.maximum
+
+	def snapshot(self):
+		"""Returns the histogram as a dictionary that can be saved as json.
+
+		Example Input: snapshot()
+		"""
+
+		return {
+			"count": self.count,
+			"total": self.total,
+			"mean": (self.total / self.count) if self.count else None,
+			"min": self.minimum,
+			"max": self.maximum,
+			"p50": self.percentile(50),
+			"p90": self.percentile(90),
+			"p99": self.percentile(99),
+			"buckets": list(self.bucketCounts),
+		}
+
+	@classmethod
+	def fromSnapshot(cls, snapshot):
+		"""Makes a histogram from something that snapshot() returned.
+
+		Example Input: fromSnapshot(snapshot)
+		"""
+
+		histogram = cls()
+		histogram.bucketCounts = list(snapshot["buckets"])
+		histogram.count = snapshot["count"]
+		histogram.total = snapshot["total"]
+		histogram.minimum = snapshot["min"]
+		histogram.maximum = snapshot["max"]
+		return histogram
+
+class Metrics():
+	"""Keeps count of what a connection has done.
+	The counters are not locked, so they are cheap to update; if several threads update the same connection at once a count may be slightly off.
+
+	Example Use: metrics.sent(len(message))
+	Example Use: with metrics.timer("open"): device.open()
+	"""
+
+	__slots__ = ("bytesIn", "bytesOut", "messagesIn", "messagesOut", "errors", "opens", "reconnects", "lastActivity", "histogramCatalogue")
+
+	def __init__(self):
+		self.bytesIn = 0
+		self.bytesOut = 0
+		self.messagesIn = 0
+		self.messagesOut = 0
+		self.errors = 0
+		self.opens = 0
+		self.reconnects = 0
+		self.lastActivity = None #When something was last sent or received, from time.time()
+		self.histogramCatalogue = {} #{name (str): Histogram}
+
+	def record(self, name, seconds):
+		"""Adds a latency measurement to the histogram with the given name.
+
+		name (str) - What was timed, such as "open", "send", "read", or "request"
+		seconds (float) - How long it took
+
+		Example Input: record("open", 0.25)
+		"""
+
+		histogram = self.histogramCatalogue.get(name)
+		if (histogram is None):
+			histogram = self.histogramCatalogue[name] = Histogram()
+		histogram.record(seconds)
+
+	@contextlib.contextmanager
+	def timer(self, name):
+		"""Records how long the with statement took under 'name'.
+		If an error is raised, it is counted and the time is not recorded.
+
+		Example Input: timer("open")
+		"""
+
+		start = time.perf_counter()
+		try:
+			yield
+		except Exception:
+			self.errors += 1
+			raise
+		self.record(name, time.perf_counter() - start)
+
+	def sent(self, size, seconds = None):
+		"""Counts an outgoing message.
+
+		size (int) - How many bytes were sent
+		seconds (float) - How long sending took
+			- If None: No time is recorded
+
+		Example Input: sent(12)
+		Example Input: sent(12, 0.001)
+		"""
+
+		self.bytesOut += size
+		self.messagesOut += 1
+		self.lastActivity = time.time()
+		if (seconds is not None):
+			self.record("send", seconds)
+
+	def received(self, size, seconds = None):
+		"""Counts an incoming message.
+
+		size (int) - How many bytes were received
+		seconds (float) - How long reading took
+			- If None: No time is recorded
+
+		Example Input: received(12)
+		Example Input: received(12, 0.001)
+		"""
+
+		self.bytesIn += size
+		self.messagesIn += 1
+		self.lastActivity = time.time()
+		if (seconds is not None):
+			self.record("read", seconds)
+
+	def failed(self):
+		"""Counts an error."""
+
+		self.errors += 1
+
+	def opened(self, seconds = None):
+		"""Counts the connection being opened; every open after the first is a reconnect.
+
+		seconds (float) - How long opening took
+			- If None: No time is recorded
+
+		Example Input: opened(0.25)
+		"""
+
+		if (self.opens):
+			self.reconnects += 1
+		self.opens += 1
+		self.lastActivity = time.time()
+		if (seconds is not None):
+			self.record("open", seconds)
+
+	def snapshot(self):
+		"""Returns the metrics as a dictionary that can be saved as json.
+
+		Example Input: snapshot()
+		"""
+
+		return {
+			"bytesIn": self.bytesIn,
+			"bytesOut": self.bytesOut,
+			"messagesIn": self.messagesIn,
+			"messagesOut": self.messagesOut,
+			"errors": self.errors,
+			"opens": self.opens,
+			"reconnects": self.reconnects,
+			"lastActivity": self.lastActivity,
+			"latency": {name: histogram.snapshot() for name, histogram in self.histogramCatalogue.items()},
+		}
+
+	@classmethod
+	def combine(cls, snapshotList):
+		"""Returns one snapshot that totals up all of the given snapshots.
+
+		Example Input: combine([child.stats() for child in container])
+		"""
+
+		metrics = cls()
+		for snapshot in snapshotList:
+			metrics.bytesIn += snapshot["bytesIn"]
+			metrics.bytesOut += snapshot["bytesOut"]
+			metrics.messagesIn += snapshot["messagesIn"]
+			metrics.messagesOut += snapshot["messagesOut"]
+			metrics.errors += snapshot["errors"]
+			metrics.opens += snapshot["opens"]
+			metrics.reconnects += snapshot["reconnects"]
+			if ((snapshot["lastActivity"] is not None) and ((metrics.lastActivity is None) or (snapshot["lastActivity"] > metrics.lastActivity))):
+				metrics.lastActivity = snapshot["lastActivity"]
+
+			for name, histogramSnapshot in snapshot["latency"].items():
+				histogram = metrics.histogramCatalogue.get(name)
+				if (histogram is None):
+					histogram = metrics.histogramCatalogue[name] = Histogram()
+				histogram.merge(Histogram.fromSnapshot(histogramSnapshot))
+
+		return metrics.snapshot()
+
 #Utility Classes
 class Utilities_Base(MyUtilities.common.Container, MyUtilities.common.EtcFunctions):
 	def __init__(self, *args, **kwargs):
@@ -9,13 +270,110 @@ class Utilities_Base(MyUtilities.common.Container, MyUtilities.common.EtcFunctio
 
 		MyUtilities.common.Container.__init__(self, *args, **kwargs)
 
+class IndexedAttribute(property):
+	"""Stands in for a child attribute that its container indexes, keeping the index up to date when it changes.
+	Only the attributes in a container's indexCatalogue get one, so writing to any other attribute costs nothing extra.
+	Reading goes straight to the slot, so it stays as fast as any other attribute.
+	"""
+
+	def __init__(self, name, slot = None):
+		"""Defines the internal variables needed to run.
+
+		name (str) - Which attribute this is
+		slot (member_descriptor) - The slot the value is kept in
+			- If None: The value is kept in the child's __dict__
+		"""
+
+		if (slot is not None):
+			getter = slot.__get__
+			setter = slot.__set__
+			deleter = slot.__delete__
+		else:
+			def getter(instance):
+				try:
+					return instance.__dict__[name]
+				except KeyError:
+					errorMessage = f"{type(instance).__name__!r} object has no attribute {name!r}"
+					raise AttributeError(errorMessage)
+
+			def setter(instance, value):
+				instance.__dict__[name] = value
+
+			def deleter(instance):
+				del instance.__dict__[name]
+
+		def setIndexed(instance, value):
+			try:
+				parent = instance.parent
+				keyList = parent._indexByAttribute.get(name)
+			except AttributeError:
+				keyList = None
+
+			if (not keyList):
+				setter(instance, value)
+				return
+
+			with parent._lock:
+				parent._unindexChild(instance, keyList)
+				setter(instance, value)
+				parent._indexChild(instance, keyList)
+
+		super().__init__(getter, setIndexed, deleter)
+		self.name = name
+
 class Utilities_Container(Utilities_Base):
+	#Which child attributes find() can look up without checking every child
+	##Use a tuple of attributes to index them together, such as ("vendorId", "productId")
+	indexCatalogue = ()
+
+	#The most children that map() will talk to at the same time
+	maxWorkers = 32
+
+	def __init_subclass__(cls, **kwargs):
+		"""Puts an IndexedAttribute on the child class for each attribute in indexCatalogue."""
+
+		super().__init_subclass__(**kwargs)
+
+		childClass = cls.__dict__.get("Child")
+		if (childClass is None):
+			return
+
+		for key in cls.indexCatalogue:
+			for attribute in (key if isinstance(key, tuple) else (key,)):
+				slot = None
+				for item in childClass.__mro__:
+					if (attribute in item.__dict__):
+						slot = item.__dict__[attribute]
+						break
+
+				if (isinstance(slot, IndexedAttribute)):
+					continue
+				if ((slot is not None) and (not isinstance(slot, types.MemberDescriptorType))):
+					errorMessage = f"{childClass.__qualname__}.{attribute} cannot be indexed by {cls.__name__}, since it is already a {type(slot).__name__}"
+					raise TypeError(errorMessage)
+				setattr(childClass, attribute, IndexedAttribute(attribute, slot))
+
 	def __init__(self, parent):
 		"""Utility functions that only container classes get."""
 
 		#Internal Variables
 		if (not hasattr(self, "parent")): self.parent = parent
 		if (not hasattr(self, "root")): self.root = self.parent
+
+		#Anything that changes which children there are holds this lock
+		##Looking up a child does not, so reads stay cheap
+		self._lock = threading.RLock()
+
+		#Label Allocation
+		self._labelNext = 0 #The lowest number label that has never been given out
+		self._labelFree = [] #Heap of number labels below _labelNext that are no longer used
+
+		#Child Indexes
+		self._index = {key: {} for key in self.indexCatalogue} #{key (str or tuple): {value: {id(child): child}}}
+		self._indexByAttribute = {} #{attribute (str): [key (str or tuple)]}
+		for key in self.indexCatalogue:
+			for attribute in (key if isinstance(key, tuple) else (key,)):
+				self._indexByAttribute.setdefault(attribute, []).append(key)
 		
 		#Initialize Inherited Modules
 		Utilities_Base.__init__(self)
@@ -31,13 +389,41 @@ class Utilities_Container(Utilities_Base):
 	def add(self, label = None):
 		"""Adds a new child.
 		If a child with the given label already exists, it will simply return the child instead of making a new one.
+		This is atomic, so two threads adding the same label will get the same child.
 
 		Example Input: add()
 		"""
 
-		if (label in self):
-			return self[label]
-		return self.Child(self, label)
+		if (label is not None):
+			child = self.get(label)
+			if (child is not None):
+				return child
+
+		with self._lock:
+			if ((label is not None) and (label in self)):
+				return self[label]
+
+			#Only nest the child once it is fully built, so threads that do not take the lock never see it half made
+			child = self.Child(self, label)
+			self._nest(child, label)
+			return child
+
+	def get(self, label, default = None):
+		"""Returns the child with the given label without locking.
+
+		label (any) - Which child to return
+		default (any) - What to return if there is no child with that label
+
+		Example Input: get(0)
+		"""
+
+		try:
+			if (label in self):
+				return self[label]
+		except KeyError:
+			#It was removed by another thread after the check
+			pass
+		return default
 
 	def remove(self, child = None):
 		"""Removes a child.
@@ -49,12 +435,239 @@ class Utilities_Container(Utilities_Base):
 		Example Input: remove(0)
 		"""
 
-		if (child is None):
-			child = self.current
-		elif (not isinstance(child, self.Child)):
-			child = self[child]
-		
-		child.remove()
+		with self._lock:
+			if (child is None):
+				child = self.current
+			elif (not isinstance(child, self.Child)):
+				child = self[child]
+			
+			child.remove()
+
+	def map(self, function, *args, children = None, maxWorkers = None, timeout = None, **kwargs):
+		"""Runs 'function' on each child at the same time, using a bounded pool of threads.
+		Returns the results and errors as two dictionaries: ({label: result}, {label: error}).
+
+		function (str or function) - What to run for each child
+			- If str: The name of a method on the child
+			- If function: Will be given the child, followed by 'args' and 'kwargs'
+		children (list) - Which children to run it on. Can be labels or children_class handles
+			- If None: Will use all children
+		maxWorkers (int) - The most children to run at the same time
+			- If None: Will use self.maxWorkers
+		timeout (float) - How many seconds to wait for all children to finish
+			- If None: Wait forever
+			- Children that have not finished in time get a TimeoutError
+
+		Example Input: map("send", "Lorem Ipsum")
+		Example Input: map(lambda child: child.read(end = "\n"))
+		Example Input: map("open", children = [0, 1, 2], timeout = 5)
+		"""
+
+		if (children is None):
+			children = list(self)
+		else:
+			children = [child if isinstance(child, self.Child) else self[child] for child in children]
+
+		results = {}
+		errors = {}
+		if (not children):
+			return results, errors
+
+		def runFunction(child):
+			if (isinstance(function, str)):
+				return getattr(child, function)(*args, **kwargs)
+			return function(child, *args, **kwargs)
+
+		executor = concurrent.futures.ThreadPoolExecutor(max_workers = min(len(children), maxWorkers or self.maxWorkers), thread_name_prefix = f"{type(self).__name__}.map")
+		try:
+			futureCatalogue = {executor.submit(runFunction, child): child for child in children}
+			try:
+				for future in concurrent.futures.as_completed(futureCatalogue, timeout = timeout):
+					child = futureCatalogue[future]
+					try:
+						results[child.label] = future.result()
+					except Exception as error:
+						errors[child.label] = error
+			except concurrent.futures.TimeoutError:
+				for future, child in futureCatalogue.items():
+					if ((child.label not in results) and (child.label not in errors)):
+						future.cancel()
+						errors[child.label] = TimeoutError(f"{child.__repr__()} did not finish within {timeout} seconds for map() in {self.__repr__()}")
+		finally:
+			executor.shutdown(wait = timeout is None, cancel_futures = True)
+
+		return results, errors
+
+	def sendAll(self, *args, **kwargs):
+		"""Sends the same thing to every child at the same time.
+		Returns the results and errors as two dictionaries: ({label: result}, {label: error}).
+
+		Example Input: sendAll("Lorem Ipsum")
+		Example Input: sendAll("Lorem Ipsum", children = [0, 1], timeout = 5)
+		"""
+
+		return self.map("send", *args, **kwargs)
+
+	def openAll(self, *args, **kwargs):
+		"""Opens every child at the same time.
+		Returns the results and errors as two dictionaries: ({label: result}, {label: error}).
+
+		Example Input: openAll()
+		"""
+
+		return self.map("open", *args, **kwargs)
+
+	def closeAll(self, *args, **kwargs):
+		"""Closes every child at the same time.
+		Returns the results and errors as two dictionaries: ({label: result}, {label: error}).
+
+		Example Input: closeAll()
+		"""
+
+		return self.map("close", *args, **kwargs)
+
+	def stats(self):
+		"""Returns the metrics for each child and their total as a dictionary that can be saved as json.
+
+		Example Input: stats()
+		"""
+
+		children = {child.label: child.stats() for child in list(self)}
+		return {"total": Metrics.combine(children.values()), "children": children}
+
+	def find(self, **kwargs):
+		"""Returns a list of children whose attributes match all of the given values.
+		Uses the indexes in indexCatalogue where it can, so it does not need to check every child.
+
+		Example Input: find(port = "COM1")
+		Example Input: find(vendorId = 1529, productId = 16900)
+		"""
+
+		if (not kwargs):
+			return list(self)
+
+		#Use the index that covers the most of the given attributes
+		bestKey = None
+		bestSize = 0
+		for key in self.indexCatalogue:
+			attributeList = key if isinstance(key, tuple) else (key,)
+			if ((len(attributeList) > bestSize) and all((attribute in kwargs) for attribute in attributeList)):
+				bestKey = key
+				bestSize = len(attributeList)
+
+		if (bestKey is None):
+			candidates = list(self)
+		else:
+			if (isinstance(bestKey, tuple)):
+				value = tuple(kwargs[attribute] for attribute in bestKey)
+			else:
+				value = kwargs[bestKey]
+
+			try:
+				candidates = list(self._index[bestKey].get(value, {}).values())
+			except TypeError:
+				#Unhashable values are never indexed
+				candidates = list(self)
+
+		return [child for child in candidates if all((getattr(child, attribute, None) == value) for attribute, value in kwargs.items())]
+
+	def _allocateLabel(self):
+		"""Returns the lowest number label that is not in use.
+		Freed labels are reused first, so this does not need to count up from 0 each time.
+		"""
+
+		while (self._labelFree):
+			label = heapq.heappop(self._labelFree)
+			if (label not in self):
+				return label
+
+		#Skip past labels that the user chose themselves
+		while (self._labelNext in self):
+			self._labelNext += 1
+
+		label = self._labelNext
+		self._labelNext += 1
+		return label
+
+	def _releaseLabel(self, label):
+		"""Lets a number label be given out again by _allocateLabel()."""
+
+		if (isinstance(label, int) and (not isinstance(label, bool)) and (0 <= label < self._labelNext)):
+			heapq.heappush(self._labelFree, label)
+
+	def _nest(self, child, label = None):
+		"""Adds 'child' to this container and returns the label it was given.
+
+		label (any) - What to store the child under
+			- If None: Will use the lowest number label that is not in use
+		"""
+
+		with self._lock:
+			if (label is None):
+				label = self._allocateLabel()
+
+			self[label] = child
+			child.label = label
+			self._indexChild(child)
+
+		return label
+
+	def _unnest(self, child):
+		"""Removes 'child' from this container.
+		Returns False if it was already removed.
+		"""
+
+		with self._lock:
+			if ((child.label not in self) or (self[child.label] is not child)):
+				return False
+
+			self._unindexChild(child)
+			del self[child.label]
+			self._releaseLabel(child.label)
+
+		return True
+
+	def _indexValue(self, child, key):
+		"""Returns what 'child' is stored under for the given index key."""
+
+		if (isinstance(key, tuple)):
+			return tuple(getattr(child, attribute, None) for attribute in key)
+		return getattr(child, key, None)
+
+	def _indexChild(self, child, keyList = None):
+		"""Adds 'child' to the indexes.
+
+		keyList (list) - Which indexes to update
+			- If None: Will update all of them
+		"""
+
+		if ((child.label not in self) or (self[child.label] is not child)):
+			return
+
+		for key in (self.indexCatalogue if (keyList is None) else keyList):
+			try:
+				self._index[key].setdefault(self._indexValue(child, key), {})[id(child)] = child
+			except TypeError:
+				pass
+
+	def _unindexChild(self, child, keyList = None):
+		"""Removes 'child' from the indexes.
+
+		keyList (list) - Which indexes to update
+			- If None: Will update all of them
+		"""
+
+		for key in (self.indexCatalogue if (keyList is None) else keyList):
+			try:
+				value = self._indexValue(child, key)
+				bucket = self._index[key].get(value)
+			except TypeError:
+				continue
+
+			if (bucket is not None):
+				bucket.pop(id(child), None)
+				if (not bucket):
+					del self._index[key][value]
 
 	def select(self, child = None):
 		"""Selects a particular child.
@@ -66,14 +679,22 @@ class Utilities_Container(Utilities_Base):
 		Example Input: select(0)
 		"""
 
-		if (child is None):
-			child = list(self)[0]
-		elif (not isinstance(child, self.Child)):
-			child = self[child]
-		
-		self.current = child
+		with self._lock:
+			if (child is None):
+				child = next(iter(self), None)
+			elif (not isinstance(child, self.Child)):
+				child = self[child]
+			elif ((child.label not in self) or (self[child.label] is not child)):
+				errorMessage = f"{child.__repr__()} has been removed from {self.__repr__()}"
+				raise KeyError(errorMessage)
+			
+			self.current = child
 
 class Utilities_Child(Utilities_Base):
+	#Children can be made by the thousands, so their attributes are kept in slots instead of each having to grow a __dict__
+	##Subclasses should list the attributes they add in their own __slots__
+	__slots__ = ("label", "parent", "root", "metrics")
+
 	def __init__(self, parent, label):
 		"""Utility functions that only child classes get."""
 
@@ -81,15 +702,9 @@ class Utilities_Child(Utilities_Base):
 		if (not hasattr(self, "label")): self.label = label
 		if (not hasattr(self, "parent")): self.parent = parent
 		if (not hasattr(self, "root")): self.root = self.parent.root
+		self.metrics = Metrics()
 
-		#Nest in parent
-		if (self.label is None):
-			self.label = 0
-			while True:
-				if (self.label not in self.parent):
-					break
-				self.label += 1
-		self.parent[self.label] = self
+		#The parent nests this once it is fully built; see Utilities_Container.add()
 
 		#Initialize Inherited Modules
 		Utilities_Base.__init__(self)
@@ -100,6 +715,14 @@ class Utilities_Child(Utilities_Base):
 		output = Utilities_Base.__str__(self)
 		return output
 
+	def stats(self):
+		"""Returns the metrics for this child as a dictionary that can be saved as json.
+
+		Example Input: stats()
+		"""
+
+		return self.metrics.snapshot()
+
 	def rename(self, value):
 		"""Renames this child to the new label.
 
@@ -108,10 +731,11 @@ class Utilities_Child(Utilities_Base):
 		Example Input: rename("Guest")
 		"""
 
-		del self.parent[self.label]
-		
-		self.label = value
-		self.parent[value] = self
+		with self.parent._lock:
+			if (not self.parent._unnest(self)):
+				errorMessage = f"{self.__repr__()} has been removed from {self.parent.__repr__()}"
+				raise KeyError(errorMessage)
+			self.parent._nest(self, value)
 
 	def remove(self):
 		"""Removes the rows in the database corresponding to this child.
@@ -119,12 +743,15 @@ class Utilities_Child(Utilities_Base):
 		Example Input: remove()
 		"""
 
-		#Remove Child
-		del self.parent[self.label]
+		with self.parent._lock:
+			#Remove Child
+			if (not self.parent._unnest(self)):
+				#Another thread already removed it
+				return
 
-		#Account for current selection
-		if (self.parent.current == self):
-			self.parent.select()
+			#Account for current selection
+			if (getattr(self.parent, "current", None) is self):
+				self.parent.select()
 
 	def select(self):
 		"""Selects this child.